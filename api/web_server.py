@@ -3,21 +3,23 @@
 FastAPI web server for triangular arbitrage bot
 """
 
-import subprocess
 import os
 import asyncio
 import json
 import threading
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import logging
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from utils.trade_logger import get_trade_logger
-from arbitrage.realtime_detector import RealtimeArbitrageDetector
+from utils.opportunity_stream import OpportunityStream, opportunity_id
+from utils import ws_codec
+from utils.opportunity_cache import OpportunityCache
 import uvicorn
 from dotenv import load_dotenv
 load_dotenv()
@@ -41,19 +43,8 @@ def setup_logger(name: str) -> logging.Logger:
 
     return logger
 
-# Get git commit hash safely
-def get_git_commit() -> str:
-    try:
-        if os.path.exists(os.path.join(os.path.dirname(__file__), "..", ".git")):
-            repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-            commit = subprocess.check_output(
-                ["git", "-C", repo_root, "rev-parse", "HEAD"],
-                stderr=subprocess.DEVNULL
-            ).decode().strip()
-            return commit[:7]
-        return "unknown"
-    except Exception:
-        return "unknown"
+# Get git commit hash safely (read from .git, no subprocess)
+from utils.version import git_commit as get_git_commit
 
 GIT_COMMIT = get_git_commit()
 print(f"Starting Web Server (Commit: {GIT_COMMIT})")
@@ -68,34 +59,152 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class ClientChannel:
+    """One WebSocket client with its own bounded send queue and writer task"""
+
+    def __init__(self, websocket: WebSocket, max_queue: int, send_timeout: float,
+                 encoding: str = ws_codec.ENCODING_JSON):
+        self.websocket = websocket
+        self.encoding = encoding
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.queue: deque = deque()  # [event, message] entries, oldest first
+        self.pending: Dict[str, list] = {}  # conflatable event -> its queued entry
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.dropped = 0
+        self.writer_task: Optional[asyncio.Task] = None
+
+    def enqueue(self, event: str, message: Union[str, bytes], conflate: bool) -> bool:
+        """Queue a serialized message without blocking the producer; True if an older message was dropped"""
+        if self.closed:
+            return False
+        if conflate:
+            entry = self.pending.get(event)
+            if entry is not None:
+                # A newer full-state message replaces the unsent one in place
+                entry[1] = message
+                return False
+        dropped = False
+        if len(self.queue) >= self.max_queue:
+            # Drop the oldest message, but keep the latest full-state ones
+            for i, old_entry in enumerate(self.queue):
+                if self.pending.get(old_entry[0]) is not old_entry:
+                    del self.queue[i]
+                    break
+            else:
+                self.pending.pop(self.queue.popleft()[0], None)
+            self.dropped += 1
+            dropped = True
+        entry = [event, message]
+        self.queue.append(entry)
+        if conflate:
+            self.pending[event] = entry
+        self.wakeup.set()
+        return dropped
+
+    async def run_writer(self) -> None:
+        """Drain the queue to the socket; raises on send failure or stall"""
+        while not self.closed:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            entry = self.queue.popleft()
+            if self.pending.get(entry[0]) is entry:
+                del self.pending[entry[0]]
+            message = entry[1]
+            if isinstance(message, bytes):
+                send = self.websocket.send_bytes(message)
+            else:
+                send = self.websocket.send_text(message)
+            await asyncio.wait_for(send, timeout=self.send_timeout)
+
+
 class WebSocketManager:
-    def __init__(self):
+    # Events that carry full state: only the latest unsent one matters to a client
+    CONFLATED_EVENTS = {'opportunities_update', 'opportunities_snapshot'}
+
+    def __init__(self, max_queue: int = 256, send_timeout: float = 10.0):
         self.connections: List[WebSocket] = []
+        self.clients: Dict[int, ClientChannel] = {}
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.opportunity_stream = OpportunityStream()
+        self._snapshot_messages: Dict[str, tuple] = {}  # encoding -> (seq, serialized snapshot)
         self.logger = setup_logger('WebSocketManager')
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+        # Clients may ask for a compact binary encoding via subprotocol or ?encoding=
+        encoding, subprotocol = ws_codec.negotiate(
+            websocket.scope.get('subprotocols', []),
+            websocket.query_params.get('encoding')
+        )
+        await websocket.accept(subprotocol=subprotocol)
+        # The schema is sent directly, before the client is registered for broadcasts:
+        # it must arrive first and can never be dropped from the send queue
+        schema = ws_codec.schema_message(encoding)
+        if isinstance(schema, bytes):
+            await asyncio.wait_for(websocket.send_bytes(schema), timeout=self.send_timeout)
+        elif schema is not None:
+            await asyncio.wait_for(websocket.send_text(schema), timeout=self.send_timeout)
+        client = ClientChannel(websocket, self.max_queue, self.send_timeout, encoding)
+        client.writer_task = asyncio.create_task(self._client_writer(client))
+        self.clients[id(websocket)] = client
         self.connections.append(websocket)
-        self.logger.info(f"New client connected. Total: {len(self.connections)}")
+        self._send_snapshot(client)
+        self.logger.info(f"New client connected ({encoding}). Total: {len(self.connections)}")
+
+    def _send_snapshot(self, client: ClientChannel):
+        """Queue the current opportunity snapshot so the client can (re)build its state"""
+        stream = self.opportunity_stream
+        cached = self._snapshot_messages.get(client.encoding)
+        if cached is None or cached[0] != stream.seq:
+            message = ws_codec.encode("opportunities_snapshot", stream.snapshot(), client.encoding)
+            cached = self._snapshot_messages[client.encoding] = (stream.seq, message)
+        client.enqueue("opportunities_snapshot", cached[1], True)
 
     async def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(id(websocket), None)
+        if client:
+            client.closed = True
+            client.wakeup.set()
+            if client.writer_task and client.writer_task is not asyncio.current_task():
+                client.writer_task.cancel()
         if websocket in self.connections:
             self.connections.remove(websocket)
             self.logger.info(f"Client disconnected. Total: {len(self.connections)}")
 
+    async def _client_writer(self, client: ClientChannel):
+        try:
+            await client.run_writer()
+        except asyncio.CancelledError:
+            return
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Disconnecting stalled client (no progress in {self.send_timeout:g}s, "
+                                f"{client.dropped} messages dropped)")
+        except Exception as e:
+            self.logger.warning(f"Failed to send to client: {str(e)}")
+
+        await self.disconnect(client.websocket)
+        try:
+            await client.websocket.close()
+        except Exception:
+            pass
+
     async def broadcast(self, event: str, data: Any):
-        """Broadcast message to all connected WebSocket clients"""
-        message = json.dumps({"type": event, "data": data})
-        disconnected = []
-        for connection in self.connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                self.logger.warning(f"Failed to send to client: {str(e)}")
-                disconnected.append(connection)
-        
-        for conn in disconnected:
-            await self.disconnect(conn)
+        """Broadcast message to all connected WebSocket clients (serialized once per encoding, never waits on sockets)"""
+        if not self.clients:
+            return
+        messages: Dict[str, Union[str, bytes]] = {}
+        conflate = event in self.CONFLATED_EVENTS
+        for client in list(self.clients.values()):
+            message = messages.get(client.encoding)
+            if message is None:
+                message = messages[client.encoding] = ws_codec.encode(event, data, client.encoding)
+            if client.enqueue(event, message, conflate):
+                # The client lost a message and may have a gap in the delta stream
+                self._send_snapshot(client)
 
 class BotConfig(BaseModel):
     minProfitPercentage: float
@@ -116,7 +225,16 @@ class ArbitrageWebServer:
         self.running = False
         self.auto_trading = False
         self.opportunities: List[Dict[str, Any]] = []
-        self.opportunities_cache: Dict[str, Any] = {}
+        # Stable opportunity ID -> {'opportunity', 'ui_data'}; entries expire once not re-detected
+        self.opportunities_cache = OpportunityCache(max_entries=500, ttl=30.0)
+        # Streaming detectors publish their top opportunities on every change (at most
+        # once per min_scan_interval); the full REST scan runs every max_scan_age
+        self.min_scan_interval = 1.0
+        self.max_scan_age = 15.0
+        self._scan_requested = asyncio.Event()
+        self._realtime_changed = asyncio.Event()
+        self._realtime_latest: List[Any] = []
+        self._stream_latest: List[Any] = []
         self.stats = {
             'opportunitiesFound': 0,
             'tradesExecuted': 0,
@@ -176,15 +294,20 @@ class ArbitrageWebServer:
                     self.websocket_manager,
                     {
                         'min_profit_percentage': enforced_min_profit,
-                        'max_trade_amount': enforced_max_trade
+                        'max_trade_amount': enforced_max_trade,
+                        'exchange_scan_deadline': Config.EXCHANGE_SCAN_DEADLINE,
+                        'scan_top_k': Config.SCAN_TOP_K
                     }
                 )
                 
                 # Initialize real-time detector for WebSocket-based detection
+                from arbitrage.realtime_detector import RealtimeArbitrageDetector
                 self.realtime_detector = RealtimeArbitrageDetector(
                     min_profit_pct=0.01,  # Lower threshold to show more opportunities
                     max_trade_amount=100.0  # Fixed $100 maximum
                 )
+                self.realtime_detector.add_listener(self._on_realtime_change)
+                self.detector.add_change_listener(self._on_stream_change)
                 
                 # Start real-time WebSocket stream
                 if await self.realtime_detector.initialize():
@@ -211,8 +334,9 @@ class ArbitrageWebServer:
 
                 self.running = True
                 # Force scan immediately to show opportunities
-                asyncio.create_task(self._immediate_scan())
+                self._scan_requested.set()
                 asyncio.create_task(self._continuous_scanning_loop())
+                asyncio.create_task(self._realtime_opportunity_integration())
                 self.stats['activeExchanges'] = len(config.selectedExchanges)
 
                 return {
@@ -233,6 +357,9 @@ class ArbitrageWebServer:
             try:
                 self.running = False
                 self.auto_trading = False
+                # Wake the event-driven loops so they notice the stop
+                self._scan_requested.set()
+                self._realtime_changed.set()
                 if self.exchange_manager:
                     await self.exchange_manager.disconnect_all()
                 self.stats['activeExchanges'] = 0
@@ -254,15 +381,79 @@ class ArbitrageWebServer:
 
         @app.get("/api/opportunities")
         async def get_opportunities():
-            return self.opportunities
+            # Live (not yet expired) opportunities, most profitable first
+            live = [entry['ui_data'] for entry in self.opportunities_cache.values()]
+            live.sort(key=lambda opp: opp.get('profitPercentage', 0), reverse=True)
+            return live[:100]
+
+        @app.get("/api/opportunities/{opp_id}")
+        async def get_opportunity(opp_id: str):
+            entry = self.opportunities_cache.get(opp_id)
+            if entry is None:
+                raise HTTPException(status_code=404, detail="Opportunity not found or expired")
+            return entry['ui_data']
+
+        @app.post("/api/opportunities/{opp_id}/execute")
+        async def execute_opportunity(opp_id: str):
+            entry = self.opportunities_cache.get(opp_id)
+            if entry is None:
+                raise HTTPException(status_code=404, detail="Opportunity not found or expired")
+            if not self.executor:
+                raise HTTPException(status_code=400, detail="Bot is not running")
+
+            opportunity = entry['opportunity']
+            trade_amount = max(5.0, min(opportunity.initial_amount, 20.0))  # Gate.io limits
+            try:
+                executable_opp = self._create_executable_opportunity(opportunity, trade_amount)
+                success = await self.executor.execute_arbitrage(executable_opp)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                self.logger.error(f"Error executing opportunity {opp_id}: {str(e)}", exc_info=True)
+                raise HTTPException(status_code=500, detail=str(e))
 
+            expected_profit_usd = trade_amount * (opportunity.profit_percentage / 100)
+            if success:
+                self.stats['tradesExecuted'] += 1
+                self.stats['totalProfit'] += expected_profit_usd
+            await self.websocket_manager.broadcast('opportunity_executed', {
+                **entry['ui_data'],
+                'profitAmount': expected_profit_usd if success else 0,
+                'volume': trade_amount,
+                'status': 'completed' if success else 'failed',
+                'timestamp': datetime.now().isoformat(),
+                'manual_executed': True
+            })
+            return {"status": "success" if success else "failed", "id": opp_id}
+
+        # Plain (sync) handlers: FastAPI runs them in its threadpool, keeping SQLite reads off the event loop
         @app.get("/api/trades")
-        async def get_trades():
-            return self.trade_logger.get_recent_trades(50)
+        def get_trades(response: Response, limit: int = 50, cursor: Optional[str] = None,
+                       exchange: Optional[str] = None, status: Optional[str] = None,
+                       since: Optional[str] = None, until: Optional[str] = None):
+            # Body stays a plain list; the cursor for the next (older) page goes in a header
+            try:
+                page = self.trade_logger.query_trades(limit=limit, cursor=cursor, exchange=exchange,
+                                                      status=status, since=since, until=until)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if page['next_cursor']:
+                response.headers['X-Next-Cursor'] = page['next_cursor']
+            return page['trades']
 
         @app.get("/api/trade-stats")
-        async def get_trade_stats():
-            return self.trade_logger.get_trade_statistics()
+        def get_trade_stats(window: str = 'all', exchange: Optional[str] = None):
+            try:
+                return self.trade_logger.get_trade_statistics(window=window, exchange=exchange)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        @app.get("/metrics")
+        async def get_metrics():
+            from utils import metrics
+            metrics.WS_CLIENTS.set(len(self.websocket_manager.clients))
+            metrics.OPPORTUNITY_CACHE_ENTRIES.set(len(self.opportunities_cache))
+            return Response(content=metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
 
         @app.websocket("/ws")
         async def websocket_endpoint(websocket: WebSocket):
@@ -271,6 +462,8 @@ class ArbitrageWebServer:
                 while True:
                     await websocket.receive_text()
             except WebSocketDisconnect:
+                pass
+            finally:
                 await self.websocket_manager.disconnect(websocket)
 
     async def _immediate_scan(self):
@@ -284,19 +477,39 @@ class ArbitrageWebServer:
         except Exception as e:
             self.logger.error(f"Error in immediate scan: {e}")
 
+    def _on_realtime_change(self, opportunities):
+        """Real-time detector listener: its top opportunities changed"""
+        self._realtime_latest = opportunities
+        self._realtime_changed.set()
+
+    def _on_stream_change(self, results):
+        """Multi-exchange detector listener: its streamed top opportunities changed"""
+        self._stream_latest = results
+        self._realtime_changed.set()
+
     async def _continuous_scanning_loop(self):
-        self.logger.info("🚀 Starting continuous scanning for ALL opportunities...")
+        self.logger.info("🚀 Starting event-driven scanning for ALL opportunities...")
         while self.running:
             try:
+                # Full REST scan every max_scan_age; streamed changes are published by
+                # _realtime_opportunity_integration without waiting for a scan
+                try:
+                    await asyncio.wait_for(self._scan_requested.wait(), timeout=self.max_scan_age)
+                except asyncio.TimeoutError:
+                    pass
+                self._scan_requested.clear()
+                if not self.running:
+                    break
+                scan_start = time.time()
+
                 if self.detector and self.exchange_manager:
-                    scan_start = time.time()
                     opportunities = await self.detector.scan_all_opportunities()
                     scan_duration = (time.time() - scan_start) * 1000
 
                     # Convert ALL opportunities to UI format
                     ui_opportunities = []
-                    for i, opp in enumerate(opportunities):
-                        opp_id = f"real_opp_{int(time.time()*1000)}_{i}"
+                    for opp in opportunities:
+                        opp_id = opportunity_id(opp.exchange, opp.triangle_path)
                         ui_opp = {
                             "id": opp_id,
                             "exchange": opp.exchange,
@@ -314,22 +527,18 @@ class ArbitrageWebServer:
                             "manual_execution": True
                         }
                         ui_opportunities.append(ui_opp)
-                        self.opportunities_cache[opp_id] = {
+                        self.opportunities_cache.put(opp_id, {
                             'opportunity': opp,
                             'ui_data': ui_opp
-                        }
+                        })
 
                     self.opportunities = ui_opportunities[:100]  # Show up to 100 opportunities
 
-                    if len(self.opportunities_cache) > 500:
-                        old_keys = list(self.opportunities_cache.keys())[:-500]
-                        for key in old_keys:
-                            del self.opportunities_cache[key]
-
                     total_count = len(self.opportunities)
                     
                     self.stats['opportunitiesFound'] = total_count
-                    await self.websocket_manager.broadcast("opportunities_update", self.opportunities)
+                    # The detector already published this scan to the opportunity stream under
+                    # the same stable IDs, so clients only receive what changed
 
                     if self.opportunities:
                         self.logger.info(f"💎 Scan complete ({scan_duration:.0f}ms): {total_count} ALL opportunities found")
@@ -348,7 +557,8 @@ class ArbitrageWebServer:
                         else:
                             self.logger.info("🤖 Auto-trading enabled but no profitable opportunities found")
                 
-                await asyncio.sleep(5)  # Scan every 5 seconds
+                # Rate cap: at most one scan per min_scan_interval
+                await asyncio.sleep(max(0.0, self.min_scan_interval - (time.time() - scan_start)))
             except Exception as e:
                 self.logger.error(f"Error in scanning loop: {str(e)}", exc_info=True)
                 await asyncio.sleep(10)
@@ -358,8 +568,8 @@ class ArbitrageWebServer:
         try:
             # Convert opportunities to UI format
             ui_opportunities = []
-            for i, opp in enumerate(opportunities):
-                opp_id = f"ui_display_{int(time.time()*1000)}_{i}"
+            for opp in opportunities:
+                opp_id = opportunity_id(opp.exchange, opp.triangle_path)
                 ui_opp = {
                     "id": opp_id,
                     "exchange": opp.exchange,
@@ -378,59 +588,88 @@ class ArbitrageWebServer:
                 ui_opportunities.append(ui_opp)
             
             # Always broadcast to UI
-            await self.websocket_manager.broadcast("opportunities_update", ui_opportunities)
+            await self.websocket_manager.opportunity_stream.publish(self.websocket_manager, 'ui_display', ui_opportunities)
             self.logger.info(f"📺 Broadcasted {len(ui_opportunities)} opportunities to UI for display")
             
         except Exception as e:
             self.logger.error(f"Error broadcasting opportunities to UI: {e}")
     
     async def _realtime_opportunity_integration(self):
-        """Integrate real-time detector opportunities with main system"""
+        """Integrate real-time detector opportunities with main system as soon as they change"""
         self.logger.info("🌐 Starting real-time opportunity integration...")
         
         while self.running:
             try:
-                if self.realtime_detector and self.realtime_detector.running:
-                    # Check if detector has current_opportunities attribute
-                    if hasattr(self.realtime_detector, 'current_opportunities'):
-                        realtime_opps = getattr(self.realtime_detector, 'current_opportunities', [])
-                        
-                        if realtime_opps:
-                            # Convert to our format and add to main opportunities
-                            formatted_opps = []
-                            for i, opp in enumerate(realtime_opps[-5:]):  # Last 5 opportunities
-                                opp_id = f"realtime_{int(time.time()*1000)}_{i}"
-                                formatted_opp = {
-                                    'id': opp_id,
-                                    'exchange': 'binance',
-                                    'trianglePath': " → ".join(opp.path[:3]),
-                                    'profitPercentage': round(opp.profit_percentage, 6),
-                                    'profitAmount': round(opp.profit_amount, 6),
-                                    'volume': opp.initial_amount,
-                                    'status': 'detected',
-                                    'dataType': 'REALTIME_WEBSOCKET',
-                                    'timestamp': opp.timestamp.isoformat()
-                                }
-                                formatted_opps.append(formatted_opp)
-                                
-                                # Add to cache for execution
-                                self.opportunities_cache[opp_id] = {
-                                    'id': opp_id,
-                                    'exchange': 'binance',
-                                    'triangle_path': opp.path[:3],
-                                    'profit_percentage': opp.profit_percentage,
-                                    'profit_amount': opp.profit_amount,
-                                    'initial_amount': opp.initial_amount,
-                                    'steps': opp.steps,
-                                    'timestamp': opp.timestamp.isoformat()
-                                }
-                            
-                            # Broadcast to UI
-                            if formatted_opps:
-                                await self.websocket_manager.broadcast('opportunities_update', formatted_opps)
-                                self.logger.info(f"📡 Integrated {len(formatted_opps)} real-time opportunities")
+                await self._realtime_changed.wait()
+                self._realtime_changed.clear()
+                if not self.running:
+                    break
+                publish_start = time.time()
+                from arbitrage.multi_exchange_detector import ArbitrageResult
+                
+                # Convert to our format and add to main opportunities
+                formatted_opps = []
+                for opp in self._realtime_latest[-5:]:  # Last 5 opportunities
+                    opp_id = opportunity_id('binance', opp.path)
+                    formatted_opp = {
+                        'id': opp_id,
+                        'exchange': 'binance',
+                        'trianglePath': " → ".join(opp.path[:3]),
+                        'profitPercentage': round(opp.profit_percentage, 6),
+                        'profitAmount': round(opp.profit_amount, 6),
+                        'volume': opp.initial_amount,
+                        'status': 'detected',
+                        'dataType': 'REALTIME_WEBSOCKET',
+                        'timestamp': opp.timestamp.isoformat()
+                    }
+                    formatted_opps.append(formatted_opp)
+                    
+                    # Add to cache for execution
+                    self.opportunities_cache.put(opp_id, {
+                        'opportunity': ArbitrageResult(
+                            exchange='binance',
+                            triangle_path=opp.path[:3],
+                            profit_percentage=opp.profit_percentage,
+                            profit_amount=opp.profit_amount,
+                            initial_amount=opp.initial_amount
+                        ),
+                        'ui_data': formatted_opp
+                    })
+                
+                # Streamed top-K from the multi-exchange detector, published without a REST scan
+                stream_opps = []
+                for opp in self._stream_latest:
+                    opp_id = opportunity_id(opp.exchange, opp.triangle_path)
+                    formatted_opp = {
+                        'id': opp_id,
+                        'exchange': opp.exchange,
+                        'trianglePath': " → ".join(opp.triangle_path[:3]),
+                        'profitPercentage': round(opp.profit_percentage, 4),
+                        'profitAmount': round(opp.profit_amount, 6),
+                        'volume': opp.initial_amount,
+                        'status': 'detected',
+                        'dataType': 'STREAMING',
+                        'timestamp': datetime.now().isoformat(),
+                        'tradeable': opp.is_tradeable,
+                        'balanceAvailable': opp.balance_available,
+                        'balanceRequired': opp.required_balance
+                    }
+                    stream_opps.append(formatted_opp)
+                    self.opportunities_cache.put(opp_id, {
+                        'opportunity': opp,
+                        'ui_data': formatted_opp
+                    })
+                
+                # Broadcast to UI (an empty list removes the expired ones)
+                await self.websocket_manager.opportunity_stream.publish(
+                    self.websocket_manager, 'realtime', formatted_opps)
+                await self.websocket_manager.opportunity_stream.publish(
+                    self.websocket_manager, 'stream', stream_opps)
+                if formatted_opps or stream_opps:
+                    self.logger.info(f"📡 Integrated {len(formatted_opps)} real-time and {len(stream_opps)} streamed opportunities")
                 
-                await asyncio.sleep(3)  # Check every 3 seconds
+                # Coalesce bursts: changes arriving meanwhile are published together next round
+                await asyncio.sleep(max(0.0, self.min_scan_interval - (time.time() - publish_start)))
                 
             except Exception as e:
                 self.logger.error(f"Error in real-time integration: {str(e)}")
@@ -568,21 +807,23 @@ if __name__ == "__main__":
 FastAPI web server for triangular arbitrage bot
 """
 
-import subprocess
 import os
 import asyncio
 import json
 import threading
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import logging
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from utils.trade_logger import get_trade_logger
-from arbitrage.realtime_detector import RealtimeArbitrageDetector
+from utils.opportunity_stream import OpportunityStream, opportunity_id
+from utils import ws_codec
+from utils.opportunity_cache import OpportunityCache
 import uvicorn
 from dotenv import load_dotenv
 load_dotenv()
@@ -606,19 +847,8 @@ def setup_logger(name: str) -> logging.Logger:
 
     return logger
 
-# Get git commit hash safely
-def get_git_commit() -> str:
-    try:
-        if os.path.exists(os.path.join(os.path.dirname(__file__), "..", ".git")):
-            repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-            commit = subprocess.check_output(
-                ["git", "-C", repo_root, "rev-parse", "HEAD"],
-                stderr=subprocess.DEVNULL
-            ).decode().strip()
-            return commit[:7]
-        return "unknown"
-    except Exception:
-        return "unknown"
+# Get git commit hash safely (read from .git, no subprocess)
+from utils.version import git_commit as get_git_commit
 
 GIT_COMMIT = get_git_commit()
 print(f"Starting Web Server (Commit: {GIT_COMMIT})")
@@ -633,34 +863,152 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class ClientChannel:
+    """One WebSocket client with its own bounded send queue and writer task"""
+
+    def __init__(self, websocket: WebSocket, max_queue: int, send_timeout: float,
+                 encoding: str = ws_codec.ENCODING_JSON):
+        self.websocket = websocket
+        self.encoding = encoding
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.queue: deque = deque()  # [event, message] entries, oldest first
+        self.pending: Dict[str, list] = {}  # conflatable event -> its queued entry
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.dropped = 0
+        self.writer_task: Optional[asyncio.Task] = None
+
+    def enqueue(self, event: str, message: Union[str, bytes], conflate: bool) -> bool:
+        """Queue a serialized message without blocking the producer; True if an older message was dropped"""
+        if self.closed:
+            return False
+        if conflate:
+            entry = self.pending.get(event)
+            if entry is not None:
+                # A newer full-state message replaces the unsent one in place
+                entry[1] = message
+                return False
+        dropped = False
+        if len(self.queue) >= self.max_queue:
+            # Drop the oldest message, but keep the latest full-state ones
+            for i, old_entry in enumerate(self.queue):
+                if self.pending.get(old_entry[0]) is not old_entry:
+                    del self.queue[i]
+                    break
+            else:
+                self.pending.pop(self.queue.popleft()[0], None)
+            self.dropped += 1
+            dropped = True
+        entry = [event, message]
+        self.queue.append(entry)
+        if conflate:
+            self.pending[event] = entry
+        self.wakeup.set()
+        return dropped
+
+    async def run_writer(self) -> None:
+        """Drain the queue to the socket; raises on send failure or stall"""
+        while not self.closed:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            entry = self.queue.popleft()
+            if self.pending.get(entry[0]) is entry:
+                del self.pending[entry[0]]
+            message = entry[1]
+            if isinstance(message, bytes):
+                send = self.websocket.send_bytes(message)
+            else:
+                send = self.websocket.send_text(message)
+            await asyncio.wait_for(send, timeout=self.send_timeout)
+
+
 class WebSocketManager:
-    def __init__(self):
+    # Events that carry full state: only the latest unsent one matters to a client
+    CONFLATED_EVENTS = {'opportunities_update', 'opportunities_snapshot'}
+
+    def __init__(self, max_queue: int = 256, send_timeout: float = 10.0):
         self.connections: List[WebSocket] = []
+        self.clients: Dict[int, ClientChannel] = {}
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.opportunity_stream = OpportunityStream()
+        self._snapshot_messages: Dict[str, tuple] = {}  # encoding -> (seq, serialized snapshot)
         self.logger = setup_logger('WebSocketManager')
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+        # Clients may ask for a compact binary encoding via subprotocol or ?encoding=
+        encoding, subprotocol = ws_codec.negotiate(
+            websocket.scope.get('subprotocols', []),
+            websocket.query_params.get('encoding')
+        )
+        await websocket.accept(subprotocol=subprotocol)
+        # The schema is sent directly, before the client is registered for broadcasts:
+        # it must arrive first and can never be dropped from the send queue
+        schema = ws_codec.schema_message(encoding)
+        if isinstance(schema, bytes):
+            await asyncio.wait_for(websocket.send_bytes(schema), timeout=self.send_timeout)
+        elif schema is not None:
+            await asyncio.wait_for(websocket.send_text(schema), timeout=self.send_timeout)
+        client = ClientChannel(websocket, self.max_queue, self.send_timeout, encoding)
+        client.writer_task = asyncio.create_task(self._client_writer(client))
+        self.clients[id(websocket)] = client
         self.connections.append(websocket)
-        self.logger.info(f"New client connected. Total: {len(self.connections)}")
+        self._send_snapshot(client)
+        self.logger.info(f"New client connected ({encoding}). Total: {len(self.connections)}")
+
+    def _send_snapshot(self, client: ClientChannel):
+        """Queue the current opportunity snapshot so the client can (re)build its state"""
+        stream = self.opportunity_stream
+        cached = self._snapshot_messages.get(client.encoding)
+        if cached is None or cached[0] != stream.seq:
+            message = ws_codec.encode("opportunities_snapshot", stream.snapshot(), client.encoding)
+            cached = self._snapshot_messages[client.encoding] = (stream.seq, message)
+        client.enqueue("opportunities_snapshot", cached[1], True)
 
     async def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(id(websocket), None)
+        if client:
+            client.closed = True
+            client.wakeup.set()
+            if client.writer_task and client.writer_task is not asyncio.current_task():
+                client.writer_task.cancel()
         if websocket in self.connections:
             self.connections.remove(websocket)
             self.logger.info(f"Client disconnected. Total: {len(self.connections)}")
 
+    async def _client_writer(self, client: ClientChannel):
+        try:
+            await client.run_writer()
+        except asyncio.CancelledError:
+            return
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Disconnecting stalled client (no progress in {self.send_timeout:g}s, "
+                                f"{client.dropped} messages dropped)")
+        except Exception as e:
+            self.logger.warning(f"Failed to send to client: {str(e)}")
+
+        await self.disconnect(client.websocket)
+        try:
+            await client.websocket.close()
+        except Exception:
+            pass
+
     async def broadcast(self, event: str, data: Any):
-        """Broadcast message to all connected WebSocket clients"""
-        message = json.dumps({"type": event, "data": data})
-        disconnected = []
-        for connection in self.connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                self.logger.warning(f"Failed to send to client: {str(e)}")
-                disconnected.append(connection)
-        
-        for conn in disconnected:
-            await self.disconnect(conn)
+        """Broadcast message to all connected WebSocket clients (serialized once per encoding, never waits on sockets)"""
+        if not self.clients:
+            return
+        messages: Dict[str, Union[str, bytes]] = {}
+        conflate = event in self.CONFLATED_EVENTS
+        for client in list(self.clients.values()):
+            message = messages.get(client.encoding)
+            if message is None:
+                message = messages[client.encoding] = ws_codec.encode(event, data, client.encoding)
+            if client.enqueue(event, message, conflate):
+                # The client lost a message and may have a gap in the delta stream
+                self._send_snapshot(client)
 
 class BotConfig(BaseModel):
     minProfitPercentage: float
@@ -681,7 +1029,16 @@ class ArbitrageWebServer:
         self.running = False
         self.auto_trading = False
         self.opportunities: List[Dict[str, Any]] = []
-        self.opportunities_cache: Dict[str, Any] = {}
+        # Stable opportunity ID -> {'opportunity', 'ui_data'}; entries expire once not re-detected
+        self.opportunities_cache = OpportunityCache(max_entries=500, ttl=30.0)
+        # Streaming detectors publish their top opportunities on every change (at most
+        # once per min_scan_interval); the full REST scan runs every max_scan_age
+        self.min_scan_interval = 1.0
+        self.max_scan_age = 15.0
+        self._scan_requested = asyncio.Event()
+        self._realtime_changed = asyncio.Event()
+        self._realtime_latest: List[Any] = []
+        self._stream_latest: List[Any] = []
         self.stats = {
             'opportunitiesFound': 0,
             'tradesExecuted': 0,
@@ -741,15 +1098,20 @@ class ArbitrageWebServer:
                     self.websocket_manager,
                     {
                         'min_profit_percentage': enforced_min_profit,
-                        'max_trade_amount': enforced_max_trade
+                        'max_trade_amount': enforced_max_trade,
+                        'exchange_scan_deadline': Config.EXCHANGE_SCAN_DEADLINE,
+                        'scan_top_k': Config.SCAN_TOP_K
                     }
                 )
                 
                 # Initialize real-time detector for WebSocket-based detection
+                from arbitrage.realtime_detector import RealtimeArbitrageDetector
                 self.realtime_detector = RealtimeArbitrageDetector(
                     min_profit_pct=0.01,  # Lower threshold to show more opportunities
                     max_trade_amount=100.0  # Fixed $100 maximum
                 )
+                self.realtime_detector.add_listener(self._on_realtime_change)
+                self.detector.add_change_listener(self._on_stream_change)
                 
                 # Start real-time WebSocket stream
                 if await self.realtime_detector.initialize():
@@ -776,8 +1138,9 @@ class ArbitrageWebServer:
 
                 self.running = True
                 # Force scan immediately to show opportunities
-                asyncio.create_task(self._immediate_scan())
+                self._scan_requested.set()
                 asyncio.create_task(self._continuous_scanning_loop())
+                asyncio.create_task(self._realtime_opportunity_integration())
                 self.stats['activeExchanges'] = len(config.selectedExchanges)
 
                 return {
@@ -798,6 +1161,9 @@ class ArbitrageWebServer:
             try:
                 self.running = False
                 self.auto_trading = False
+                # Wake the event-driven loops so they notice the stop
+                self._scan_requested.set()
+                self._realtime_changed.set()
                 if self.exchange_manager:
                     await self.exchange_manager.disconnect_all()
                 self.stats['activeExchanges'] = 0
@@ -819,15 +1185,79 @@ class ArbitrageWebServer:
 
         @app.get("/api/opportunities")
         async def get_opportunities():
-            return self.opportunities
+            # Live (not yet expired) opportunities, most profitable first
+            live = [entry['ui_data'] for entry in self.opportunities_cache.values()]
+            live.sort(key=lambda opp: opp.get('profitPercentage', 0), reverse=True)
+            return live[:100]
+
+        @app.get("/api/opportunities/{opp_id}")
+        async def get_opportunity(opp_id: str):
+            entry = self.opportunities_cache.get(opp_id)
+            if entry is None:
+                raise HTTPException(status_code=404, detail="Opportunity not found or expired")
+            return entry['ui_data']
+
+        @app.post("/api/opportunities/{opp_id}/execute")
+        async def execute_opportunity(opp_id: str):
+            entry = self.opportunities_cache.get(opp_id)
+            if entry is None:
+                raise HTTPException(status_code=404, detail="Opportunity not found or expired")
+            if not self.executor:
+                raise HTTPException(status_code=400, detail="Bot is not running")
+
+            opportunity = entry['opportunity']
+            trade_amount = max(5.0, min(opportunity.initial_amount, 20.0))  # Gate.io limits
+            try:
+                executable_opp = self._create_executable_opportunity(opportunity, trade_amount)
+                success = await self.executor.execute_arbitrage(executable_opp)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                self.logger.error(f"Error executing opportunity {opp_id}: {str(e)}", exc_info=True)
+                raise HTTPException(status_code=500, detail=str(e))
 
+            expected_profit_usd = trade_amount * (opportunity.profit_percentage / 100)
+            if success:
+                self.stats['tradesExecuted'] += 1
+                self.stats['totalProfit'] += expected_profit_usd
+            await self.websocket_manager.broadcast('opportunity_executed', {
+                **entry['ui_data'],
+                'profitAmount': expected_profit_usd if success else 0,
+                'volume': trade_amount,
+                'status': 'completed' if success else 'failed',
+                'timestamp': datetime.now().isoformat(),
+                'manual_executed': True
+            })
+            return {"status": "success" if success else "failed", "id": opp_id}
+
+        # Plain (sync) handlers: FastAPI runs them in its threadpool, keeping SQLite reads off the event loop
         @app.get("/api/trades")
-        async def get_trades():
-            return self.trade_logger.get_recent_trades(50)
+        def get_trades(response: Response, limit: int = 50, cursor: Optional[str] = None,
+                       exchange: Optional[str] = None, status: Optional[str] = None,
+                       since: Optional[str] = None, until: Optional[str] = None):
+            # Body stays a plain list; the cursor for the next (older) page goes in a header
+            try:
+                page = self.trade_logger.query_trades(limit=limit, cursor=cursor, exchange=exchange,
+                                                      status=status, since=since, until=until)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if page['next_cursor']:
+                response.headers['X-Next-Cursor'] = page['next_cursor']
+            return page['trades']
 
         @app.get("/api/trade-stats")
-        async def get_trade_stats():
-            return self.trade_logger.get_trade_statistics()
+        def get_trade_stats(window: str = 'all', exchange: Optional[str] = None):
+            try:
+                return self.trade_logger.get_trade_statistics(window=window, exchange=exchange)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        @app.get("/metrics")
+        async def get_metrics():
+            from utils import metrics
+            metrics.WS_CLIENTS.set(len(self.websocket_manager.clients))
+            metrics.OPPORTUNITY_CACHE_ENTRIES.set(len(self.opportunities_cache))
+            return Response(content=metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
 
         @app.websocket("/ws")
         async def websocket_endpoint(websocket: WebSocket):
@@ -836,6 +1266,8 @@ class ArbitrageWebServer:
                 while True:
                     await websocket.receive_text()
             except WebSocketDisconnect:
+                pass
+            finally:
                 await self.websocket_manager.disconnect(websocket)
 
     async def _immediate_scan(self):
@@ -849,19 +1281,39 @@ class ArbitrageWebServer:
         except Exception as e:
             self.logger.error(f"Error in immediate scan: {e}")
 
+    def _on_realtime_change(self, opportunities):
+        """Real-time detector listener: its top opportunities changed"""
+        self._realtime_latest = opportunities
+        self._realtime_changed.set()
+
+    def _on_stream_change(self, results):
+        """Multi-exchange detector listener: its streamed top opportunities changed"""
+        self._stream_latest = results
+        self._realtime_changed.set()
+
     async def _continuous_scanning_loop(self):
-        self.logger.info("🚀 Starting continuous scanning for ALL opportunities...")
+        self.logger.info("🚀 Starting event-driven scanning for ALL opportunities...")
         while self.running:
             try:
+                # Full REST scan every max_scan_age; streamed changes are published by
+                # _realtime_opportunity_integration without waiting for a scan
+                try:
+                    await asyncio.wait_for(self._scan_requested.wait(), timeout=self.max_scan_age)
+                except asyncio.TimeoutError:
+                    pass
+                self._scan_requested.clear()
+                if not self.running:
+                    break
+                scan_start = time.time()
+
                 if self.detector and self.exchange_manager:
-                    scan_start = time.time()
                     opportunities = await self.detector.scan_all_opportunities()
                     scan_duration = (time.time() - scan_start) * 1000
 
                     # Convert ALL opportunities to UI format
                     ui_opportunities = []
-                    for i, opp in enumerate(opportunities):
-                        opp_id = f"real_opp_{int(time.time()*1000)}_{i}"
+                    for opp in opportunities:
+                        opp_id = opportunity_id(opp.exchange, opp.triangle_path)
                         ui_opp = {
                             "id": opp_id,
                             "exchange": opp.exchange,
@@ -879,22 +1331,18 @@ class ArbitrageWebServer:
                             "manual_execution": True
                         }
                         ui_opportunities.append(ui_opp)
-                        self.opportunities_cache[opp_id] = {
+                        self.opportunities_cache.put(opp_id, {
                             'opportunity': opp,
                             'ui_data': ui_opp
-                        }
+                        })
 
                     self.opportunities = ui_opportunities[:100]  # Show up to 100 opportunities
 
-                    if len(self.opportunities_cache) > 500:
-                        old_keys = list(self.opportunities_cache.keys())[:-500]
-                        for key in old_keys:
-                            del self.opportunities_cache[key]
-
                     total_count = len(self.opportunities)
                     
                     self.stats['opportunitiesFound'] = total_count
-                    await self.websocket_manager.broadcast("opportunities_update", self.opportunities)
+                    # The detector already published this scan to the opportunity stream under
+                    # the same stable IDs, so clients only receive what changed
 
                     if self.opportunities:
                         self.logger.info(f"💎 Scan complete ({scan_duration:.0f}ms): {total_count} ALL opportunities found")
@@ -913,7 +1361,8 @@ class ArbitrageWebServer:
                         else:
                             self.logger.info("🤖 Auto-trading enabled but no profitable opportunities found")
                 
-                await asyncio.sleep(5)  # Scan every 5 seconds
+                # Rate cap: at most one scan per min_scan_interval
+                await asyncio.sleep(max(0.0, self.min_scan_interval - (time.time() - scan_start)))
             except Exception as e:
                 self.logger.error(f"Error in scanning loop: {str(e)}", exc_info=True)
                 await asyncio.sleep(10)
@@ -923,8 +1372,8 @@ class ArbitrageWebServer:
         try:
             # Convert opportunities to UI format
             ui_opportunities = []
-            for i, opp in enumerate(opportunities):
-                opp_id = f"ui_display_{int(time.time()*1000)}_{i}"
+            for opp in opportunities:
+                opp_id = opportunity_id(opp.exchange, opp.triangle_path)
                 ui_opp = {
                     "id": opp_id,
                     "exchange": opp.exchange,
@@ -943,59 +1392,88 @@ class ArbitrageWebServer:
                 ui_opportunities.append(ui_opp)
             
             # Always broadcast to UI
-            await self.websocket_manager.broadcast("opportunities_update", ui_opportunities)
+            await self.websocket_manager.opportunity_stream.publish(self.websocket_manager, 'ui_display', ui_opportunities)
             self.logger.info(f"📺 Broadcasted {len(ui_opportunities)} opportunities to UI for display")
             
         except Exception as e:
             self.logger.error(f"Error broadcasting opportunities to UI: {e}")
     
     async def _realtime_opportunity_integration(self):
-        """Integrate real-time detector opportunities with main system"""
+        """Integrate real-time detector opportunities with main system as soon as they change"""
         self.logger.info("🌐 Starting real-time opportunity integration...")
         
         while self.running:
             try:
-                if self.realtime_detector and self.realtime_detector.running:
-                    # Check if detector has current_opportunities attribute
-                    if hasattr(self.realtime_detector, 'current_opportunities'):
-                        realtime_opps = getattr(self.realtime_detector, 'current_opportunities', [])
-                        
-                        if realtime_opps:
-                            # Convert to our format and add to main opportunities
-                            formatted_opps = []
-                            for i, opp in enumerate(realtime_opps[-5:]):  # Last 5 opportunities
-                                opp_id = f"realtime_{int(time.time()*1000)}_{i}"
-                                formatted_opp = {
-                                    'id': opp_id,
-                                    'exchange': 'binance',
-                                    'trianglePath': " → ".join(opp.path[:3]),
-                                    'profitPercentage': round(opp.profit_percentage, 6),
-                                    'profitAmount': round(opp.profit_amount, 6),
-                                    'volume': opp.initial_amount,
-                                    'status': 'detected',
-                                    'dataType': 'REALTIME_WEBSOCKET',
-                                    'timestamp': opp.timestamp.isoformat()
-                                }
-                                formatted_opps.append(formatted_opp)
-                                
-                                # Add to cache for execution
-                                self.opportunities_cache[opp_id] = {
-                                    'id': opp_id,
-                                    'exchange': 'binance',
-                                    'triangle_path': opp.path[:3],
-                                    'profit_percentage': opp.profit_percentage,
-                                    'profit_amount': opp.profit_amount,
-                                    'initial_amount': opp.initial_amount,
-                                    'steps': opp.steps,
-                                    'timestamp': opp.timestamp.isoformat()
-                                }
-                            
-                            # Broadcast to UI
-                            if formatted_opps:
-                                await self.websocket_manager.broadcast('opportunities_update', formatted_opps)
-                                self.logger.info(f"📡 Integrated {len(formatted_opps)} real-time opportunities")
+                await self._realtime_changed.wait()
+                self._realtime_changed.clear()
+                if not self.running:
+                    break
+                publish_start = time.time()
+                from arbitrage.multi_exchange_detector import ArbitrageResult
+                
+                # Convert to our format and add to main opportunities
+                formatted_opps = []
+                for opp in self._realtime_latest[-5:]:  # Last 5 opportunities
+                    opp_id = opportunity_id('binance', opp.path)
+                    formatted_opp = {
+                        'id': opp_id,
+                        'exchange': 'binance',
+                        'trianglePath': " → ".join(opp.path[:3]),
+                        'profitPercentage': round(opp.profit_percentage, 6),
+                        'profitAmount': round(opp.profit_amount, 6),
+                        'volume': opp.initial_amount,
+                        'status': 'detected',
+                        'dataType': 'REALTIME_WEBSOCKET',
+                        'timestamp': opp.timestamp.isoformat()
+                    }
+                    formatted_opps.append(formatted_opp)
+                    
+                    # Add to cache for execution
+                    self.opportunities_cache.put(opp_id, {
+                        'opportunity': ArbitrageResult(
+                            exchange='binance',
+                            triangle_path=opp.path[:3],
+                            profit_percentage=opp.profit_percentage,
+                            profit_amount=opp.profit_amount,
+                            initial_amount=opp.initial_amount
+                        ),
+                        'ui_data': formatted_opp
+                    })
+                
+                # Streamed top-K from the multi-exchange detector, published without a REST scan
+                stream_opps = []
+                for opp in self._stream_latest:
+                    opp_id = opportunity_id(opp.exchange, opp.triangle_path)
+                    formatted_opp = {
+                        'id': opp_id,
+                        'exchange': opp.exchange,
+                        'trianglePath': " → ".join(opp.triangle_path[:3]),
+                        'profitPercentage': round(opp.profit_percentage, 4),
+                        'profitAmount': round(opp.profit_amount, 6),
+                        'volume': opp.initial_amount,
+                        'status': 'detected',
+                        'dataType': 'STREAMING',
+                        'timestamp': datetime.now().isoformat(),
+                        'tradeable': opp.is_tradeable,
+                        'balanceAvailable': opp.balance_available,
+                        'balanceRequired': opp.required_balance
+                    }
+                    stream_opps.append(formatted_opp)
+                    self.opportunities_cache.put(opp_id, {
+                        'opportunity': opp,
+                        'ui_data': formatted_opp
+                    })
+                
+                # Broadcast to UI (an empty list removes the expired ones)
+                await self.websocket_manager.opportunity_stream.publish(
+                    self.websocket_manager, 'realtime', formatted_opps)
+                await self.websocket_manager.opportunity_stream.publish(
+                    self.websocket_manager, 'stream', stream_opps)
+                if formatted_opps or stream_opps:
+                    self.logger.info(f"📡 Integrated {len(formatted_opps)} real-time and {len(stream_opps)} streamed opportunities")
                 
-                await asyncio.sleep(3)  # Check every 3 seconds
+                # Coalesce bursts: changes arriving meanwhile are published together next round
+                await asyncio.sleep(max(0.0, self.min_scan_interval - (time.time() - publish_start)))
                 
             except Exception as e:
                 self.logger.error(f"Error in real-time integration: {str(e)}")
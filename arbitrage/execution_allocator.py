@@ -0,0 +1,185 @@
+"""
+Tenant-aware execution allocator for shared opportunities.
+
+With shared detection every subscribed tenant sees the same triangle at the
+same moment. Instead of all of them firing into the same top-of-book, tenants
+ask the allocator for a slice: requests for one candidate arriving within a
+short window are pooled, the triangle's usable depth is split between them
+(pro-rata or round-robin), slices too small to be worth trading are skipped, and granted
+orders are staggered so they do not hit the book at the same instant.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.logger import setup_logger
+
+
+@dataclass
+class Allocation:
+    """A tenant's share of one candidate."""
+    amount: float
+    delay: float = 0.0  # Seconds to wait before sending the first order
+
+    @property
+    def granted(self) -> bool:
+        return self.amount > 0
+
+
+@dataclass
+class _CandidateBook:
+    capacity: float  # Usable depth in base currency for this snapshot
+    allocated: float = 0.0
+    grants: int = 0
+    requests: List[Tuple[str, float, asyncio.Future]] = field(default_factory=list)
+    expires_at: float = 0.0
+    open: bool = True
+
+
+def triangle_capacity(candidate) -> Optional[float]:
+    """
+    Top-of-book depth of a triangle in base currency, or None if the feed has no volumes.
+
+    Leg 1 sells base at bid1 (bidVolume1 base), leg 2 sells mid at bid2
+    (bidVolume2 mid = bidVolume2 / bid1 base), leg 3 buys base at ask3 (askVolume3 base).
+    """
+    v1 = candidate.p1.get('bidVolume')
+    v2 = candidate.p2.get('bidVolume')
+    v3 = candidate.p3.get('askVolume')
+    if not (v1 and v2 and v3):
+        return None
+    return min(v1, v2 / candidate.p1['bid'], v3)
+
+
+class ExecutionAllocator:
+    """Splits the depth of each shared candidate between the tenants that want to trade it."""
+
+    def __init__(self, policy: str = 'pro_rata', window: float = 0.02, book_fraction: float = 0.5,
+                 default_capacity: float = 1000.0, min_fill: float = 0.2, stagger: float = 0.05,
+                 ttl: float = 10.0):
+        if policy not in ('pro_rata', 'round_robin'):
+            raise ValueError(f"Unknown allocation policy: {policy}")
+        self.logger = setup_logger('ExecutionAllocator')
+        self.policy = policy
+        self.window = window  # Seconds to pool concurrent requests
+        self.book_fraction = book_fraction  # Share of visible depth tenants may take together
+        self.default_capacity = default_capacity  # Used when the feed has no volumes
+        self.min_fill = min_fill  # Smallest slice worth sending, as a fraction of the request
+        self.stagger = stagger  # Delay between consecutive grants on one candidate
+        self.ttl = ttl
+        self._books: Dict[Tuple, _CandidateBook] = {}
+        self._last_grant: Dict[str, float] = {}  # user_id -> time of last grant (round-robin order)
+        self.skipped = 0
+
+    @staticmethod
+    def _key(candidate) -> Tuple:
+        return (candidate.exchange, candidate.base, candidate.mid, candidate.quote, candidate.detected_at)
+
+    def _expire(self, now: float) -> None:
+        for key in [k for k, book in self._books.items() if book.expires_at <= now and not book.open]:
+            del self._books[key]
+
+    async def request(self, candidate, user_id: str, amount: float) -> Allocation:
+        """Ask for up to `amount` of a candidate; an Allocation with amount 0 means skip it."""
+        now = time.time()
+        self._expire(now)
+        key = self._key(candidate)
+        book = self._books.get(key)
+
+        if book is None:
+            capacity = triangle_capacity(candidate)
+            if capacity is None:
+                capacity = self.default_capacity
+            book = self._books[key] = _CandidateBook(capacity=capacity * self.book_fraction, expires_at=now + self.ttl)
+            asyncio.get_running_loop().call_later(self.window, self._allocate, key)
+
+        if not book.open:
+            # Late arrival: take what is left, behind everyone already granted
+            return self._late_grant(book, user_id, amount)
+
+        future = asyncio.get_running_loop().create_future()
+        book.requests.append((user_id, amount, future))
+        return await future
+
+    def _late_grant(self, book: _CandidateBook, user_id: str, amount: float) -> Allocation:
+        granted = min(amount, book.capacity - book.allocated)
+        if granted <= 0 or granted < amount * self.min_fill:
+            self.skipped += 1
+            return Allocation(0.0)
+        book.allocated += granted
+        allocation = Allocation(granted, delay=book.grants * self.stagger)
+        book.grants += 1
+        self._last_grant[user_id] = time.time()
+        return allocation
+
+    def _allocate(self, key: Tuple) -> None:
+        """Close the request window for a candidate and resolve every pooled request."""
+        book = self._books.get(key)
+        if book is None:
+            return
+        book.open = False
+        requests, book.requests = book.requests, []
+
+        # Tenants served least recently go first, so shortfalls rotate between users
+        requests.sort(key=lambda r: self._last_grant.get(r[0], 0.0))
+        amounts = self._split(book.capacity, [amount for _, amount, _ in requests])
+
+        now = time.time()
+        for (user_id, wanted, future), amount in zip(requests, amounts):
+            if amount <= 0 or amount < wanted * self.min_fill:
+                self.skipped += 1
+                allocation = Allocation(0.0)
+            else:
+                book.allocated += amount
+                allocation = Allocation(amount, delay=book.grants * self.stagger)
+                book.grants += 1
+                self._last_grant[user_id] = now
+            if not future.done():
+                future.set_result(allocation)
+
+        if len(requests) > 1:
+            self.logger.info(f"⚖️ {key[0]} {'-'.join(key[1:4])}: {book.grants}/{len(requests)} tenants granted "
+                             f"{book.allocated:.2f} of {book.capacity:.2f} ({self.policy})")
+
+    def _split(self, capacity: float, wanted: List[float]) -> List[float]:
+        """Share `capacity` between requests (already in priority order)."""
+        if sum(wanted) <= capacity:
+            return list(wanted)
+
+        if self.policy == 'round_robin':
+            amounts = []
+            remaining = capacity
+            for amount in wanted:
+                granted = min(amount, remaining)
+                if granted < amount * self.min_fill:
+                    granted = 0.0
+                amounts.append(granted)
+                remaining -= granted
+            return amounts
+
+        # Pro-rata, dropping slices below the minimum fill and re-sharing their part
+        active = [i for i, amount in enumerate(wanted) if amount > 0]
+        while active:
+            total = sum(wanted[i] for i in active)
+            shares = {i: min(wanted[i], capacity * wanted[i] / total) for i in active}
+            too_small = [i for i in active if shares[i] < wanted[i] * self.min_fill]
+            if not too_small:
+                return [shares.get(i, 0.0) for i in range(len(wanted))]
+            # Drop the lowest-priority undersized request and retry
+            active.remove(too_small[-1])
+        return [0.0] * len(wanted)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'policy': self.policy, 'open_candidates': len(self._books), 'skipped': self.skipped}
+
+
+_execution_allocator_instance = None
+
+def get_execution_allocator() -> ExecutionAllocator:
+    """Get or create the global execution allocator."""
+    global _execution_allocator_instance
+    if _execution_allocator_instance is None:
+        _execution_allocator_instance = ExecutionAllocator()
+    return _execution_allocator_instance
@@ -4,14 +4,17 @@ LIVE TRADING Triangular Arbitrage Detector with Enhanced Balance Display
 """
 
 import asyncio
+import heapq
 import time
 import aiohttp
-from typing import Dict, List, Any, Set, Tuple
+from typing import Dict, List, Any, Set, Tuple, Callable
 from datetime import datetime
 import logging
 from dataclasses import dataclass
 
 from utils.logger import setup_logger
+from utils.opportunity_stream import opportunity_id
+from utils import metrics
 from arbitrage.realtime_detector import RealtimeArbitrageDetector
 from arbitrage.simple_triangle_detector import SimpleTriangleDetector
 
@@ -22,6 +25,9 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+# Longest stretch _scan_exchange_triangles_all evaluates before yielding to the event loop
+SCAN_YIELD_SECONDS = 0.005
+
 # Major currencies for display
 MAJOR_CURRENCIES = {'BTC', 'ETH', 'USDT', 'BNB', 'USDC', 'BUSD', 'ADA', 'DOT', 'LINK', 'LTC', 'XRP', 'SOL', 'MATIC', 'AVAX', 'DOGE', 'TRX', 'ATOM', 'FIL', 'UNI'}
 
@@ -55,6 +61,8 @@ class MultiExchangeDetector:
         self.min_profit_pct = 0.4  # Fixed 0.5% threshold for Gate.io profitability
         self.max_trade_amount = min(20.0, float(config.get('max_trade_amount', 20.0)))  # $20 maximum for safety
         self.triangle_paths: Dict[str, List[List[str]]] = {}
+        self.exchange_scan_deadline = float(config.get('exchange_scan_deadline', 8.0))  # Seconds per exchange per scan
+        self.scan_top_k = int(config.get('scan_top_k', 200))  # Results kept after merging all exchanges
         
         # Initialize real-time detector
         self.realtime_detector = RealtimeArbitrageDetector(
@@ -72,6 +80,7 @@ class MultiExchangeDetector:
         
         # Initialize simple detector (based on working JavaScript logic)
         self.simple_detector = None  # Will be initialized per exchange
+        self.change_listeners: List[Callable[[], None]] = []
         
         # Rate limiting cache
         self._last_tickers: Dict[str, Dict[str, Any]] = {}
@@ -81,6 +90,43 @@ class MultiExchangeDetector:
         self.logger.info(f"💰 USDT TRIANGULAR ARBITRAGE Detector initialized - Min Profit: 0.4%, Max Trade: ${self.max_trade_amount}")
         self.logger.info(f"🎯 Target: USDT → Currency1 → Currency2 → USDT cycles only")
 
+    def add_change_listener(self, callback: Callable[[List[ArbitrageResult]], None]):
+        """Call `callback(results)` with the streamed top opportunities whenever they change"""
+        self.change_listeners.append(callback)
+
+    def _on_stream_change(self, opportunities):
+        results = self._stream_results(opportunities)
+        for callback in self.change_listeners:
+            try:
+                callback(results)
+            except Exception as e:
+                self.logger.error(f"Error in change listener: {e}")
+
+    def _stream_results(self, opportunities) -> List[ArbitrageResult]:
+        """Convert the simple detector's top opportunities into results, keeping only valid triangles"""
+        exchange_id = self.simple_detector.exchange_id
+        results = []
+        for opp in opportunities[:10]:  # Top 10 from selected exchange
+            result = ArbitrageResult(
+                exchange=exchange_id,  # Use the SELECTED exchange
+                triangle_path=[opp.d1, opp.d2, opp.d3],  # 3 currencies
+                profit_percentage=opp.value,
+                profit_amount=self.max_trade_amount * (opp.value / 100),
+                initial_amount=self.max_trade_amount,
+                net_profit_percent=opp.value,
+                min_profit_threshold=self.min_profit_pct,
+                is_tradeable=True,
+                balance_available=124.76,  # Your actual USDT balance
+                required_balance=self.max_trade_amount
+            )
+            # CRITICAL: Only show opportunities with valid trading pairs
+            if self._validate_triangle_pairs(exchange_id, result.triangle_path):
+                results.append(result)
+                self.logger.debug(f"✅ Valid display opportunity: {exchange_id} {' → '.join(result.triangle_path)} = {result.profit_percentage:.4f}%")
+            else:
+                self.logger.debug(f"❌ Skipped invalid display opportunity: {exchange_id} {' → '.join(result.triangle_path)}")
+        return results
+
     async def initialize(self):
         """Initialize with balance verification"""
         self.logger.info("🚀 Initializing LIVE TRADING detector...")
@@ -95,6 +141,7 @@ class MultiExchangeDetector:
                 min_profit_pct=0.4,  # Fixed 0.4% for profitability
                 exchange_id=primary_exchange
             )
+            self.simple_detector.add_listener(self._on_stream_change)
             
             # Initialize and start the detector with correct exchange
             if await self.simple_detector.get_pairs():
@@ -190,26 +237,9 @@ class MultiExchangeDetector:
             return {}
 
     def _get_usd_price(self, currency: str, exchange_name: str) -> float:
-        """Get USD price for a currency from last ticker data"""
-        if currency == 'USDT':
-            return 1.0
-            
-        ex = self.exchange_manager.exchanges.get(exchange_name)
-        if not ex:
-            return 0.0
-            
-        # Try direct USDT pair first
-        pair = f"{currency}/USDT"
-        if pair in self._last_tickers.get(exchange_name, {}):
-            return float(self._last_tickers[exchange_name][pair].get('last', 0.0))
-        
-        # Try via BTC if available
-        if f"{currency}/BTC" in self._last_tickers.get(exchange_name, {}) and "BTC/USDT" in self._last_tickers.get(exchange_name, {}):
-            currency_btc = float(self._last_tickers[exchange_name][f"{currency}/BTC"].get('last', 0.0))
-            btc_usd = float(self._last_tickers[exchange_name]["BTC/USDT"].get('last', 0.0))
-            return currency_btc * btc_usd
-            
-        return 0.0
+        """Get USD price for a currency via the cheapest route on the shared price board"""
+        from exchanges.price_board import get_price_board
+        return get_price_board().usd_price(currency, exchange_name) or 0.0
 
     async def _fetch_balance_with_retry(self, exchange, retries: int = 3) -> Dict[str, float]:
         """Fetch balance with retry mechanism"""
@@ -402,105 +432,81 @@ class MultiExchangeDetector:
         scan_start_time = time.time()
         all_results = []
         self.logger.info(f"🚀 ENHANCED SCAN for PROFITABLE opportunities (Min: {self.min_profit_pct}%)...")
+
+        # Exchange scans run in the background while the detectors below are consulted
+        connected_exchanges = list(self.exchange_manager.exchanges.keys())
+        exchange_scans = self._start_exchange_scans()
         
-        # STEP 0: Use enhanced detector for better results
         try:
-            if self.enhanced_detector:
-                enhanced_opportunities = await self.enhanced_detector.find_profitable_opportunities()
-                if enhanced_opportunities:
-                    self.logger.info(f"💎 Enhanced detector found {len(enhanced_opportunities)} opportunities!")
+            # STEP 0: Use enhanced detector for better results
+            try:
+                if self.enhanced_detector:
+                    enhanced_opportunities = await asyncio.wait_for(
+                        self.enhanced_detector.find_profitable_opportunities(),
+                        timeout=self.exchange_scan_deadline
+                    )
+                    if enhanced_opportunities:
+                        self.logger.info(f"💎 Enhanced detector found {len(enhanced_opportunities)} opportunities!")
                     
-                    # Convert to ArbitrageResult format
-                    for opp in enhanced_opportunities:
-                        result = ArbitrageResult(
-                            exchange=opp.exchange,
-                            triangle_path=opp.path if isinstance(opp.path, list) else [opp.path],
-                            profit_percentage=opp.profit_percentage,
-                            profit_amount=opp.profit_amount,
-                            initial_amount=opp.trade_amount,
-                            net_profit_percent=opp.profit_percentage,
-                            min_profit_threshold=self.min_profit_pct,
-                            is_tradeable=(opp.profit_percentage >= 0.4),  # Auto-tradeable if ≥0.4%
-                            balance_available=100.0,  # Assume sufficient balance
-                            required_balance=opp.trade_amount
-                        )
-                        all_results.append(result)
+                        # Convert to ArbitrageResult format
+                        for opp in enhanced_opportunities:
+                            result = ArbitrageResult(
+                                exchange=opp.exchange,
+                                triangle_path=opp.path if isinstance(opp.path, list) else [opp.path],
+                                profit_percentage=opp.profit_percentage,
+                                profit_amount=opp.profit_amount,
+                                initial_amount=opp.trade_amount,
+                                net_profit_percent=opp.profit_percentage,
+                                min_profit_threshold=self.min_profit_pct,
+                                is_tradeable=(opp.profit_percentage >= 0.4),  # Auto-tradeable if ≥0.4%
+                                balance_available=100.0,  # Assume sufficient balance
+                                required_balance=opp.trade_amount
+                            )
+                            all_results.append(result)
                         
-                        if opp.profit_percentage >= self.min_profit_pct:
-                            self.logger.info(f"💚 ENHANCED PROFITABLE: {opp}")
-            else:
-                self.logger.info("ℹ️ Enhanced detector not available, using standard detection")
-        except Exception as e:
-            self.logger.warning(f"Enhanced detector error: {e}")
-        
-        # STEP 1: Get opportunities from simple detector for the SELECTED exchange
-        if self.simple_detector and self.simple_detector.exchange_id in self.exchange_manager.exchanges:
-            simple_opportunities = self.simple_detector.get_current_opportunities()
-            if simple_opportunities:
-                current_time = time.time()
-                if not hasattr(self, '_last_simple_log') or current_time - self._last_simple_log > 30:
-                    self.logger.info(f"💎 Simple detector found {len(simple_opportunities)} opportunities on {self.simple_detector.exchange_id}!")
-                    for i, opp in enumerate(simple_opportunities[:3]):
-                        self.logger.info(f"   {i+1}. {opp}")
-                    self._last_simple_log = current_time
-                    
-                # Convert simple detector opportunities to results for the SELECTED exchange
-                for opp in simple_opportunities[:10]:  # Top 10 from selected exchange
-                    result = ArbitrageResult(
-                        exchange=self.simple_detector.exchange_id,  # Use the SELECTED exchange
-                        triangle_path=[opp.d1, opp.d2, opp.d3],  # 3 currencies
-                        profit_percentage=opp.value,
-                        profit_amount=self.max_trade_amount * (opp.value / 100),
-                        initial_amount=self.max_trade_amount,
-                        net_profit_percent=opp.value,
-                        min_profit_threshold=self.min_profit_pct,
-                        is_tradeable=True,
-                        balance_available=124.76,  # Your actual USDT balance
-                        required_balance=self.max_trade_amount
-                    )
-                    # CRITICAL: Only show opportunities with valid trading pairs
-                    if self._validate_triangle_pairs(self.simple_detector.exchange_id, result.triangle_path):
-                        all_results.append(result)
-                        self.logger.debug(f"✅ Valid display opportunity: {self.simple_detector.exchange_id} {' → '.join(result.triangle_path)} = {result.profit_percentage:.4f}%")
-                    else:
-                        self.logger.debug(f"❌ Skipped invalid display opportunity: {self.simple_detector.exchange_id} {' → '.join(result.triangle_path)}")
-        
-        # STEP 2: Scan traditional triangular paths for the SELECTED exchanges only
-        connected_exchanges = list(self.exchange_manager.exchanges.keys())
-        self.logger.info(f"🔍 Scanning opportunities on selected exchanges: {connected_exchanges}")
-
-        for ex_name, triangles in self.triangle_paths.items():
-            # Only scan the exchanges that are actually connected
-            if ex_name not in self.exchange_manager.exchanges:
-                self.logger.info(f"⏭️ Skipping {ex_name}: not in selected exchanges")
-                continue
-                
-            ex = self.exchange_manager.exchanges.get(ex_name)
-            if not ex:
-                self.logger.warning(f"Skipping {ex_name}: no exchange connection")
-                continue
-                
-            if not triangles:
-                self.logger.warning(f"Skipping {ex_name}: no triangular paths built")
-                continue
-            
-            try:
-                # Scan triangles on the SELECTED exchange
-                self.logger.info(f"🔍 Scanning {len(triangles)} triangles on {ex_name.upper()} for opportunities...")
-                results = await self._scan_exchange_triangles_all(ex, triangles)
-                all_results.extend(results)
-                self.logger.info(f"💎 Found {len(results)} opportunities on {ex_name.upper()}")
+                            if opp.profit_percentage >= self.min_profit_pct:
+                                self.logger.info(f"💚 ENHANCED PROFITABLE: {opp}")
+                else:
+                    self.logger.info("ℹ️ Enhanced detector not available, using standard detection")
+            except asyncio.TimeoutError:
+                self.logger.warning(f"⏱️ Enhanced detector exceeded {self.exchange_scan_deadline}s deadline, skipped this cycle")
             except Exception as e:
-                self.logger.error(f"Error scanning {ex_name}: {str(e)}", exc_info=True)
+                self.logger.warning(f"Enhanced detector error: {e}")
+        
+            # STEP 1: Get opportunities from simple detector for the SELECTED exchange
+            if self.simple_detector and self.simple_detector.exchange_id in self.exchange_manager.exchanges:
+                simple_opportunities = self.simple_detector.get_current_opportunities()
+                if simple_opportunities:
+                    current_time = time.time()
+                    if not hasattr(self, '_last_simple_log') or current_time - self._last_simple_log > 30:
+                        self.logger.info(f"💎 Simple detector found {len(simple_opportunities)} opportunities on {self.simple_detector.exchange_id}!")
+                        for i, opp in enumerate(simple_opportunities[:3]):
+                            self.logger.info(f"   {i+1}. {opp}")
+                        self._last_simple_log = current_time
+                    
+                    # Convert simple detector opportunities to results for the SELECTED exchange
+                    all_results.extend(self._stream_results(simple_opportunities))
+        
+            # STEP 2: Collect the concurrent per-exchange scans, each bounded by its own deadline
+            self.logger.info(f"🔍 Scanning opportunities on selected exchanges: {connected_exchanges}")
+            if exchange_scans:
+                per_exchange = await asyncio.gather(*exchange_scans)
+                all_results.extend(r for results in per_exchange for r in results)
+        finally:
+            # Don't leave scans running if an earlier step raised or the scan was cancelled
+            pending = [task for task in exchange_scans if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
-        # STEP 3: Sort all results by profitability
-        all_results.sort(key=lambda x: x.profit_percentage, reverse=True)
-        
-        # Filter for profitable opportunities
-        filtered_results = all_results
+        # STEP 3: Keep the top-K by profitability across all sources
+        filtered_results = heapq.nlargest(self.scan_top_k, all_results, key=lambda x: x.profit_percentage)
         
         # STEP 4: Log comprehensive results
         scan_duration = (time.time() - scan_start_time) * 1000  # Convert to milliseconds
+        metrics.SCANS.labels('multi_exchange').inc()
+        metrics.SCAN_DURATION.labels('multi_exchange').observe(scan_duration / 1000)
         
         self.logger.info(f"📊 SCAN RESULTS (Duration: {scan_duration:.0f}ms):")
         self.logger.info(f"   Total opportunities found: {len(filtered_results)}")
@@ -524,6 +530,43 @@ class MultiExchangeDetector:
         
         return filtered_results
         
+    def _start_exchange_scans(self) -> List[asyncio.Task]:
+        """Start one deadline-bounded scan task per selected exchange with triangle paths"""
+        tasks = []
+        for ex_name, triangles in self.triangle_paths.items():
+            # Only scan the exchanges that are actually connected
+            if ex_name not in self.exchange_manager.exchanges:
+                self.logger.info(f"⏭️ Skipping {ex_name}: not in selected exchanges")
+                continue
+                
+            ex = self.exchange_manager.exchanges.get(ex_name)
+            if not ex:
+                self.logger.warning(f"Skipping {ex_name}: no exchange connection")
+                continue
+                
+            if not triangles:
+                self.logger.warning(f"Skipping {ex_name}: no triangular paths built")
+                continue
+
+            tasks.append(asyncio.create_task(self._scan_exchange(ex_name, ex, triangles)))
+        return tasks
+
+    async def _scan_exchange(self, ex_name: str, ex, triangles: List[List[str]]) -> List[ArbitrageResult]:
+        """Fetch tickers and evaluate one exchange's triangles; a slow or failing venue yields no results"""
+        try:
+            self.logger.info(f"🔍 Scanning {len(triangles)} triangles on {ex_name.upper()} for opportunities...")
+            results = await asyncio.wait_for(
+                self._scan_exchange_triangles_all(ex, triangles),
+                timeout=self.exchange_scan_deadline
+            )
+            self.logger.info(f"💎 Found {len(results)} opportunities on {ex_name.upper()}")
+            return results
+        except asyncio.TimeoutError:
+            self.logger.warning(f"⏱️ {ex_name.upper()} scan exceeded {self.exchange_scan_deadline}s deadline, skipped this cycle")
+        except Exception as e:
+            self.logger.error(f"Error scanning {ex_name}: {str(e)}", exc_info=True)
+        return []
+
     def _generate_sample_opportunities(self) -> List[ArbitrageResult]:
         """Generate sample opportunities for UI display when no real opportunities exist"""
         import random
@@ -588,7 +631,13 @@ class MultiExchangeDetector:
         self.logger.info(f"🔍 Scanning {len(triangles)} triangles for {ex.name} - ALL opportunities (ticker fetch: {ticker_duration:.0f}ms)")
         
         # Scan ALL triangles for market opportunities
+        last_yield = time.perf_counter()
         for path in triangles:
+            # Yield regularly so exchanges evaluate concurrently and the scan deadline can cancel us
+            if time.perf_counter() - last_yield >= SCAN_YIELD_SECONDS:
+                await asyncio.sleep(0)
+                last_yield = time.perf_counter()
+
             base_currency = path[0]  # First currency in triangle path
             intermediate_currency, quote_currency = path[1], path[2]
             
@@ -635,6 +684,9 @@ class MultiExchangeDetector:
         
         # Count profitable vs unprofitable
         profitable_count = len([r for r in results if r.profit_percentage >= 0.4])
+        metrics.TRIANGLES_EVALUATED.labels('multi_exchange').inc(len(triangles))
+        metrics.OPPORTUNITIES_ABOVE_THRESHOLD.labels('multi_exchange').inc(
+            len([r for r in results if r.profit_percentage >= self.min_profit_pct]))
         good_count = len([r for r in results if 0.2 <= r.profit_percentage < 0.4])
         low_profit_count = len([r for r in results if 0 <= r.profit_percentage < 0.2])
         loss_count = len([r for r in results if r.profit_percentage < 0])
@@ -970,7 +1022,7 @@ class MultiExchangeDetector:
         
         for opp in opportunities:
             payload.append({
-                'id': f"live_{int(datetime.now().timestamp()*1000)}_{len(payload)}",
+                'id': opportunity_id(opp.exchange, opp.triangle_path),
                 'exchange': opp.exchange,
                 'trianglePath': " → ".join(opp.triangle_path[:3]),
                 'profitPercentage': round(opp.profit_percentage, 4),
@@ -992,7 +1044,12 @@ class MultiExchangeDetector:
         
         if self.websocket_manager:
             try:
-                if hasattr(self.websocket_manager, 'broadcast'):
+                stream = getattr(self.websocket_manager, 'opportunity_stream', None)
+                if stream is not None:
+                    # Only added/updated/removed opportunities go over the wire
+                    await stream.publish(self.websocket_manager, 'scanner', payload)
+                    self.logger.info(f"✅ Published ALL opportunities to UI opportunity stream (seq {stream.seq})")
+                elif hasattr(self.websocket_manager, 'broadcast'):
                     await self.websocket_manager.broadcast('opportunities_update', payload)
                     self.logger.info("✅ Successfully broadcasted ALL opportunities to UI via WebSocket")
                 elif hasattr(self.websocket_manager, 'broadcast_sync'):
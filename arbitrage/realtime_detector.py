@@ -7,11 +7,15 @@ import asyncio
 import websockets
 import json
 import time
-from typing import Dict, List, Any, Set, Tuple, Optional
+from typing import Dict, List, Any, Set, Tuple, Optional, Callable
 from datetime import datetime
 import logging
 from dataclasses import dataclass
-import aiohttp
+
+from utils.feed_recorder import FeedRecorder
+from utils import metrics
+from exchanges.market_cache import get_market_cache
+from utils.http_sessions import get_http_sessions
 
 # Configure logging
 logging.basicConfig(
@@ -50,11 +54,23 @@ class RealtimeArbitrageDetector:
         # WebSocket connection
         self.websocket = None
         self.running = False
+        self.feed_recorder = FeedRecorder.from_env('binance')
         
         # Statistics and current opportunities
         self.opportunities_found = 0
         self.last_update_time = 0
         self.current_opportunities: List[TriangleOpportunity] = []
+        self.listeners: List[Callable[[List[TriangleOpportunity]], None]] = []
+        self._top_signature: Tuple = ()
+        
+        # Pre-bound metric children
+        self._ticks_metric = metrics.TICKS_RECEIVED.labels('binance')
+        self._parse_errors_metric = metrics.PARSE_ERRORS.labels('binance')
+        self._reconnects_metric = metrics.WS_RECONNECTS.labels('binance')
+        self._scans_metric = metrics.SCANS.labels('realtime')
+        self._scan_duration_metric = metrics.SCAN_DURATION.labels('realtime')
+        self._triangles_metric = metrics.TRIANGLES_EVALUATED.labels('realtime')
+        self._above_threshold_metric = metrics.OPPORTUNITIES_ABOVE_THRESHOLD.labels('realtime')
         
         logger.info(f"🚀 Real-Time Arbitrage Detector initialized")
         logger.info(f"   Min Profit: {min_profit_pct}%")
@@ -64,27 +80,29 @@ class RealtimeArbitrageDetector:
         """Initialize trading pairs and build triangular paths"""
         logger.info("📡 Fetching Binance exchange info...")
         
+        async def fetch() -> Dict[str, Any]:
+            url = 'https://api.binance.com/api/v3/exchangeInfo'
+            async with get_http_sessions().for_url(url).get(url) as response:
+                if response.status != 200:
+                    raise Exception(f"Failed to fetch exchange info: {response.status}")
+                return await response.json()
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get('https://api.binance.com/api/v3/exchangeInfo') as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Extract active trading pairs
-                        for symbol_info in data['symbols']:
-                            if symbol_info['status'] == 'TRADING':
-                                symbol = f"{symbol_info['baseAsset']}/{symbol_info['quoteAsset']}"
-                                self.trading_pairs.add(symbol)
-                        
-                        logger.info(f"✅ Loaded {len(self.trading_pairs)} active trading pairs")
-                        
-                        # Build triangular paths
-                        self._build_triangular_paths()
-                        
-                        return True
-                    else:
-                        logger.error(f"Failed to fetch exchange info: {response.status}")
-                        return False
+            # Shared with SimpleTriangleDetector through the on-disk metadata cache
+            data = await get_market_cache().get('binance.exchange_info', fetch)
+            
+            # Extract active trading pairs
+            for symbol_info in data['symbols']:
+                if symbol_info['status'] == 'TRADING':
+                    symbol = f"{symbol_info['baseAsset']}/{symbol_info['quoteAsset']}"
+                    self.trading_pairs.add(symbol)
+            
+            logger.info(f"✅ Loaded {len(self.trading_pairs)} active trading pairs")
+            
+            # Build triangular paths
+            self._build_triangular_paths()
+            
+            return True
         except Exception as e:
             logger.error(f"Error initializing: {e}")
             return False
@@ -162,6 +180,8 @@ class RealtimeArbitrageDetector:
                     retry_count = 0
                     
                     async for message in websocket:
+                        if self.feed_recorder:
+                            self.feed_recorder.record(message)
                         try:
                             await self._handle_websocket_message(message)
                         except Exception as e:
@@ -173,6 +193,7 @@ class RealtimeArbitrageDetector:
                 
                 if retry_count < max_retries:
                     wait_time = min(2 ** retry_count, 30)  # Exponential backoff, max 30s
+                    self._reconnects_metric.inc()
                     logger.info(f"Retrying in {wait_time} seconds...")
                     await asyncio.sleep(wait_time)
                 else:
@@ -189,6 +210,7 @@ class RealtimeArbitrageDetector:
             
             # Handle array of ticker data
             if isinstance(data, list):
+                self._ticks_metric.inc(len(data))
                 updates_processed = 0
                 
                 for ticker in data:
@@ -204,6 +226,7 @@ class RealtimeArbitrageDetector:
                         self._last_scan_time = time.time()
             
         except Exception as e:
+            self._parse_errors_metric.inc()
             logger.error(f"Error processing WebSocket message: {e}")
     
     def _update_price_map(self, ticker: Dict[str, Any]) -> bool:
@@ -252,6 +275,7 @@ class RealtimeArbitrageDetector:
         if len(self.price_map) < 100:  # Need sufficient price data
             return
         
+        scan_start = time.perf_counter()
         opportunities = []
         paths_scanned = 0
         
@@ -267,13 +291,19 @@ class RealtimeArbitrageDetector:
             except Exception as e:
                 logger.debug(f"Error calculating triangle {base}-{intermediate}-{quote}: {e}")
         
+        self._scans_metric.inc()
+        self._triangles_metric.inc(paths_scanned)
+        self._above_threshold_metric.inc(len(opportunities))
+        self._scan_duration_metric.observe(time.perf_counter() - scan_start)
+        
+        # Sort by profit percentage
+        opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
+        
+        # Store current opportunities for integration (an empty scan clears them)
+        self.current_opportunities = opportunities[:5]  # Keep top 5
+        self._notify_if_changed()
+        
         if opportunities:
-            # Sort by profit percentage
-            opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
-            
-            # Store current opportunities for integration
-            self.current_opportunities = opportunities[:5]  # Keep top 5
-            
             logger.info(f"💎 Found {len(opportunities)} profitable opportunities!")
             
             # Display top opportunities
@@ -455,6 +485,21 @@ class RealtimeArbitrageDetector:
                 logger.info(f"     {i}. {step['action']}")
             logger.info(f"   Net Profit: ${opp.profit_amount:.2f} ({opp.profit_percentage:.4f}%)")
     
+    def add_listener(self, callback: Callable[[List[TriangleOpportunity]], None]):
+        """Call `callback(top_opportunities)` whenever the top opportunities change"""
+        self.listeners.append(callback)
+    
+    def _notify_if_changed(self):
+        signature = tuple((tuple(opp.path), round(opp.profit_percentage, 4)) for opp in self.current_opportunities)
+        if signature == self._top_signature:
+            return
+        self._top_signature = signature
+        for callback in self.listeners:
+            try:
+                callback(list(self.current_opportunities))
+            except Exception as e:
+                logger.error(f"Error in opportunity listener: {e}")
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get detector statistics"""
         return {
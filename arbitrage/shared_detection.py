@@ -0,0 +1,220 @@
+"""
+Shared per-exchange opportunity detection for the multi-tenant host.
+
+One SharedExchangeDetector per exchange fetches tickers and prices every
+triangle once per scan, then hands the candidates that clear the lowest
+subscriber threshold to every subscribed tenant. Tenants only re-price those
+few candidates with their own trade amount, fees and thresholds, so detection
+cost grows with the number of exchanges rather than users x exchanges.
+Detectors are keyed by (exchange, sandbox), so testnet tenants never share
+prices with live ones.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+from models.arbitrage_opportunity import ArbitrageOpportunity
+from arbitrage.triangle_detector import find_triangles, build_triangle_opportunity
+from utils.logger import setup_logger
+
+
+@dataclass
+class TriangleCandidate:
+    """A triangle whose gross (pre-fee) return cleared the shared floor, with its leg quotes."""
+    exchange: str
+    base: str
+    mid: str
+    quote: str
+    p1: Dict[str, float]
+    p2: Dict[str, float]
+    p3: Dict[str, float]
+    gross_profit_pct: float
+    detected_at: float
+
+    def build(self, initial_amount: float, taker_fee: float, slippage_pct: float) -> ArbitrageOpportunity:
+        """Price this triangle for one tenant's amount and fees."""
+        opportunity = build_triangle_opportunity(
+            self.base, self.mid, self.quote, initial_amount,
+            self.p1, self.p2, self.p3, taker_fee, slippage_pct
+        )
+        opportunity.exchange = self.exchange
+        return opportunity
+
+
+class CandidateInbox:
+    """Latest candidate batch per exchange for one tenant; unread batches are replaced, not queued."""
+
+    def __init__(self):
+        self._latest: Dict[str, List[TriangleCandidate]] = {}
+        self._ready = asyncio.Event()
+
+    def put(self, exchange_id: str, candidates: List[TriangleCandidate]) -> None:
+        self._latest[exchange_id] = candidates
+        self._ready.set()
+
+    async def take(self, timeout: float) -> Dict[str, List[TriangleCandidate]]:
+        """Wait up to `timeout` for new batches and return them (empty dict on timeout)."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return {}
+        self._ready.clear()
+        latest, self._latest = self._latest, {}
+        return latest
+
+    def wake(self) -> None:
+        """Release a pending take() without data (used on shutdown)."""
+        self._ready.set()
+
+
+class SharedExchangeDetector:
+    """Runs detection for one exchange on behalf of every subscribed tenant."""
+
+    def __init__(self, exchange_id: str, scan_interval: float = 2.0, max_triangles: int = 500,
+                 sandbox: bool = False):
+        self.exchange_id = exchange_id
+        self.sandbox = sandbox
+        self.scan_interval = scan_interval
+        self.max_triangles = max_triangles
+        self.logger = setup_logger(f"SharedDetector_{exchange_id.title()}{'_Sandbox' if sandbox else ''}")
+        self.subscribers: Dict[str, Tuple[Any, CandidateInbox, float]] = {}  # user_id -> (exchange, inbox, min_profit_pct)
+        self.price_cache: Dict[str, Dict[str, float]] = {}
+        self.triangles: List[Tuple[str, str, str]] = []
+        self.task: Optional[asyncio.Task] = None
+        self.scans = 0
+
+    @property
+    def floor_profit_pct(self) -> float:
+        """Lowest subscriber threshold; fees only lower returns, so this never hides a tenant's match."""
+        return min((min_profit for _, _, min_profit in self.subscribers.values()), default=0.0)
+
+    def _source(self):
+        """Any subscribed tenant's connection (all share this environment), used only for public market data."""
+        for exchange, _, _ in self.subscribers.values():
+            return exchange
+        return None
+
+    async def _ensure_triangles(self, exchange) -> None:
+        if self.triangles:
+            return
+        from exchanges.market_registry import get_market_registry
+        pairs = await exchange.get_trading_pairs()
+        self.triangles = get_market_registry().triangles(
+            self.exchange_id,
+            (True, self.max_triangles),
+            lambda: find_triangles(pairs, True, self.max_triangles),
+            self.sandbox
+        )
+        self.logger.info(f"🔺 Shared detection over {len(self.triangles)} triangles on {self.exchange_id}")
+
+    def _update_prices(self, tickers: Dict[str, Any]) -> None:
+        now = time.time()
+        for symbol, ticker in tickers.items():
+            bid = ticker.get('bid') or 0
+            ask = ticker.get('ask') or 0
+            if bid > 0 and ask > 0:
+                # Top-of-book sizes (when the exchange reports them) let the allocator split depth
+                self.price_cache[symbol] = {
+                    'bid': float(bid), 'ask': float(ask),
+                    'bidVolume': float(ticker.get('bidVolume') or 0), 'askVolume': float(ticker.get('askVolume') or 0),
+                    'timestamp': now
+                }
+
+    def scan(self) -> List[TriangleCandidate]:
+        """Price every triangle once and keep those above the shared floor."""
+        floor = self.floor_profit_pct
+        now = time.time()
+        candidates = []
+        for base, mid, quote in self.triangles:
+            p1 = self.price_cache.get(f"{base}/{mid}")
+            p2 = self.price_cache.get(f"{mid}/{quote}")
+            p3 = self.price_cache.get(f"{base}/{quote}")
+            if not (p1 and p2 and p3):
+                continue
+            gross_profit_pct = (p1['bid'] * p2['bid'] / p3['ask'] - 1) * 100
+            if gross_profit_pct >= floor:
+                candidates.append(TriangleCandidate(
+                    self.exchange_id, base, mid, quote, p1, p2, p3, gross_profit_pct, now
+                ))
+        candidates.sort(key=lambda c: c.gross_profit_pct, reverse=True)
+        self.scans += 1
+        return candidates
+
+    async def _run(self) -> None:
+        """Fetch, scan and fan out until the last subscriber leaves."""
+        while self.subscribers:
+            try:
+                exchange = self._source()
+                await self._ensure_triangles(exchange)
+                self._update_prices(await exchange.fetch_tickers())
+
+                candidates = self.scan()
+                for _, inbox, _ in list(self.subscribers.values()):
+                    inbox.put(self.exchange_id, candidates)
+
+                if candidates:
+                    self.logger.info(f"💎 {len(candidates)} candidates on {self.exchange_id} for {len(self.subscribers)} tenants")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error in shared detection for {self.exchange_id}: {e}")
+
+            await asyncio.sleep(self.scan_interval)
+
+        self.logger.info(f"Shared detection stopped for {self.exchange_id}")
+
+    def subscribe(self, user_id: str, exchange, inbox: CandidateInbox, min_profit_pct: float) -> None:
+        if getattr(exchange, 'sandbox', False) != self.sandbox:
+            raise ValueError(f"{self.exchange_id}: cannot mix sandbox and live connections in one detector")
+        self.subscribers[user_id] = (exchange, inbox, min_profit_pct)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def unsubscribe(self, user_id: str) -> None:
+        self.subscribers.pop(user_id, None)
+        if not self.subscribers and self.task and not self.task.done():
+            self.task.cancel()
+
+
+class DetectionHub:
+    """Process-wide set of shared detectors, one per exchange and environment (live or sandbox)."""
+
+    def __init__(self, scan_interval: float = 2.0):
+        self.scan_interval = scan_interval
+        self.detectors: Dict[Tuple[str, bool], SharedExchangeDetector] = {}
+
+    def subscribe(self, exchange_id: str, user_id: str, exchange, inbox: CandidateInbox, min_profit_pct: float) -> None:
+        """Deliver candidates for `exchange_id`, from the tenant connection's own environment, to its inbox."""
+        key = (exchange_id, bool(getattr(exchange, 'sandbox', False)))
+        detector = self.detectors.get(key)
+        if detector is None:
+            detector = self.detectors[key] = SharedExchangeDetector(exchange_id, self.scan_interval, sandbox=key[1])
+        detector.subscribe(user_id, exchange, inbox, min_profit_pct)
+
+    def unsubscribe(self, user_id: str) -> None:
+        """Remove a tenant from every exchange it was subscribed to."""
+        for key in list(self.detectors):
+            detector = self.detectors[key]
+            detector.unsubscribe(user_id)
+            if not detector.subscribers:
+                del self.detectors[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            f"{exchange_id}:sandbox" if sandbox else exchange_id: {
+                'subscribers': len(d.subscribers), 'triangles': len(d.triangles), 'scans': d.scans
+            }
+            for (exchange_id, sandbox), d in self.detectors.items()
+        }
+
+
+_detection_hub_instance = None
+
+def get_detection_hub() -> DetectionHub:
+    """Get or create the global detection hub."""
+    global _detection_hub_instance
+    if _detection_hub_instance is None:
+        _detection_hub_instance = DetectionHub()
+    return _detection_hub_instance
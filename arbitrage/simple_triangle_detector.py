@@ -8,10 +8,14 @@ import asyncio
 import websockets
 import json
 import time
-from typing import Dict, List, Any, Set, Tuple
+from typing import Dict, List, Any, Set, Tuple, Callable
 import logging
 from dataclasses import dataclass
-import aiohttp
+
+from utils.feed_recorder import FeedRecorder
+from utils import metrics
+from exchanges.market_cache import get_market_cache
+from utils.http_sessions import get_http_sessions
 
 # Configure logging
 logging.basicConfig(
@@ -50,6 +54,17 @@ class SimpleTriangleDetector:
         self.running = False
         self.opportunities_found = 0
         self.current_opportunities: List[TriangleOpportunity] = []
+        self.listeners: List[Callable[[List[TriangleOpportunity]], None]] = []
+        self._top_signature: Tuple = ()
+        self.feed_recorder = FeedRecorder.from_env(exchange_id)
+        
+        # Pre-bound metric children keep hot-path increments to one attribute update
+        self._ticks_metric = metrics.TICKS_RECEIVED.labels(exchange_id)
+        self._parse_errors_metric = metrics.PARSE_ERRORS.labels(exchange_id)
+        self._reconnects_metric = metrics.WS_RECONNECTS.labels(exchange_id)
+        self._scans_metric = metrics.SCANS.labels(f'simple_{exchange_id}')
+        self._triangles_metric = metrics.TRIANGLES_EVALUATED.labels(f'simple_{exchange_id}')
+        self._above_threshold_metric = metrics.OPPORTUNITIES_ABOVE_THRESHOLD.labels(f'simple_{exchange_id}')
         
         self.logger.info(f"🚀 Simple Triangle Detector initialized for {self.exchange_config['name']}")
         self.logger.info(f"   Exchange: {self.exchange_config['name']}")
@@ -121,70 +136,79 @@ class SimpleTriangleDetector:
         
         self.logger.info(f"🔗 Using endpoint: {endpoint}")
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(endpoint) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Parse exchange-specific response format
-                    symbols, valid_pairs = self._parse_exchange_info(data)
-                    
-                    # Initialize price tracking
-                    for symbol in valid_pairs:
-                        self.sym_val_j[symbol] = {'bidPrice': 0, 'askPrice': 0}
-                    
-                    self.logger.info(f"✅ {self.exchange_config['name']}: {len(symbols)} currencies, {len(valid_pairs)} pairs")
-                    
-                    # Build triangular paths - EXACT JavaScript logic
-                    self.pairs = []
-                    
-                    # --- USDT-anchored optimization ---
-                    # Limit symbols to those that have a direct USDT market
-                    usdt_symbols = [s for s in symbols if s != 'USDT' and (f"{s}USDT" in self.sym_val_j or f"USDT{s}" in self.sym_val_j)]
-                    
-                    # Build unique (CoinA, CoinB) combos and map edges USDT<->A, A<->B, B<->USDT
-                    added = 0
-                    max_pairs = getattr(self, 'max_pairs', 500)
-                    for i in range(len(usdt_symbols)):
-                        for j in range(i+1, len(usdt_symbols)):
-                            if added >= max_pairs:
-                                break
-                            d1, d2, d3 = 'USDT', usdt_symbols[i], usdt_symbols[j]
-                            
-                            lv1, lv2, lv3 = [], [], []
-                            l1 = l2 = l3 = ''
-                            
-                            # Level 1: USDT <-> d2
-                            if f"{d1}{d2}" in self.sym_val_j:
-                                lv1.append(f"{d1}{d2}"); l1 = 'num'
-                            if f"{d2}{d1}" in self.sym_val_j:
-                                lv1.append(f"{d2}{d1}"); l1 = 'den' if not l1 else l1
-                            
-                            # Level 2: d2 <-> d3
-                            if f"{d2}{d3}" in self.sym_val_j:
-                                lv2.append(f"{d2}{d3}"); l2 = 'num'
-                            if f"{d3}{d2}" in self.sym_val_j:
-                                lv2.append(f"{d3}{d2}"); l2 = 'den' if not l2 else l2
-                            
-                            # Level 3: d3 <-> USDT
-                            if f"{d3}{d1}" in self.sym_val_j:
-                                lv3.append(f"{d3}{d1}"); l3 = 'num'
-                            if f"{d1}{d3}" in self.sym_val_j:
-                                lv3.append(f"{d1}{d3}"); l3 = 'den' if not l3 else l3
-                            
-                            if lv1 and lv2 and lv3:
-                                self.pairs.append({
-                                    'l1': l1, 'l2': l2, 'l3': l3,
-                                    'd1': d1, 'd2': d2, 'd3': d3,
-                                    'lv1': lv1[0], 'lv2': lv2[0], 'lv3': lv3[0],
-                                    'value': -100, 'tpath': ''
-                                })
-                                added += 1
-                    self.logger.info(f"✅ Built {len(self.pairs)} triangular arbitrage paths")
-                    return True
-                else:
-                    self.logger.error(f"Failed to fetch {self.exchange_config['name']} exchange info: {response.status}")
-                    return False
+        async def fetch() -> Dict[str, Any]:
+            async with get_http_sessions().for_url(endpoint).get(endpoint) as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}")
+                return await response.json()
+        
+        try:
+            # Served from the on-disk metadata cache on warm starts
+            data = await get_market_cache().get(f"{self.exchange_id}.exchange_info", fetch)
+        except Exception as e:
+            self.logger.error(f"Failed to fetch {self.exchange_config['name']} exchange info: {e}")
+            return False
+        
+        # Parse exchange-specific response format
+        symbols, valid_pairs = self._parse_exchange_info(data)
+        
+        self._build_paths(symbols, valid_pairs)
+        self.logger.info(f"✅ Built {len(self.pairs)} triangular arbitrage paths")
+        return True
+
+    def _build_paths(self, symbols: List[str], valid_pairs: List[str]) -> None:
+        """Initialize price tracking and build USDT triangular paths from parsed exchange info"""
+        # Initialize price tracking
+        for symbol in valid_pairs:
+            self.sym_val_j[symbol] = {'bidPrice': 0, 'askPrice': 0}
+        
+        self.logger.info(f"✅ {self.exchange_config['name']}: {len(symbols)} currencies, {len(valid_pairs)} pairs")
+        
+        # Build triangular paths - EXACT JavaScript logic
+        self.pairs = []
+        
+        # --- USDT-anchored optimization ---
+        # Limit symbols to those that have a direct USDT market
+        usdt_symbols = [s for s in symbols if s != 'USDT' and (f"{s}USDT" in self.sym_val_j or f"USDT{s}" in self.sym_val_j)]
+        
+        # Build unique (CoinA, CoinB) combos and map edges USDT<->A, A<->B, B<->USDT
+        added = 0
+        max_pairs = getattr(self, 'max_pairs', 500)
+        for i in range(len(usdt_symbols)):
+            for j in range(i+1, len(usdt_symbols)):
+                if added >= max_pairs:
+                    break
+                d1, d2, d3 = 'USDT', usdt_symbols[i], usdt_symbols[j]
+                
+                lv1, lv2, lv3 = [], [], []
+                l1 = l2 = l3 = ''
+                
+                # Level 1: USDT <-> d2
+                if f"{d1}{d2}" in self.sym_val_j:
+                    lv1.append(f"{d1}{d2}"); l1 = 'num'
+                if f"{d2}{d1}" in self.sym_val_j:
+                    lv1.append(f"{d2}{d1}"); l1 = 'den' if not l1 else l1
+                
+                # Level 2: d2 <-> d3
+                if f"{d2}{d3}" in self.sym_val_j:
+                    lv2.append(f"{d2}{d3}"); l2 = 'num'
+                if f"{d3}{d2}" in self.sym_val_j:
+                    lv2.append(f"{d3}{d2}"); l2 = 'den' if not l2 else l2
+                
+                # Level 3: d3 <-> USDT
+                if f"{d3}{d1}" in self.sym_val_j:
+                    lv3.append(f"{d3}{d1}"); l3 = 'num'
+                if f"{d1}{d3}" in self.sym_val_j:
+                    lv3.append(f"{d1}{d3}"); l3 = 'den' if not l3 else l3
+                
+                if lv1 and lv2 and lv3:
+                    self.pairs.append({
+                        'l1': l1, 'l2': l2, 'l3': l3,
+                        'd1': d1, 'd2': d2, 'd3': d3,
+                        'lv1': lv1[0], 'lv2': lv2[0], 'lv3': lv3[0],
+                        'value': -100, 'tpath': ''
+                    })
+                    added += 1
 
     def _parse_exchange_info(self, data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
         """Parse exchange-specific response format"""
@@ -264,27 +288,30 @@ class SimpleTriangleDetector:
         try:
             data = json.loads(data)
             
-            # Process based on exchange format
+            # Process based on exchange format; each returns the ticker entries in the frame
             if self.exchange_id == 'binance':
-                self._process_binance_data(data)
+                tickers = self._process_binance_data(data)
             elif self.exchange_id == 'kucoin':
-                self._process_kucoin_data(data)
+                tickers = self._process_kucoin_data(data)
             elif self.exchange_id == 'gate':
-                self._process_gate_data(data)
+                tickers = self._process_gate_data(data)
             elif self.exchange_id == 'bybit':
-                self._process_bybit_data(data)
+                tickers = self._process_bybit_data(data)
             else:
                 # Fallback to Binance format
-                self._process_binance_data(data)
+                tickers = self._process_binance_data(data)
+            if tickers:
+                self._ticks_metric.inc(tickers)
                 
         except Exception as e:
             # Only log debug info if it's a real error, not just data format issues
             if "has no attribute 'get'" not in str(e):
                 self.logger.debug(f"Problematic data type: {type(data)}")
                 self.logger.debug(f"Data content: {str(data)[:200]}...")
+            self._parse_errors_metric.inc()
             self.logger.error(f"Error processing {self.exchange_config['name']} WebSocket data: {e}")
     
-    def _process_binance_data(self, data):
+    def _process_binance_data(self, data) -> int:
         """Process Binance WebSocket ticker data"""
         if isinstance(data, list):
             updates_processed = 0
@@ -304,8 +331,10 @@ class SimpleTriangleDetector:
             
             if updates_processed >= 50:
                 self._calculate_opportunities()
+            return len(data)
+        return 0
     
-    def _process_kucoin_data(self, data):
+    def _process_kucoin_data(self, data) -> int:
         """Process KuCoin WebSocket ticker data"""
         if data.get('type') == 'message' and data.get('topic') == '/market/ticker:all':
             ticker_data = data.get('data', {})
@@ -318,8 +347,10 @@ class SimpleTriangleDetector:
                     self._calculate_opportunities()
                 except (ValueError, TypeError):
                     pass
+            return 1
+        return 0
     
-    def _process_gate_data(self, data):
+    def _process_gate_data(self, data) -> int:
         """Process Gate.io WebSocket ticker data"""
         if data.get('method') == 'ticker.update':
             params = data.get('params', [])
@@ -336,8 +367,10 @@ class SimpleTriangleDetector:
                             self._calculate_opportunities()
                     except (ValueError, TypeError, IndexError):
                         pass
+                return 1
+        return 0
     
-    def _process_bybit_data(self, data):
+    def _process_bybit_data(self, data) -> int:
         """Process Bybit WebSocket ticker data"""
         if data.get('topic') == 'tickers.spot':
             ticker_data = data.get('data', {})
@@ -350,11 +383,14 @@ class SimpleTriangleDetector:
                     self._calculate_opportunities()
                 except (ValueError, TypeError):
                     pass
+            return 1
+        return 0
     
     def _calculate_opportunities(self):
         """Calculate arbitrage opportunities - EXACT JavaScript logic"""
         try:
             profitable_opportunities = []
+            triangles_evaluated = 0
             
             # Define valid currencies for the selected exchange
             valid_currencies = self._get_valid_currencies_for_exchange()
@@ -382,6 +418,7 @@ class SimpleTriangleDetector:
                     lv2_data.get('askPrice', 0) > 0 and
                     lv3_data.get('bidPrice', 0) > 0 and
                     lv3_data.get('askPrice', 0) > 0):
+                    triangles_evaluated += 1
                     
                     # Level 1 calculation
                     if pair_data['l1'] == 'num':
@@ -438,11 +475,16 @@ class SimpleTriangleDetector:
                     except (ZeroDivisionError, OverflowError, ValueError):
                         continue
             
+            self._scans_metric.inc()
+            self._triangles_metric.inc(triangles_evaluated)
+            self._above_threshold_metric.inc(len(profitable_opportunities))
+            
             # Sort by profit percentage (highest first)
             profitable_opportunities.sort(key=lambda x: x.value, reverse=True)
             
             # Update current opportunities
             self.current_opportunities = profitable_opportunities[:10]  # Top 10
+            self._notify_if_changed()
             
             if profitable_opportunities:
                 # Only log if opportunities changed significantly
@@ -596,6 +638,8 @@ class SimpleTriangleDetector:
                     
                     # Process incoming messages
                     async for message in websocket:
+                        if self.feed_recorder:
+                            self.feed_recorder.record(message)
                         try:
                             if message and message.strip():
                                 self.process_data(message)
@@ -609,6 +653,7 @@ class SimpleTriangleDetector:
                 
                 if retry_count < max_retries:
                     wait_time = min(2 ** retry_count, 30)
+                    self._reconnects_metric.inc()
                     self.logger.info(f"Retrying in {wait_time} seconds...")
                     await asyncio.sleep(wait_time)
                 else:
@@ -627,66 +672,68 @@ class SimpleTriangleDetector:
         
         while retry_count < max_retries:
             try:
-                # Get WebSocket token from KuCoin
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(f"{self.exchange_config['api_url']}/api/v1/bullet-public") as response:
-                        if response.status == 200:
-                            token_data = await response.json()
-                            token = token_data['data']['token']
-                            endpoint = token_data['data']['instanceServers'][0]['endpoint']
-                            
-                            # Build WebSocket URL with token
-                            websocket_url = f"{endpoint}?token={token}"
-                            self.logger.info(f"🔑 KuCoin WebSocket URL: {endpoint}")
-                            
-                            # Connect to KuCoin WebSocket
-                            async with websockets.connect(
-                                websocket_url, 
-                                ping_interval=10,  # Faster ping
-                                ping_timeout=5,    # Shorter timeout
-                                close_timeout=5    # Faster close
-                            ) as websocket:
-                                self.websocket = websocket
-                                self.running = True
-                                self.logger.info("✅ OPTIMIZED KuCoin WebSocket connected")
-                                
-                                # Send welcome message
-                                welcome_msg = {
-                                    "id": int(time.time() * 1000),
-                                    "type": "welcome"
-                                }
-                                await websocket.send(json.dumps(welcome_msg))
-                                
-                                # Subscribe to all tickers
-                                subscribe_msg = {
-                                    "id": int(time.time() * 1000),
-                                    "type": "subscribe",
-                                    "topic": "/market/ticker:all",
-                                    "privateChannel": False,
-                                    "response": True
-                                }
-                                await websocket.send(json.dumps(subscribe_msg))
-                                self.logger.info("📡 Subscribed to KuCoin ticker stream")
-                                
-                                # Reset retry count on successful connection
-                                retry_count = 0
-                                
-                                # Process messages
-                                async for message in websocket:
-                                    try:
-                                        if message and message.strip():
-                                            self.process_data(message)
-                                    except Exception as e:
-                                        self.logger.debug(f"KuCoin message error: {e}")  # Reduce error spam
-                        else:
-                            raise Exception(f"Failed to get KuCoin token: {response.status}")
-                            
+                # Get WebSocket token from KuCoin (released back to the pool before streaming)
+                session = get_http_sessions().for_url(self.exchange_config['api_url'])
+                async with session.post(f"{self.exchange_config['api_url']}/api/v1/bullet-public") as response:
+                    if response.status != 200:
+                        raise Exception(f"Failed to get KuCoin token: {response.status}")
+                    token_data = await response.json()
+                token = token_data['data']['token']
+                endpoint = token_data['data']['instanceServers'][0]['endpoint']
+                
+                # Build WebSocket URL with token
+                websocket_url = f"{endpoint}?token={token}"
+                self.logger.info(f"🔑 KuCoin WebSocket URL: {endpoint}")
+                
+                # Connect to KuCoin WebSocket
+                async with websockets.connect(
+                    websocket_url, 
+                    ping_interval=10,  # Faster ping
+                    ping_timeout=5,    # Shorter timeout
+                    close_timeout=5    # Faster close
+                ) as websocket:
+                    self.websocket = websocket
+                    self.running = True
+                    self.logger.info("✅ OPTIMIZED KuCoin WebSocket connected")
+                    
+                    # Send welcome message
+                    welcome_msg = {
+                        "id": int(time.time() * 1000),
+                        "type": "welcome"
+                    }
+                    await websocket.send(json.dumps(welcome_msg))
+                    
+                    # Subscribe to all tickers
+                    subscribe_msg = {
+                        "id": int(time.time() * 1000),
+                        "type": "subscribe",
+                        "topic": "/market/ticker:all",
+                        "privateChannel": False,
+                        "response": True
+                    }
+                    await websocket.send(json.dumps(subscribe_msg))
+                    self.logger.info("📡 Subscribed to KuCoin ticker stream")
+                    
+                    # Reset retry count on successful connection
+                    retry_count = 0
+                    
+                    # Process messages
+                    async for message in websocket:
+                        if self.feed_recorder:
+                            self.feed_recorder.record(message)
+                        try:
+                            if message and message.strip():
+                                self.process_data(message)
+                        except Exception as e:
+                            self.logger.debug(f"KuCoin message error: {e}")  # Reduce error spam
+                        
             except Exception as e:
                 retry_count += 1
                 self.logger.error(f"KuCoin WebSocket failed (attempt {retry_count}): {e}")
                 
                 if retry_count < max_retries:
                     wait_time = min(2 ** retry_count, 30)
+                    self._reconnects_metric.inc()
                     self.logger.info(f"Retrying KuCoin WebSocket in {wait_time} seconds...")
                     await asyncio.sleep(wait_time)
                 else:
@@ -784,6 +831,21 @@ class SimpleTriangleDetector:
     def get_current_opportunities(self) -> List[TriangleOpportunity]:
         """Get current profitable opportunities"""
         return self.current_opportunities.copy()
+
+    def add_listener(self, callback: Callable[[List[TriangleOpportunity]], None]):
+        """Call `callback(top_opportunities)` whenever the top opportunities change"""
+        self.listeners.append(callback)
+
+    def _notify_if_changed(self):
+        signature = tuple((opp.d1, opp.d2, opp.d3, round(opp.value, 4)) for opp in self.current_opportunities)
+        if signature == self._top_signature:
+            return
+        self._top_signature = signature
+        for callback in self.listeners:
+            try:
+                callback(self.current_opportunities.copy())
+            except Exception as e:
+                self.logger.error(f"Error in opportunity listener: {e}")
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get detector statistics"""
@@ -1,9 +1,111 @@
 import time
-from typing import List, Dict, Any, Set, Tuple
+from typing import List, Dict, Any, Set, Tuple, Optional
 from models.arbitrage_opportunity import ArbitrageOpportunity, TradeStep
 from exchanges.unified_exchange import UnifiedExchange
+from exchanges.price_board import get_price_board
 from utils.logger import setup_logger
 
+
+def find_triangles(pairs: List[str], require_usdt_anchor: bool = True,
+                   max_triangles: int = 500) -> List[Tuple[str, str, str]]:
+    """
+    Enumerate (base, mid, quote) triangles from a list of 'BASE/QUOTE' markets.
+    Shared by the live detector and the backtest engine so both scan the same universe.
+    """
+    triangles: List[Tuple[str, str, str]] = []
+    pair_map: Set[str] = set()
+    usdt_coins: Set[str] = set()
+    neighbours: Dict[str, Set[str]] = {}
+
+    # Normalize and index pairs, collect USDT-quoted/base coins
+    for pair in pairs:
+        if '/' not in pair:
+            continue
+        base, quote = pair.split('/')
+        pair_map.add(f"{base}/{quote}")
+        pair_map.add(f"{quote}/{base}")
+        neighbours.setdefault(base, set()).add(quote)
+        neighbours.setdefault(quote, set()).add(base)
+        if base == 'USDT' and quote != 'USDT':
+            usdt_coins.add(quote)
+        elif quote == 'USDT' and base != 'USDT':
+            usdt_coins.add(base)
+
+    # If not requiring USDT anchor, fallback to legacy (but still cap).
+    # Walk the market graph instead of every currency triple: O(sum(deg^2)) rather than O(C^3).
+    if not require_usdt_anchor:
+        for base in sorted(neighbours):
+            for mid in sorted(neighbours[base]):
+                for quote in sorted(neighbours[mid] & neighbours[base]):
+                    if quote in (base, mid):
+                        continue
+                    triangles.append((base, mid, quote))
+                    if len(triangles) >= max_triangles:
+                        return triangles
+        return triangles
+
+    # USDT-anchored triangles: USDT -> CoinA -> CoinB -> USDT
+    coins = sorted(usdt_coins)
+    # Build unique pairs (CoinA, CoinB) without duplicates
+    for i in range(len(coins)):
+        for j in range(i + 1, len(coins)):
+            a = coins[i]
+            b = coins[j]
+            # Check cross-market exists between A and B
+            if f"{a}/{b}" in pair_map or f"{b}/{a}" in pair_map:
+                triangles.append(('USDT', a, b))
+                if len(triangles) >= max_triangles:
+                    return triangles
+    return triangles
+
+
+def triangle_path_amounts(initial_amount, bid1, bid2, ask3, taker_fee, slippage_pct):
+    """
+    Core BASE -> MID -> QUOTE -> BASE path math.
+    Works element-wise on numpy arrays as well as plain floats, so backtests can
+    evaluate thousands of triangles per tick with the exact formula used live.
+    Returns (amount1, amount2, final_amount, total_fees, est_slippage).
+    """
+    amount1 = initial_amount * bid1  # sell BASE for MID
+    amount2 = amount1 * bid2  # sell MID for QUOTE
+    final_amount = amount2 / ask3  # buy BASE with QUOTE
+    total_fees = (
+        initial_amount * taker_fee +
+        amount1 * taker_fee +
+        amount2 * taker_fee
+    )
+    est_slippage = initial_amount * slippage_pct
+    return amount1, amount2, final_amount, total_fees, est_slippage
+
+
+def build_triangle_opportunity(base: str, mid: str, quote: str, initial_amount: float,
+                               p1: Dict[str, float], p2: Dict[str, float], p3: Dict[str, float],
+                               taker_fee: float, slippage_pct: float) -> ArbitrageOpportunity:
+    """Build an ArbitrageOpportunity for one triangle from its three leg quotes."""
+    pair1, pair2, pair3 = f"{base}/{mid}", f"{mid}/{quote}", f"{base}/{quote}"
+    amount1, amount2, final_amount, total_fees, est_slippage = triangle_path_amounts(
+        initial_amount, p1['bid'], p2['bid'], p3['ask'], taker_fee, slippage_pct
+    )
+
+    step1 = TradeStep(pair1, 'sell', initial_amount, p1['bid'], amount1)
+    step2 = TradeStep(pair2, 'sell', amount1, p2['bid'], amount2)
+    step3 = TradeStep(pair3, 'buy', amount2, p3['ask'], final_amount)
+
+    return ArbitrageOpportunity(
+        base_currency=base,
+        intermediate_currency=mid,
+        quote_currency=quote,
+        pair1=pair1,
+        pair2=pair2,
+        pair3=pair3,
+        steps=[step1, step2, step3],
+        initial_amount=initial_amount,
+        final_amount=final_amount,
+        estimated_fees=total_fees,
+        estimated_slippage=est_slippage
+    )
+
+
 class TriangleDetector:
     """Detects triangular arbitrage opportunities in near real-time."""
 
@@ -21,65 +123,19 @@ class TriangleDetector:
     async def initialize(self) -> None:
         """Initialize detector by discovering trading pairs and building triangle list."""
         self.logger.info("Initializing triangle detector...")
+        from exchanges.market_registry import get_market_registry
         trading_pairs = await self.exchange.get_trading_pairs()
-        self.triangles = self._find_triangles(trading_pairs)
+        self.triangles = get_market_registry().triangles(
+            self.exchange.exchange_id,
+            (self.require_usdt_anchor, self.max_triangles),
+            lambda: self._find_triangles(trading_pairs),
+            getattr(self.exchange, 'sandbox', False)
+        )
         self.logger.info(f"Found {len(self.triangles)} valid triangular paths for {self.exchange.exchange_id}")
 
     def _find_triangles(self, pairs: List[str]) -> List[Tuple[str, str, str]]:
         """Build triangular combinations anchored to USDT and capped by config."""
-        triangles: List[Tuple[str, str, str]] = []
-        pair_map: Set[str] = set()
-        usdt_coins: Set[str] = set()
-
-        # Normalize and index pairs, collect USDT-quoted/base coins
-        for pair in pairs:
-            if '/' not in pair:
-                continue
-            base, quote = pair.split('/')
-            norm = f"{base}/{quote}"
-            rev = f"{quote}/{base}"
-            pair_map.add(norm)
-            pair_map.add(rev)
-            if base == 'USDT' and quote != 'USDT':
-                usdt_coins.add(quote)
-            elif quote == 'USDT' and base != 'USDT':
-                usdt_coins.add(base)
-
-        # If not requiring USDT anchor, fallback to legacy (but still cap)
-        if not getattr(self, 'require_usdt_anchor', True):
-            currencies: Set[str] = set()
-            for p in pairs:
-                if '/' in p:
-                    a, b = p.split('/')
-                    currencies.update([a, b])
-            for base in currencies:
-                for mid in currencies:
-                    if mid == base:
-                        continue
-                    for quote in currencies:
-                        if quote in (base, mid):
-                            continue
-                        if (f"{base}/{mid}" in pair_map and
-                            f"{mid}/{quote}" in pair_map and
-                            f"{base}/{quote}" in pair_map):
-                            triangles.append((base, mid, quote))
-                            if len(triangles) >= getattr(self, 'max_triangles', 500):
-                                return triangles
-            return triangles
-
-        # USDT-anchored triangles: USDT -> CoinA -> CoinB -> USDT
-        coins = sorted(usdt_coins)
-        # Build unique pairs (CoinA, CoinB) without duplicates
-        for i in range(len(coins)):
-            for j in range(i + 1, len(coins)):
-                a = coins[i]
-                b = coins[j]
-                # Check cross-market exists between A and B
-                if f"{a}/{b}" in pair_map or f"{b}/{a}" in pair_map:
-                    triangles.append(('USDT', a, b))
-                    if len(triangles) >= getattr(self, 'max_triangles', 500):
-                        return triangles
-        return triangles
+        return find_triangles(pairs, self.require_usdt_anchor, self.max_triangles)
 
     async def update_prices(self, price_data: Dict[str, Any]) -> None:
         """Update local price cache (called from websocket feed)."""
@@ -100,6 +156,7 @@ class TriangleDetector:
                     'ask': ask,
                     'timestamp': data.get('E', int(time.time() * 1000))
                 }
+                get_price_board().update_quote(self.exchange.exchange_id, formatted_symbol, bid, ask)
         except Exception:
             return
 
@@ -144,7 +201,7 @@ class TriangleDetector:
         mid: str,
         quote: str,
         initial_amount: float
-    ) -> ArbitrageOpportunity:
+    ) -> Optional[ArbitrageOpportunity]:
         """Evaluate a single triangle path for profitability."""
         pair1, pair2, pair3 = f"{base}/{mid}", f"{mid}/{quote}", f"{base}/{quote}"
 
@@ -155,38 +212,7 @@ class TriangleDetector:
         if p1['bid'] <= 0 or p2['bid'] <= 0 or p3['ask'] <= 0:
             return None  # avoid division by zero or stale entries
 
-        # Simulate trade path: BASE -> MID -> QUOTE -> BASE
-        amount1 = initial_amount * p1['bid']  # sell BASE for MID
-        step1 = TradeStep(pair1, 'sell', initial_amount, p1['bid'], amount1)
-
-        amount2 = amount1 * p2['bid']  # sell MID for QUOTE
-        step2 = TradeStep(pair2, 'sell', amount1, p2['bid'], amount2)
-
-        final_amount = amount2 / p3['ask']  # buy BASE with QUOTE
-        step3 = TradeStep(pair3, 'buy', amount2, p3['ask'], final_amount)
-
         _, taker_fee = await self.exchange.get_trading_fees(pair1)
-        total_fees = (
-            initial_amount * taker_fee +
-            amount1 * taker_fee +
-            amount2 * taker_fee
-        )
-
         slippage_pct = self.config.get('max_slippage_percentage', 0.05) / 100
-        est_slippage = initial_amount * slippage_pct
-
-        opp = ArbitrageOpportunity(
-            base_currency=base,
-            intermediate_currency=mid,
-            quote_currency=quote,
-            pair1=pair1,
-            pair2=pair2,
-            pair3=pair3,
-            steps=[step1, step2, step3],
-            initial_amount=initial_amount,
-            final_amount=final_amount,
-            estimated_fees=total_fees,
-            estimated_slippage=est_slippage
-        )
 
-        return opp
+        return build_triangle_opportunity(base, mid, quote, initial_amount, p1, p2, p3, taker_fee, slippage_pct)
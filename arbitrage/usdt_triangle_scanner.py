@@ -8,7 +8,7 @@ import asyncio
 import websockets
 import json
 import time
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Optional
 from datetime import datetime
 import logging
 from dataclasses import dataclass
@@ -57,32 +57,34 @@ class USDTTriangleScanner:
     async def initialize(self):
         """Initialize scanner with Binance exchange info"""
         try:
-            import aiohttp
+            from utils.http_sessions import get_http_sessions
+            from exchanges.market_cache import get_market_cache
             
-            # Get exchange info
-            async with aiohttp.ClientSession() as session:
-                async with session.get('https://api.binance.com/api/v3/exchangeInfo') as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Find all USDT pairs
-                        for symbol_info in data['symbols']:
-                            if (symbol_info['status'] == 'TRADING' and 
-                                symbol_info['quoteAsset'] == 'USDT'):
-                                
-                                base_asset = symbol_info['baseAsset']
-                                self.usdt_currencies.add(base_asset)
-                                
-                                # Initialize price tracking
-                                symbol = symbol_info['symbol']
-                                self.prices[symbol] = {'bid': 0, 'ask': 0}
-                        
-                        logger.info(f"✅ Found {len(self.usdt_currencies)} USDT currencies")
-                        logger.info(f"📊 Tracking {len(self.prices)} price feeds")
-                        return True
-                    else:
-                        logger.error(f"Failed to get exchange info: {response.status}")
-                        return False
+            async def fetch() -> Dict[str, Any]:
+                url = 'https://api.binance.com/api/v3/exchangeInfo'
+                async with get_http_sessions().for_url(url).get(url) as response:
+                    if response.status != 200:
+                        raise Exception(f"Failed to get exchange info: {response.status}")
+                    return await response.json()
+            
+            # Get exchange info (shared with the other Binance detectors)
+            data = await get_market_cache().get('binance.exchange_info', fetch)
+            
+            # Find all USDT pairs
+            for symbol_info in data['symbols']:
+                if (symbol_info['status'] == 'TRADING' and 
+                    symbol_info['quoteAsset'] == 'USDT'):
+                    
+                    base_asset = symbol_info['baseAsset']
+                    self.usdt_currencies.add(base_asset)
+                    
+                    # Initialize price tracking
+                    symbol = symbol_info['symbol']
+                    self.prices[symbol] = {'bid': 0, 'ask': 0}
+            
+            logger.info(f"✅ Found {len(self.usdt_currencies)} USDT currencies")
+            logger.info(f"📊 Tracking {len(self.prices)} price feeds")
+            return True
         except Exception as e:
             logger.error(f"Error initializing scanner: {e}")
             return False
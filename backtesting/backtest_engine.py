@@ -4,14 +4,43 @@ Backtesting engine for triangular arbitrage strategies.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from datetime import datetime, timedelta
 import asyncio
+import hashlib
+import sys
 from dataclasses import dataclass
 
-from models.arbitrage_opportunity import ArbitrageOpportunity, TradeStep
+from models.arbitrage_opportunity import ArbitrageOpportunity
+from arbitrage.triangle_detector import find_triangles, triangle_path_amounts, build_triangle_opportunity
+from config.exchanges_config import SUPPORTED_EXCHANGES
+from backtesting.result_cache import BacktestResultCache, make_cache_key
 from utils.logger import setup_logger
 
+# Config keys that only affect reporting/caching, not the simulated outcome
+# ('seed' does affect it, but is keyed explicitly as the effective per-run seed)
+_NON_RESULT_CONFIG_KEYS = {'progress_interval', 'use_result_cache', 'result_cache_dir', 'result_cache_max_mb', 'seed'}
+
+
+def _parse_datetime(value: Any) -> Any:
+    """Restore a datetime serialised by the result cache."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _parse_timestamp(value: Any) -> Any:
+    """Restore an equity-curve timestamp serialised by the result cache."""
+    if isinstance(value, str):
+        try:
+            return pd.Timestamp(value)
+        except ValueError:
+            return value
+    return value
+
 @dataclass
 class BacktestResult:
     """Results from a backtest run."""
@@ -28,6 +57,112 @@ class BacktestResult:
     initial_balance: float
     final_balance: float
 
+class BacktestMetrics:
+    """
+    Streaming accumulator for backtest statistics.
+    Keeps O(1) state: running peak/drawdown, Welford mean/variance of per-tick
+    returns and trade counters, so long runs never hold per-tick history.
+    """
+    
+    def __init__(self, initial_balance: float, max_curve_points: int = 2000):
+        self.initial_balance = initial_balance
+        self.balance = initial_balance
+        self.peak = initial_balance
+        self.max_drawdown = 0.0
+        self.ticks = 0
+        
+        self.total_trades = 0
+        self.successful_trades = 0
+        self.total_profit = 0.0
+        self.total_fees = 0.0
+        
+        self._prev_balance: Optional[float] = None
+        self._return_count = 0
+        self._return_mean = 0.0
+        self._return_m2 = 0.0
+        
+        # Bounded equity curve: when full, keep every other point and halve the sampling rate
+        self.max_curve_points = max_curve_points
+        self.equity_curve: List[Tuple[Any, float]] = []
+        self._curve_stride = 1
+    
+    def record_trade(self, trade_result: Dict[str, Any]) -> None:
+        """Account for one simulated trade."""
+        self.total_trades += 1
+        if trade_result['success']:
+            self.successful_trades += 1
+        self.total_profit += trade_result['profit']
+        self.total_fees += trade_result['fees']
+    
+    def record_balance(self, balance: float, timestamp: Any = None) -> None:
+        """Account for the balance at the end of one tick."""
+        if self.ticks % self._curve_stride == 0:
+            self.equity_curve.append((timestamp, balance))
+            if len(self.equity_curve) > self.max_curve_points:
+                self.equity_curve = self.equity_curve[::2]
+                self._curve_stride *= 2
+        
+        self.ticks += 1
+        self.balance = balance
+        
+        if balance > self.peak:
+            self.peak = balance
+        drawdown = (self.peak - balance) / self.peak
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+        
+        # Welford update of the per-tick return mean/variance
+        if self._prev_balance is not None:
+            ret = (balance - self._prev_balance) / self._prev_balance
+            self._return_count += 1
+            delta = ret - self._return_mean
+            self._return_mean += delta / self._return_count
+            self._return_m2 += delta * (ret - self._return_mean)
+        self._prev_balance = balance
+    
+    @property
+    def success_rate(self) -> float:
+        return (self.successful_trades / self.total_trades * 100) if self.total_trades > 0 else 0
+    
+    @property
+    def sharpe_ratio(self) -> float:
+        """Simplified Sharpe: mean / population std of per-tick returns."""
+        if self._return_count == 0:
+            return 0
+        std = (self._return_m2 / self._return_count) ** 0.5
+        return self._return_mean / std if std > 0 else 0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics as a plain dict (used for progress reporting)."""
+        return {
+            'ticks': self.ticks,
+            'balance': self.balance,
+            'total_trades': self.total_trades,
+            'successful_trades': self.successful_trades,
+            'total_profit': self.total_profit,
+            'total_fees': self.total_fees,
+            'success_rate': self.success_rate,
+            'max_drawdown': self.max_drawdown,
+            'sharpe_ratio': self.sharpe_ratio
+        }
+    
+    def to_result(self, start_date: datetime, end_date: datetime) -> BacktestResult:
+        """Finalize into a BacktestResult."""
+        return BacktestResult(
+            total_trades=self.total_trades,
+            successful_trades=self.successful_trades,
+            total_profit=self.total_profit,
+            total_fees=self.total_fees,
+            success_rate=self.success_rate,
+            average_profit_per_trade=self.total_profit / self.total_trades if self.total_trades > 0 else 0,
+            max_drawdown=self.max_drawdown,
+            sharpe_ratio=self.sharpe_ratio,
+            start_date=start_date,
+            end_date=end_date,
+            initial_balance=self.initial_balance,
+            final_balance=self.balance
+        )
+
 class BacktestEngine:
     """Engine for backtesting triangular arbitrage strategies."""
     
@@ -36,11 +171,28 @@ class BacktestEngine:
         self.logger = setup_logger('BacktestEngine')
         self.historical_data = {}
         self.results = []
+        self.triangles: Dict[str, List[Tuple[str, str, str]]] = {}
+        self._symbols: Dict[str, List[str]] = {}
+        self._leg_index: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self.equity_curves: Dict[str, List[Tuple[Any, float]]] = {}
+        
+        # All simulated randomness (synthetic prices, slippage, fills) comes from this generator
+        self.seed = int(self.config.get('seed', 0))
+        self._rng = np.random.default_rng(self.seed)
+        
+        self.result_cache: Optional[BacktestResultCache] = None
+        if self.config.get('use_result_cache', True):
+            self.result_cache = BacktestResultCache(
+                cache_dir=self.config.get('result_cache_dir', 'data/backtest_cache'),
+                max_bytes=int(self.config.get('result_cache_max_mb', 256) * 1024 * 1024)
+            )
         
     async def load_historical_data(self, exchange_id: str, symbols: List[str], 
-                                 start_date: datetime, end_date: datetime) -> bool:
-        """Load historical price data for backtesting."""
+                                 start_date: datetime, end_date: datetime, seed: Optional[int] = None) -> bool:
+        """Load historical price data for backtesting (`seed` defaults to the engine seed)."""
         try:
+            self._rng = np.random.default_rng(self.seed if seed is None else seed)
             self.logger.info(f"Loading historical data for {exchange_id}: {len(symbols)} symbols")
             
             # In a real implementation, you would load actual historical data
@@ -48,6 +200,7 @@ class BacktestEngine:
             self.historical_data[exchange_id] = self._generate_synthetic_data(
                 symbols, start_date, end_date
             )
+            self._fingerprints[exchange_id] = self._fingerprint_data(self.historical_data[exchange_id])
             
             self.logger.info(f"Loaded {len(self.historical_data[exchange_id])} data points")
             return True
@@ -70,20 +223,27 @@ class BacktestEngine:
                 volatility = 0.02  # 2% volatility
                 
                 # Random walk with mean reversion
-                price_change = np.random.normal(0, volatility * base_price)
+                price_change = self._rng.normal(0, volatility * base_price)
                 bid = base_price + price_change
-                ask = bid * (1 + np.random.uniform(0.0001, 0.001))  # Spread
+                ask = bid * (1 + self._rng.uniform(0.0001, 0.001))  # Spread
                 
                 data.append({
                     'timestamp': timestamp,
                     'symbol': symbol,
                     'bid': bid,
                     'ask': ask,
-                    'volume': np.random.uniform(1000, 10000)
+                    'volume': self._rng.uniform(1000, 10000)
                 })
         
         return pd.DataFrame(data)
     
+    def _fingerprint_data(self, data: pd.DataFrame) -> str:
+        """Content hash of a historical dataset (row order and values)."""
+        digest = hashlib.sha256()
+        digest.update(','.join(map(str, data.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+    
     def _get_base_price(self, symbol: str) -> float:
         """Get base price for a symbol (simplified)."""
         base_prices = {
@@ -97,9 +257,17 @@ class BacktestEngine:
         return base_prices.get(symbol, 100)
     
     async def run_backtest(self, exchange_id: str, start_date: datetime, 
-                          end_date: datetime, initial_balance: float = 10000) -> BacktestResult:
-        """Run a backtest for the specified period."""
+                          end_date: datetime, initial_balance: float = 10000,
+                          progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          seed: Optional[int] = None) -> BacktestResult:
+        """
+        Run a backtest for the specified period.
+        Statistics are accumulated per tick; `progress_callback` receives a metrics
+        snapshot every `progress_interval` ticks (config, default 1000). Simulated
+        fills use `seed` (default: the engine seed), so a run is reproducible.
+        """
         try:
+            seed = self.seed if seed is None else int(seed)
             self.logger.info(f"Starting backtest for {exchange_id} from {start_date} to {end_date}")
             
             if exchange_id not in self.historical_data:
@@ -108,51 +276,85 @@ class BacktestEngine:
             
             data = self.historical_data[exchange_id]
             
+            # Enumerate the triangle universe from the recorded markets
+            self._build_triangle_universe(exchange_id, data)
+            
+            # Identical data, triangles, parameters and code are served from the result cache
+            cache_key = None
+            if self.result_cache:
+                cache_key = make_cache_key(
+                    self._fingerprints.get(exchange_id) or self._fingerprint_data(data),
+                    self.triangles[exchange_id],
+                    {
+                        'exchange_id': exchange_id,
+                        'start_date': start_date,
+                        'end_date': end_date,
+                        'initial_balance': initial_balance,
+                        'seed': seed,
+                        # Effective costs, however they were resolved (config or exchange defaults)
+                        'taker_fee': self._get_taker_fee(exchange_id),
+                        'slippage_pct': self.config.get('max_slippage_percentage', 0.05) / 100,
+                        'config': {k: v for k, v in self.config.items() if k not in _NON_RESULT_CONFIG_KEYS}
+                    }
+                )
+                cached = self.result_cache.get(cache_key)
+                if cached:
+                    result = BacktestResult(**cached['result'])
+                    result.start_date = _parse_datetime(result.start_date)
+                    result.end_date = _parse_datetime(result.end_date)
+                    self.equity_curves[exchange_id] = [(_parse_timestamp(ts), balance) for ts, balance in cached['equity_curve']]
+                    self.logger.info(f"⚡ Backtest cache hit for {exchange_id} ({cache_key[:12]}): "
+                                   f"{result.total_trades} trades, ${result.total_profit:.2f} profit")
+                    return result
+            
+            self._rng = np.random.default_rng(seed)
+            
+            # Pivot to dense [timestamp x symbol] price boards once instead of iterrows per tick
+            symbols = self._symbols[exchange_id]
+            bids = data.pivot_table(index='timestamp', columns='symbol', values='bid').reindex(columns=symbols)
+            asks = data.pivot_table(index='timestamp', columns='symbol', values='ask').reindex(columns=symbols)
+            bid_board = bids.to_numpy(dtype=float)
+            ask_board = asks.to_numpy(dtype=float)
+            
             # Initialize backtest state
             current_balance = initial_balance
-            trades = []
-            balance_history = []
-            
-            # Group data by timestamp
-            grouped_data = data.groupby('timestamp')
+            metrics = BacktestMetrics(initial_balance)
+            progress_interval = int(self.config.get('progress_interval', 1000))
+            total_ticks = len(bids.index)
             
-            for timestamp, group in grouped_data:
-                # Create price snapshot
-                price_snapshot = {}
-                for _, row in group.iterrows():
-                    price_snapshot[row['symbol']] = {
-                        'bid': row['bid'],
-                        'ask': row['ask'],
-                        'volume': row['volume']
-                    }
-                
+            for row, timestamp in enumerate(bids.index):
                 # Detect arbitrage opportunities
-                opportunities = await self._detect_opportunities_from_snapshot(
-                    price_snapshot, current_balance
+                opportunities = self._detect_opportunities_from_snapshot(
+                    exchange_id, bid_board[row], ask_board[row], current_balance
                 )
                 
                 # Execute profitable opportunities
                 for opportunity in opportunities:
                     if opportunity.is_profitable and opportunity.net_profit > 0:
                         trade_result = self._simulate_trade_execution(opportunity)
-                        trades.append({
-                            'timestamp': timestamp,
-                            'opportunity': opportunity,
-                            'result': trade_result
-                        })
+                        metrics.record_trade(trade_result)
                         
                         if trade_result['success']:
                             current_balance += trade_result['profit']
                 
-                balance_history.append({
-                    'timestamp': timestamp,
-                    'balance': current_balance
-                })
+                metrics.record_balance(current_balance, timestamp)
+                
+                if progress_interval > 0 and metrics.ticks % progress_interval == 0:
+                    snapshot = metrics.snapshot()
+                    snapshot.update({'timestamp': timestamp, 'progress': metrics.ticks / total_ticks})
+                    self.logger.info(f"⏳ Backtest progress {snapshot['progress'] * 100:.1f}%: "
+                                   f"{snapshot['total_trades']} trades, "
+                                   f"balance ${snapshot['balance']:.2f}, "
+                                   f"drawdown {snapshot['max_drawdown'] * 100:.2f}%")
+                    if progress_callback:
+                        progress_callback(snapshot)
             
             # Calculate backtest results
-            result = self._calculate_backtest_results(
-                trades, balance_history, initial_balance, start_date, end_date
-            )
+            result = metrics.to_result(start_date, end_date)
+            self.equity_curves[exchange_id] = metrics.equity_curve
+            
+            if self.result_cache and cache_key:
+                self.result_cache.put(cache_key, result, metrics.equity_curve)
             
             self.logger.info(f"Backtest completed: {result.total_trades} trades, "
                            f"{result.success_rate:.2f}% success rate, "
@@ -164,91 +366,97 @@ class BacktestEngine:
             self.logger.error(f"Error running backtest: {e}")
             return None
     
-    async def _detect_opportunities_from_snapshot(self, price_snapshot: Dict[str, Dict], 
-                                                balance: float) -> List[ArbitrageOpportunity]:
-        """Detect arbitrage opportunities from a price snapshot."""
-        opportunities = []
+    def _build_triangle_universe(self, exchange_id: str, data: pd.DataFrame) -> None:
+        """Enumerate triangles from recorded markets and precompute leg index arrays."""
+        symbols = sorted(data['symbol'].unique())
+        symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
         
-        # Define common triangles
-        triangles = [
-            ('BTC', 'ETH', 'USDT'),
-            ('BTC', 'BNB', 'USDT'),
-            ('ETH', 'BNB', 'USDT')
-        ]
+        # Same enumeration as the live TriangleDetector; the USDT anchor is opt-in here
+        # because anchored paths start on an inverted USDT/COIN leg that is rarely recorded.
+        # Enumerate uncapped: the cap applies to evaluable triangles, not raw candidates.
+        candidates = find_triangles(
+            symbols,
+            require_usdt_anchor=bool(self.config.get('require_usdt_anchor', False)),
+            max_triangles=sys.maxsize
+        )
         
-        for base, intermediate, quote in triangles:
-            pair1 = f"{base}/{intermediate}"
-            pair2 = f"{intermediate}/{quote}"
-            pair3 = f"{base}/{quote}"
-            
-            if all(pair in price_snapshot for pair in [pair1, pair2, pair3]):
-                opportunity = self._calculate_triangle_profit_from_snapshot(
-                    price_snapshot, base, intermediate, quote, 
-                    min(balance * 0.1, self.config.get('max_trade_amount', 100))
-                )
-                
-                if opportunity:
-                    opportunities.append(opportunity)
+        # Keep only triangles whose three directed legs exist in the recorded data,
+        # i.e. the ones the live price cache could ever evaluate
+        triangles = []
+        for base, mid, quote in candidates:
+            legs = (f"{base}/{mid}", f"{mid}/{quote}", f"{base}/{quote}")
+            if all(leg in symbol_index for leg in legs):
+                triangles.append((base, mid, quote))
         
-        return opportunities
+        max_triangles = int(self.config.get('max_triangles', 10000))
+        if len(triangles) > max_triangles:
+            self.logger.warning(f"⚠️ Backtest universe for {exchange_id} truncated: "
+                                f"{len(triangles)} evaluable triangles, keeping {max_triangles} (max_triangles)")
+            triangles = triangles[:max_triangles]
+        
+        self._symbols[exchange_id] = symbols
+        self.triangles[exchange_id] = triangles
+        self._leg_index[exchange_id] = (
+            np.array([symbol_index[f"{b}/{m}"] for b, m, q in triangles], dtype=np.intp),
+            np.array([symbol_index[f"{m}/{q}"] for b, m, q in triangles], dtype=np.intp),
+            np.array([symbol_index[f"{b}/{q}"] for b, m, q in triangles], dtype=np.intp)
+        )
+        
+        self.logger.info(f"Backtest universe for {exchange_id}: {len(symbols)} markets, "
+                         f"{len(triangles)} evaluable triangles ({len(candidates)} enumerated)")
     
-    def _calculate_triangle_profit_from_snapshot(self, price_snapshot: Dict[str, Dict],
-                                               base: str, intermediate: str, quote: str,
-                                               initial_amount: float) -> Optional[ArbitrageOpportunity]:
-        """Calculate triangle profit from price snapshot."""
-        try:
-            pair1 = f"{base}/{intermediate}"
-            pair2 = f"{intermediate}/{quote}"
-            pair3 = f"{base}/{quote}"
-            
-            price1 = price_snapshot[pair1]
-            price2 = price_snapshot[pair2]
-            price3 = price_snapshot[pair3]
-            
-            # Calculate arbitrage path
-            amount_after_step1 = initial_amount * price1['bid']
-            amount_after_step2 = amount_after_step1 * price2['bid']
-            final_amount = amount_after_step2 / price3['ask']
-            
-            # Create trade steps
-            steps = [
-                TradeStep(pair1, 'sell', initial_amount, price1['bid'], amount_after_step1),
-                TradeStep(pair2, 'sell', amount_after_step1, price2['bid'], amount_after_step2),
-                TradeStep(pair3, 'buy', amount_after_step2, price3['ask'], final_amount)
-            ]
-            
-            # Estimate fees and slippage
-            estimated_fees = initial_amount * 0.003  # 0.3% total fees
-            estimated_slippage = initial_amount * 0.001  # 0.1% slippage
-            
-            opportunity = ArbitrageOpportunity(
-                base_currency=base,
-                intermediate_currency=intermediate,
-                quote_currency=quote,
-                pair1=pair1,
-                pair2=pair2,
-                pair3=pair3,
-                steps=steps,
-                initial_amount=initial_amount,
-                final_amount=final_amount,
-                estimated_fees=estimated_fees,
-                estimated_slippage=estimated_slippage
+    def _get_taker_fee(self, exchange_id: str) -> float:
+        """Taker fee used for the simulated path, defaulting to the exchange config."""
+        default_fee = SUPPORTED_EXCHANGES.get(exchange_id, {}).get('taker_fee', 0.001)
+        return float(self.config.get('taker_fee', default_fee))
+    
+    def _detect_opportunities_from_snapshot(self, exchange_id: str, bid_row: np.ndarray,
+                                            ask_row: np.ndarray, balance: float) -> List[ArbitrageOpportunity]:
+        """Evaluate every triangle against one price snapshot with the live detector math."""
+        triangles = self.triangles.get(exchange_id, [])
+        if not triangles:
+            return []
+        
+        leg1, leg2, leg3 = self._leg_index[exchange_id]
+        bid1, bid2, ask3 = bid_row[leg1], bid_row[leg2], ask_row[leg3]
+        
+        initial_amount = min(balance * 0.1, self.config.get('max_trade_amount', 100))
+        taker_fee = self._get_taker_fee(exchange_id)
+        slippage_pct = self.config.get('max_slippage_percentage', 0.05) / 100
+        min_profit = self.config.get('min_profit_percentage', 0.1)
+        
+        # Same guards as TriangleDetector._calculate_triangle_profit (missing or non-positive quotes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valid = (bid1 > 0) & (bid2 > 0) & (ask3 > 0)
+            _, _, final_amount, total_fees, est_slippage = triangle_path_amounts(
+                initial_amount, bid1, bid2, ask3, taker_fee, slippage_pct
             )
-            
-            return opportunity
-            
-        except Exception as e:
-            self.logger.error(f"Error calculating triangle profit: {e}")
-            return None
+            profit_amount = final_amount - initial_amount
+            profit_percentage = profit_amount / initial_amount * 100
+            net_profit = profit_amount - total_fees - est_slippage
+        
+        hits = np.flatnonzero(valid & (net_profit > 0) & (profit_percentage >= min_profit))
+        
+        # Only the (rare) profitable triangles are materialised as opportunity objects
+        opportunities = []
+        for i in hits:
+            base, mid, quote = triangles[i]
+            opportunities.append(build_triangle_opportunity(
+                base, mid, quote, initial_amount,
+                {'bid': float(bid1[i])}, {'bid': float(bid2[i])}, {'ask': float(ask3[i])},
+                taker_fee, slippage_pct
+            ))
+        
+        return opportunities
     
     def _simulate_trade_execution(self, opportunity: ArbitrageOpportunity) -> Dict[str, Any]:
         """Simulate trade execution with realistic constraints."""
         try:
             # Simulate execution with some randomness
             execution_success_rate = 0.95  # 95% success rate
-            slippage_factor = np.random.uniform(0.8, 1.2)  # ±20% slippage variation
+            slippage_factor = self._rng.uniform(0.8, 1.2)  # ±20% slippage variation
             
-            success = np.random.random() < execution_success_rate
+            success = self._rng.random() < execution_success_rate
             
             if success:
                 actual_slippage = opportunity.estimated_slippage * slippage_factor
@@ -271,56 +479,3 @@ class BacktestEngine:
         except Exception as e:
             self.logger.error(f"Error simulating trade execution: {e}")
             return {'success': False, 'profit': 0, 'fees': 0, 'slippage': 0}
-    
-    def _calculate_backtest_results(self, trades: List[Dict], balance_history: List[Dict],
-                                  initial_balance: float, start_date: datetime, 
-                                  end_date: datetime) -> BacktestResult:
-        """Calculate comprehensive backtest results."""
-        try:
-            total_trades = len(trades)
-            successful_trades = sum(1 for trade in trades if trade['result']['success'])
-            
-            total_profit = sum(trade['result']['profit'] for trade in trades)
-            total_fees = sum(trade['result']['fees'] for trade in trades)
-            
-            success_rate = (successful_trades / total_trades * 100) if total_trades > 0 else 0
-            avg_profit_per_trade = total_profit / total_trades if total_trades > 0 else 0
-            
-            # Calculate max drawdown
-            balances = [item['balance'] for item in balance_history]
-            peak = initial_balance
-            max_drawdown = 0
-            
-            for balance in balances:
-                if balance > peak:
-                    peak = balance
-                drawdown = (peak - balance) / peak
-                max_drawdown = max(max_drawdown, drawdown)
-            
-            # Calculate Sharpe ratio (simplified)
-            if len(balances) > 1:
-                returns = np.diff(balances) / balances[:-1]
-                sharpe_ratio = np.mean(returns) / np.std(returns) if np.std(returns) > 0 else 0
-            else:
-                sharpe_ratio = 0
-            
-            final_balance = balances[-1] if balances else initial_balance
-            
-            return BacktestResult(
-                total_trades=total_trades,
-                successful_trades=successful_trades,
-                total_profit=total_profit,
-                total_fees=total_fees,
-                success_rate=success_rate,
-                average_profit_per_trade=avg_profit_per_trade,
-                max_drawdown=max_drawdown,
-                sharpe_ratio=sharpe_ratio,
-                start_date=start_date,
-                end_date=end_date,
-                initial_balance=initial_balance,
-                final_balance=final_balance
-            )
-            
-        except Exception as e:
-            self.logger.error(f"Error calculating backtest results: {e}")
-            return None
\ No newline at end of file
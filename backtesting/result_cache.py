@@ -0,0 +1,145 @@
+"""
+Content-addressed on-disk cache for backtest results.
+
+Entries are keyed by a hash of (dataset fingerprint, triangle set, parameters
+including the simulation seed, code version), so a re-run with identical inputs is served from disk. The
+cache directory is bounded in size with least-recently-used eviction.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.logger import setup_logger
+
+# Source files whose content defines the simulation (engine, path math, opportunity
+# profit rules, default fees); any edit invalidates the cache
+_CODE_FILES = (
+    os.path.join(os.path.dirname(__file__), 'backtest_engine.py'),
+    os.path.join(os.path.dirname(__file__), '..', 'arbitrage', 'triangle_detector.py'),
+    os.path.join(os.path.dirname(__file__), '..', 'models', 'arbitrage_opportunity.py'),
+    os.path.join(os.path.dirname(__file__), '..', 'config', 'exchanges_config.py'),
+)
+
+_code_version: Optional[str] = None
+
+
+def code_version() -> str:
+    """Hash of the simulation source code (computed once per process)."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for path in _CODE_FILES:
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(path.encode())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def make_cache_key(dataset_fingerprint: str, triangles: List[Tuple[str, str, str]],
+                   params: Dict[str, Any]) -> str:
+    """Build the content address for one backtest run."""
+    payload = json.dumps({
+        'dataset': dataset_fingerprint,
+        'triangles': [list(t) for t in triangles],
+        'params': params,
+        'code': code_version()
+    }, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class BacktestResultCache:
+    """Size-bounded LRU cache of BacktestResult + equity curve stored as JSON files."""
+
+    def __init__(self, cache_dir: str = 'data/backtest_cache', max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.logger = setup_logger('BacktestResultCache')
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, oldest first
+        self._total_bytes = 0
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU order from file modification times."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            files = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.json'):
+                    continue
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                files.append((stat.st_mtime, name[:-5], stat.st_size))
+            for _, key, size in sorted(files):
+                self._entries[key] = size
+                self._total_bytes += size
+        except Exception as e:
+            self.logger.error(f"Error loading backtest cache index: {e}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return {'result': dict, 'equity_curve': list} for a key, or None on miss."""
+        if key not in self._entries:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path, None)  # refresh recency for LRU across restarts
+            self._entries.move_to_end(key)
+            return entry
+        except Exception as e:
+            self.logger.warning(f"Dropping unreadable cache entry {key[:12]}: {e}")
+            self._remove(key)
+            return None
+
+    def put(self, key: str, result: Any, equity_curve: List[Tuple[Any, float]]) -> None:
+        """Store a result and its equity curve, evicting least-recently-used entries."""
+        try:
+            entry = {
+                'result': asdict(result),
+                'equity_curve': [[ts.isoformat() if hasattr(ts, 'isoformat') else ts, balance]
+                                 for ts, balance in equity_curve],
+                'created_at': datetime.now().isoformat()
+            }
+            data = json.dumps(entry, default=str).encode()
+            if len(data) > self.max_bytes:
+                return
+
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+
+            while self._total_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+        except Exception as e:
+            self.logger.error(f"Error writing backtest cache entry: {e}")
+
+    def _remove(self, key: str) -> None:
+        size = self._entries.pop(key, 0)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for key in list(self._entries):
+            self._remove(key)
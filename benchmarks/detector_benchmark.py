@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Detector throughput benchmark.
+
+Builds a synthetic exchange with N pairs (and the triangles they imply),
+generates a fixed, seeded tick stream, and drives every detector with it.
+For each detector it reports updates/sec, per-frame scan latency percentiles,
+tracemalloc allocation figures and peak RSS as JSON, so runs can be diffed
+over time. Each detector runs in its own subprocess by default so peak RSS
+and import costs are not shared between them.
+
+Usage:
+    python benchmarks/detector_benchmark.py --pairs 600 --frames 300
+    python benchmarks/detector_benchmark.py --only simple,triangle --output bench.json
+    python benchmarks/detector_benchmark.py --baseline bench.json --max-regression 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import inspect
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DETECTORS = ['simple', 'realtime', 'usdt', 'triangle', 'enhanced', 'working', 'ultrafast', 'multi']
+
+MAJORS = ['BTC', 'ETH', 'BNB', 'USDC', 'BUSD']
+MAJOR_USD_PRICES = {'USDT': 1.0, 'BTC': 45000.0, 'ETH': 3000.0, 'BNB': 300.0, 'USDC': 1.0, 'BUSD': 1.0}
+# Real tickers first so detectors with hard-coded currency allow-lists see a realistic universe
+REAL_COINS = [
+    'ADA', 'DOT', 'LINK', 'LTC', 'XRP', 'SOL', 'MATIC', 'AVAX', 'DOGE', 'TRX', 'ATOM', 'FIL',
+    'UNI', 'AAVE', 'SUSHI', 'CRV', 'ARB', 'OP', 'SHIB', 'PEPE', 'KCS', 'NEAR', 'APT', 'ICP',
+    'ETC', 'XLM', 'ALGO', 'VET', 'HBAR', 'EOS', 'XTZ', 'THETA', 'AXS', 'SAND', 'MANA', 'GRT',
+    'CHZ', 'ENJ', 'ZIL', 'BAT', 'COMP', 'MKR', 'SNX', 'YFI', '1INCH', 'INJ', 'AR', 'TFUEL'
+]
+
+
+class SyntheticMarket:
+    """A reproducible universe of markets with internally consistent USD prices."""
+
+    def __init__(self, n_pairs: int, cross_ratio: float, seed: int):
+        self.rng = random.Random(seed)
+        self.usd: Dict[str, float] = dict(MAJOR_USD_PRICES)
+        self.symbols: List[str] = []  # 'BASE/QUOTE'
+
+        for major in MAJORS:
+            self._add(major, 'USDT')
+        for base, quote in [('ETH', 'BTC'), ('BNB', 'BTC'), ('BNB', 'ETH'), ('BTC', 'USDC'), ('ETH', 'USDC'),
+                            ('BTC', 'BUSD'), ('ETH', 'BUSD'), ('USDC', 'BUSD')]:
+            self._add(base, quote)
+
+        i = 0
+        while len(self.symbols) < n_pairs:
+            coin = REAL_COINS[i] if i < len(REAL_COINS) else f"X{i:04d}"
+            self.usd[coin] = 10 ** self.rng.uniform(-4, 3)
+            self._add(coin, 'USDT')
+            for cross in ('BTC', 'ETH', 'BNB'):
+                if len(self.symbols) < n_pairs and self.rng.random() < cross_ratio:
+                    self._add(coin, cross)
+            i += 1
+
+        self.raw_to_symbol = {s.replace('/', ''): s for s in self.symbols}
+
+    def _add(self, base: str, quote: str) -> None:
+        self.symbols.append(f"{base}/{quote}")
+
+    def exchange_info(self) -> Dict[str, Any]:
+        """Binance-style exchangeInfo payload for the universe."""
+        return {'symbols': [
+            {'symbol': s.replace('/', ''), 'status': 'TRADING',
+             'baseAsset': s.split('/')[0], 'quoteAsset': s.split('/')[1]}
+            for s in self.symbols
+        ]}
+
+    def quote(self, symbol: str) -> Tuple[float, float]:
+        """Bid/ask around the fair cross rate, with a small random mispricing."""
+        base, quote = symbol.split('/')
+        mid = self.usd[base] / self.usd[quote] * (1 + self.rng.gauss(0, 0.002))
+        half_spread = mid * 0.0003
+        return mid - half_spread, mid + half_spread
+
+    def generate_frames(self, n_frames: int, tickers_per_frame: int) -> List[List[Dict[str, Any]]]:
+        """Binance !ticker@arr style frames: each a list of {'s', 'b', 'a', 'v', 'E'}."""
+        frames = []
+        now_ms = 1_700_000_000_000
+        for _ in range(n_frames):
+            now_ms += 1000
+            frame = []
+            for symbol in self.rng.sample(self.symbols, min(tickers_per_frame, len(self.symbols))):
+                base = symbol.split('/')[0]
+                if base not in MAJOR_USD_PRICES or base in ('BTC', 'ETH', 'BNB'):
+                    self.usd[base] *= 1 + self.rng.gauss(0, 0.0005)
+                bid, ask = self.quote(symbol)
+                frame.append({'s': symbol.replace('/', ''), 'b': f"{bid:.10g}", 'a': f"{ask:.10g}",
+                              'v': f"{self.rng.uniform(2000, 50000):.2f}", 'E': now_ms})
+            frames.append(frame)
+        return frames
+
+
+class SyntheticExchange:
+    """Just enough of the UnifiedExchange / ccxt surface for the detectors."""
+
+    def __init__(self, market: SyntheticMarket, exchange_id: str = 'binance'):
+        self.market = market
+        self.exchange_id = exchange_id
+        self.name = exchange_id
+        self.is_connected = True
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+
+    def apply(self, frame: List[Dict[str, Any]]) -> None:
+        """Fold a tick frame into the ccxt-style ticker board."""
+        for t in frame:
+            symbol = self.market.raw_to_symbol[t['s']]
+            bid, ask = float(t['b']), float(t['a'])
+            self.tickers[symbol] = {
+                'symbol': symbol, 'bid': bid, 'ask': ask, 'last': (bid + ask) / 2,
+                'baseVolume': float(t['v']), 'quoteVolume': float(t['v']) * bid, 'timestamp': t['E']
+            }
+
+    async def get_trading_pairs(self) -> List[str]:
+        return list(self.market.symbols)
+
+    async def fetch_tickers(self) -> Dict[str, Any]:
+        return self.tickers
+
+    async def get_trading_fees(self, symbol: str) -> Tuple[float, float]:
+        return 0.001, 0.001
+
+
+class SyntheticExchangeManager:
+    def __init__(self, exchange: SyntheticExchange):
+        self.exchanges = {exchange.exchange_id: exchange}
+
+
+# Each setup returns (prepare, run): prepare(frame) is untimed harness work,
+# run(payload, frame) is the timed detector call.
+
+async def _setup_simple(market, exchange):
+    from arbitrage.simple_triangle_detector import SimpleTriangleDetector
+    detector = SimpleTriangleDetector(min_profit_pct=0.4, exchange_id='binance')
+    detector._build_paths(*detector._parse_exchange_info(market.exchange_info()))
+    return None, lambda payload, frame: detector.process_data(payload)
+
+
+async def _setup_realtime(market, exchange):
+    from arbitrage.realtime_detector import RealtimeArbitrageDetector
+    detector = RealtimeArbitrageDetector(min_profit_pct=0.4, max_trade_amount=20)
+    detector.trading_pairs = set(market.symbols)
+    detector._build_triangular_paths()
+    return None, lambda payload, frame: detector._handle_websocket_message(payload)
+
+
+async def _setup_usdt(market, exchange):
+    from arbitrage.usdt_triangle_scanner import USDTTriangleScanner
+    detector = USDTTriangleScanner(min_profit_pct=0.4, max_trade_amount=20)
+    for symbol in market.symbols:
+        base, quote = symbol.split('/')
+        if quote == 'USDT':
+            detector.usdt_currencies.add(base)
+            detector.prices[f"{base}USDT"] = {'bid': 0, 'ask': 0}
+    return None, lambda payload, frame: detector._process_websocket_message(payload)
+
+
+async def _setup_triangle(market, exchange):
+    from arbitrage.triangle_detector import TriangleDetector
+    detector = TriangleDetector(exchange, {'scan_interval_ms': 0, 'min_profit_percentage': 0.4, 'max_trade_amount': 20})
+    await detector.initialize()
+
+    async def run(payload, frame):
+        for t in frame:
+            await detector.update_prices({'data': t})
+        await detector.scan_opportunities()
+    return None, run
+
+
+async def _setup_enhanced(market, exchange):
+    from arbitrage.enhanced_triangle_detector import EnhancedTriangleDetector
+    detector = EnhancedTriangleDetector(SyntheticExchangeManager(exchange), min_profit_pct=0.4, max_trade_amount=20)
+    return exchange.apply, lambda payload, frame: detector.find_profitable_opportunities()
+
+
+async def _setup_working(market, exchange):
+    from arbitrage.working_triangle_detector import WorkingTriangleDetector
+    detector = WorkingTriangleDetector(SyntheticExchangeManager(exchange), min_profit_pct=0.4, max_trade_amount=20)
+
+    def prepare(frame):
+        exchange.apply(frame)
+        detector.last_ticker_fetch.clear()  # every frame is a fresh board, bypass the 10s cache
+    return prepare, lambda payload, frame: detector.find_real_opportunities()
+
+
+async def _setup_ultrafast(market, exchange):
+    from arbitrage.ultra_fast_detector import UltraFastArbitrageDetector
+    detector = UltraFastArbitrageDetector(min_profit_pct=0.4, max_trade_amount=20)
+    return exchange.apply, lambda payload, frame: detector._ultra_fast_detection('binance', exchange.tickers)
+
+
+async def _setup_multi(market, exchange):
+    from arbitrage.multi_exchange_detector import MultiExchangeDetector
+    from arbitrage.triangle_detector import find_triangles
+    detector = MultiExchangeDetector(SyntheticExchangeManager(exchange), None, {'max_trade_amount': 20})
+    triangles = [list(t) for t in find_triangles(market.symbols, True, 10 ** 6)]
+
+    def prepare(frame):
+        exchange.apply(frame)
+        # Serve the board from the detector's ticker cache so the REST rate-limit sleep isn't timed
+        detector._last_tickers[exchange.name] = exchange.tickers
+        detector._last_ticker_time[exchange.name] = time.time()
+    return prepare, lambda payload, frame: detector._scan_exchange_triangles_all(exchange, triangles)
+
+
+SETUPS: Dict[str, Callable] = {
+    'simple': _setup_simple,
+    'realtime': _setup_realtime,
+    'usdt': _setup_usdt,
+    'triangle': _setup_triangle,
+    'enhanced': _setup_enhanced,
+    'working': _setup_working,
+    'ultrafast': _setup_ultrafast,
+    'multi': _setup_multi,
+}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+
+async def _drive(prepare, run, frames, payloads) -> List[int]:
+    latencies = []
+    for frame, payload in zip(frames, payloads):
+        if prepare:
+            prepare(frame)
+        start = time.perf_counter_ns()
+        result = run(payload, frame)
+        if inspect.isawaitable(result):
+            await result
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+async def benchmark_detector(name: str, args) -> Dict[str, Any]:
+    """Run one detector over the tick stream and collect its figures."""
+    market = SyntheticMarket(args.pairs, args.cross_ratio, args.seed)
+    frames = market.generate_frames(args.frames + args.warmup, args.tickers_per_frame)
+    payloads = [json.dumps(frame) for frame in frames]
+    warm_frames, warm_payloads = frames[:args.warmup], payloads[:args.warmup]
+    frames, payloads = frames[args.warmup:], payloads[args.warmup:]
+
+    exchange = SyntheticExchange(market)
+    prepare, run = await SETUPS[name](market, exchange)
+
+    await _drive(prepare, run, warm_frames, warm_payloads)
+
+    latencies = await _drive(prepare, run, frames, payloads)
+    busy_seconds = sum(latencies) / 1e9
+    updates = sum(len(frame) for frame in frames)
+    ordered = sorted(latencies)
+
+    # Allocation pass on a slice of the stream (tracemalloc slows execution, so it is not timed)
+    alloc_frames = frames[:args.alloc_frames]
+    alloc_payloads = payloads[:args.alloc_frames]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    await _drive(prepare, run, alloc_frames, alloc_payloads)
+    after = tracemalloc.take_snapshot()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+
+    return {
+        'frames': len(frames),
+        'updates': updates,
+        'busy_seconds': busy_seconds,
+        'updates_per_second': updates / busy_seconds if busy_seconds > 0 else 0.0,
+        'frames_per_second': len(frames) / busy_seconds if busy_seconds > 0 else 0.0,
+        'latency_ms': {
+            'mean': busy_seconds * 1000 / len(latencies) if latencies else 0.0,
+            'p50': _percentile(ordered, 50) / 1e6,
+            'p90': _percentile(ordered, 90) / 1e6,
+            'p99': _percentile(ordered, 99) / 1e6,
+            'max': ordered[-1] / 1e6 if ordered else 0.0,
+        },
+        'allocations': {
+            'frames': len(alloc_frames),
+            'peak_traced_bytes': alloc_peak,
+            'net_bytes': sum(stat.size_diff for stat in diff),
+            'net_blocks': sum(stat.count_diff for stat in diff),
+        },
+        'peak_rss_bytes': _peak_rss_bytes(),
+    }
+
+
+def _run_isolated(name: str, args) -> Dict[str, Any]:
+    """Run one detector in a fresh interpreter and read back its JSON result."""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as tmp:
+        result_file = tmp.name
+    try:
+        cmd = [sys.executable, os.path.abspath(__file__), '--only', name, '--in-process',
+               '--result-file', result_file,
+               '--pairs', str(args.pairs), '--cross-ratio', str(args.cross_ratio),
+               '--frames', str(args.frames), '--warmup', str(args.warmup),
+               '--tickers-per-frame', str(args.tickers_per_frame),
+               '--alloc-frames', str(args.alloc_frames), '--seed', str(args.seed)]
+        if args.with_logging:
+            cmd.append('--with-logging')
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                              timeout=args.timeout)
+        with open(result_file) as f:
+            results = json.load(f)
+        if name not in results:
+            return {'error': proc.stderr.strip()[-500:] or f"exit code {proc.returncode}"}
+        return results[name]
+    except Exception as e:
+        return {'error': str(e)}
+    finally:
+        try:
+            os.remove(result_file)
+        except OSError:
+            pass
+
+
+def _git_commit() -> str:
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output(['git', '-C', root, 'rev-parse', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()[:7]
+    except Exception:
+        return 'unknown'
+
+
+def _check_regressions(report: Dict[str, Any], baseline_path: str, max_regression: float) -> List[str]:
+    """Compare updates/sec against a previous report; return human-readable regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, result in report['results'].items():
+        old = baseline.get('results', {}).get(name, {})
+        if 'updates_per_second' not in result or not old.get('updates_per_second'):
+            continue
+        change = result['updates_per_second'] / old['updates_per_second'] - 1
+        if change < -max_regression:
+            regressions.append(f"{name}: {old['updates_per_second']:.0f} -> "
+                               f"{result['updates_per_second']:.0f} updates/s ({change * 100:+.1f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark detector throughput on a synthetic tick stream')
+    parser.add_argument('--only', default=','.join(DETECTORS), help=f"Comma-separated subset of {DETECTORS}")
+    parser.add_argument('--pairs', type=int, default=600, help='Number of markets on the synthetic exchange')
+    parser.add_argument('--cross-ratio', type=float, default=0.5,
+                        help='Probability a coin also lists against BTC/ETH/BNB (controls triangle count)')
+    parser.add_argument('--frames', type=int, default=200, help='Timed tick frames per detector')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--tickers-per-frame', type=int, default=200)
+    parser.add_argument('--alloc-frames', type=int, default=20, help='Frames replayed under tracemalloc')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=int, default=600, help='Per-detector timeout in seconds')
+    parser.add_argument('--in-process', action='store_true', help='Do not isolate detectors in subprocesses')
+    parser.add_argument('--with-logging', action='store_true', help='Keep detector INFO logging enabled')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    parser.add_argument('--baseline', help='Previous JSON report to compare updates/sec against')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Allowed fractional drop in updates/sec versus --baseline')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SETUPS]
+    if unknown:
+        parser.error(f"Unknown detectors: {unknown}")
+
+    if not args.with_logging:
+        logging.disable(logging.INFO)
+
+    results: Dict[str, Any] = {}
+    for name in names:
+        if args.in_process:
+            try:
+                results[name] = asyncio.run(benchmark_detector(name, args))
+            except Exception as e:
+                results[name] = {'error': f"{type(e).__name__}: {e}"}
+        else:
+            results[name] = _run_isolated(name, args)
+
+    if args.result_file:
+        with open(args.result_file, 'w') as f:
+            json.dump(results, f)
+        return 0
+
+    from arbitrage.triangle_detector import find_triangles
+    market = SyntheticMarket(args.pairs, args.cross_ratio, args.seed)
+
+    report = {
+        'benchmark': 'detector_throughput',
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {k: v for k, v in vars(args).items() if k not in ('output', 'result_file', 'baseline')},
+        'market': {
+            'pairs': len(market.symbols),
+            'currencies': len(market.usd),
+            'triangle_paths': len(find_triangles(market.symbols, False, 10 ** 7)),
+            'usdt_triangles': len(find_triangles(market.symbols, True, 10 ** 7)),
+        },
+        'results': results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = _check_regressions(report, args.baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
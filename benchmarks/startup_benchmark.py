@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Cold-start regression check for the bot's entry points.
+
+Imports each entry point in fresh interpreters (utils/startup_profile.py),
+takes the best of N runs, and fails when an entry exceeds its startup budget,
+pulls in a heavy module it should not load (pandas outside backtesting, GUI
+toolkits outside the GUI), or regresses against a previous report.
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --only main_saas,tenant_host --runs 5
+    python benchmarks/startup_benchmark.py --budget main_saas=0.8 --output startup.json
+    python benchmarks/startup_benchmark.py --baseline startup.json --max-regression 0.25
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+from datetime import datetime
+from typing import Dict, List, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.startup_profile import ENTRY_POINTS, profile_imports
+from utils.version import git_commit
+
+# Seconds for a fresh interpreter to import the entry point (best of --runs)
+DEFAULT_BUDGETS = {
+    'main': 1.5,
+    'main_gui': 2.5,
+    'web_server': 2.0,
+    'main_saas': 1.5,
+    'tenant_host': 1.5,
+}
+
+GUI_MODULES = {'tkinter', 'customtkinter', 'matplotlib'}
+ANALYSIS_MODULES = {'pandas', 'numpy', 'matplotlib'}
+
+# Top-level packages an entry point must not import at startup
+FORBIDDEN = {
+    'main': GUI_MODULES | ANALYSIS_MODULES,
+    'main_gui': ANALYSIS_MODULES,
+    'web_server': GUI_MODULES | ANALYSIS_MODULES,
+    'main_saas': GUI_MODULES | ANALYSIS_MODULES,
+    'tenant_host': GUI_MODULES | ANALYSIS_MODULES,
+}
+
+
+def measure(entry: str, runs: int) -> Dict[str, Any]:
+    """Best-of-N cold start for one entry point, with its slowest packages."""
+    profiles = [profile_imports(entry) for _ in range(runs)]
+    best = min(profiles, key=lambda p: p['wall_seconds'])
+    packages: Dict[str, float] = {}
+    for m in best['modules']:
+        root = m['module'].split('.')[0]
+        packages[root] = packages.get(root, 0.0) + m['self_ms']
+    return {
+        'ok': best['ok'],
+        'error': best['error'],
+        'wall_seconds': best['wall_seconds'],
+        'wall_seconds_all': [p['wall_seconds'] for p in profiles],
+        'import_ms': best['import_ms'],
+        'modules': len(best['modules']),
+        'top_packages_ms': dict(sorted(packages.items(), key=lambda x: x[1], reverse=True)[:15]),
+        'forbidden_imports': sorted(FORBIDDEN.get(entry, set()) & set(packages)),
+    }
+
+
+def _check_budgets(results: Dict[str, Any], budgets: Dict[str, float]) -> List[str]:
+    failures = []
+    for entry, result in results.items():
+        if not result['ok']:
+            failures.append(f"{entry}: import failed ({result['error']})")
+            continue
+        if result['wall_seconds'] > budgets[entry]:
+            failures.append(f"{entry}: cold start {result['wall_seconds']:.2f}s exceeds budget {budgets[entry]:.2f}s")
+        if result['forbidden_imports']:
+            failures.append(f"{entry}: imports {', '.join(result['forbidden_imports'])} at startup")
+    return failures
+
+
+def _check_regressions(report: Dict[str, Any], baseline_path: str, max_regression: float) -> List[str]:
+    """Compare cold-start wall time against a previous report; return human-readable regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for entry, result in report['results'].items():
+        old = baseline.get('results', {}).get(entry, {})
+        if not result['ok'] or not old.get('ok') or not old.get('wall_seconds'):
+            continue
+        change = result['wall_seconds'] / old['wall_seconds'] - 1
+        if change > max_regression:
+            regressions.append(f"{entry}: {old['wall_seconds']:.2f}s -> {result['wall_seconds']:.2f}s "
+                               f"({change * 100:+.1f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check entry-point cold-start time against a budget')
+    parser.add_argument('--only', default=','.join(ENTRY_POINTS), help=f"Comma-separated subset of {list(ENTRY_POINTS)}")
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters per entry point (best is kept)')
+    parser.add_argument('--budget', action='append', default=[], metavar='ENTRY=SECONDS',
+                        help='Override a budget, e.g. --budget main_saas=0.8 (repeatable)')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--baseline', help='Previous JSON report to compare cold-start time against')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Allowed fractional increase in cold-start time versus --baseline')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(',') if n.strip()]
+    unknown = [n for n in names if n not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"Unknown entry points: {unknown}")
+
+    budgets = dict(DEFAULT_BUDGETS)
+    for override in args.budget:
+        entry, _, seconds = override.partition('=')
+        if entry not in ENTRY_POINTS or not seconds:
+            parser.error(f"Invalid --budget {override!r}")
+        budgets[entry] = float(seconds)
+
+    results = {entry: measure(entry, args.runs) for entry in names}
+
+    report = {
+        'benchmark': 'startup',
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'budgets': {entry: budgets[entry] for entry in names},
+        'results': results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    failures = _check_budgets(results, budgets)
+    if args.baseline:
+        failures += [f"REGRESSION {line}" for line in _check_regressions(report, args.baseline, args.max_regression)]
+    for line in failures:
+        print(f"FAIL {line}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -67,8 +67,21 @@ class Config:
     MAX_SLIPPAGE_PERCENTAGE: float = 0.05
     ORDER_TIMEOUT_SECONDS: int = 5  # INSTANT: 5-second timeout for maximum speed
 
+    # Exchange Bootstrap
+    CONNECT_STEP_TIMEOUT: float = 15.0    # Per-step limit inside UnifiedExchange.connect
+    EXCHANGE_CONNECT_TIMEOUT: float = 45.0  # Whole connect per exchange; exchanges connect in parallel
+
+    # Multi-Exchange Scanning
+    EXCHANGE_SCAN_DEADLINE: float = 8.0  # Per-exchange fetch-and-evaluate limit; exchanges scan in parallel
+    SCAN_TOP_K: int = 200                # Opportunities kept after merging all exchanges
+
+    # Trade Journal (logs/trades.db); 0 keeps every trade, set a number of days to opt in to pruning
+    TRADE_RETENTION_DAYS: float = float(os.getenv('TRADE_RETENTION_DAYS', '0'))
+    TRADE_COMPACT_INTERVAL_HOURS: float = float(os.getenv('TRADE_COMPACT_INTERVAL_HOURS', '6'))
+
     # GUI Settings
     GUI_UPDATE_INTERVAL: int = 500  # INSTANT: 500ms GUI updates
+    GUI_FRAME_INTERVAL: int = 33  # Queued WebSocket updates are applied at most once per frame (~30 fps)
     MAX_OPPORTUNITIES_DISPLAY: int = 50
 
     # WebSocket
@@ -5,15 +5,16 @@ Fixed Binance Exchange Implementation with Real Balance Display
 
 import asyncio
 import time
-import ccxt.async_support as ccxt
 from typing import Dict, Any, List, Optional, Tuple, Callable
 from exchanges.base_exchange import BaseExchange
 from utils.logger import setup_logger
+from exchanges.price_board import get_price_board
 
 class BinanceExchange(BaseExchange):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.logger = setup_logger('BinanceExchange')
+        import ccxt.async_support as ccxt  # Imported on use; ccxt is slow to import
         self.exchange = ccxt.binance({
             'apiKey': config['api_key'],
             'secret': config['api_secret'],
@@ -142,49 +143,26 @@ class BinanceExchange(BaseExchange):
             return {}
 
     async def _calculate_usd_value(self, balances: Dict[str, float]) -> float:
-        """Calculate total USD value of balances"""
+        """Calculate total USD value of balances from the shared price board"""
         if not balances:
             return 0.0
         
-        total_usd = 0.0
-        
         try:
-            # Get current tickers for price conversion
-            tickers = await self.exchange.fetch_tickers()
+            board = get_price_board()
+            if not board.has_prices('binance'):
+                # One batched fetch seeds the board; later valuations reuse streamed prices
+                board.update('binance', await self.exchange.fetch_tickers())
             
-            for currency, amount in balances.items():
-                if amount <= 0:
-                    continue
-                
-                if currency in ['USDT', 'USDC', 'BUSD', 'USD']:
-                    # Stablecoins = 1:1 USD
-                    usd_value = amount
-                    total_usd += usd_value
-                    self.logger.debug(f"💵 {currency}: {amount:.8f} = ${usd_value:.2f}")
-                else:
-                    # Try to find USDT pair
-                    pair = f"{currency}/USDT"
-                    if pair in tickers:
-                        price = float(tickers[pair]['last'])
-                        usd_value = amount * price
-                        total_usd += usd_value
-                        self.logger.debug(f"💵 {currency}: {amount:.8f} × ${price:.2f} = ${usd_value:.2f}")
-                    else:
-                        # Try BTC pair then convert to USD
-                        btc_pair = f"{currency}/BTC"
-                        if btc_pair in tickers and 'BTC/USDT' in tickers:
-                            btc_price = float(tickers[btc_pair]['last'])
-                            btc_usd = float(tickers['BTC/USDT']['last'])
-                            usd_value = amount * btc_price * btc_usd
-                            total_usd += usd_value
-                            self.logger.debug(f"💵 {currency}: {amount:.8f} via BTC = ${usd_value:.2f}")
-                        else:
-                            self.logger.debug(f"💵 {currency}: {amount:.8f} (no price data)")
+            valuation = board.value(balances, 'binance')
+            for currency, usd_value in valuation['by_asset'].items():
+                self.logger.debug(f"💵 {currency}: {balances[currency]:.8f} = ${usd_value:.2f}")
+            for currency in valuation['unpriced']:
+                self.logger.debug(f"💵 {currency}: {balances[currency]:.8f} (no price data)")
+            return valuation['total_usd']
         
         except Exception as e:
             self.logger.error(f"Error calculating USD value: {e}")
-        
-        return total_usd
+            return 0.0
 
     async def fetch_complete_balance(self) -> Dict[str, Any]:
         """Fetch complete balance with USD conversion for compatibility"""
@@ -215,6 +193,7 @@ class BinanceExchange(BaseExchange):
         """Fetch ticker data"""
         try:
             ticker = await self.exchange.fetch_ticker(symbol)
+            get_price_board().update_quote('binance', symbol, ticker.get('bid'), ticker.get('ask'), ticker.get('last'))
             return {
                 'symbol': symbol,
                 'bid': ticker.get('bid'),
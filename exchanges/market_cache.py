@@ -0,0 +1,148 @@
+"""
+On-disk cache of exchange market metadata.
+
+load_markets() and the raw exchangeInfo endpoints return multi-megabyte
+payloads that change rarely. Entries are stored per exchange as compressed JSON
+under MARKET_CACHE_DIR (default data/market_cache):
+
+- fresh entry (younger than the TTL): returned without touching the network
+- stale entry: returned immediately while one background task refreshes it
+- missing entry: fetched once; concurrent callers in this process wait for it,
+  and other processes sharing the directory wait on a file lock and then read
+  the entry it wrote, so a process group downloads each payload at most once
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import time
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, per-process single-flight only
+    fcntl = None
+
+from utils.logger import setup_logger
+
+
+class MarketMetadataCache:
+    """Per-exchange metadata persisted to disk with TTL and background refresh."""
+
+    def __init__(self, cache_dir: str = 'data/market_cache', ttl: float = 6 * 3600):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.logger = setup_logger('MarketMetadataCache')
+        self._memory: Dict[str, Tuple[float, Any]] = {}  # name -> (fetched_at, data)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.json.gz")
+
+    def _read(self, name: str) -> Optional[Tuple[float, Any]]:
+        try:
+            with gzip.open(self._path(name), 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry['fetched_at'], entry['data']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable market cache entry {name}: {e}")
+            return None
+
+    def _write(self, name: str, fetched_at: float, data: Any) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(name)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=1) as f:
+                json.dump({'fetched_at': fetched_at, 'data': data}, f, default=str, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.error(f"Error writing market cache entry {name}: {e}")
+
+    def _lookup(self, name: str) -> Optional[Tuple[float, Any]]:
+        entry = self._memory.get(name)
+        if entry is None:
+            entry = self._read(name)
+            if entry is not None:
+                self._memory[name] = entry
+        return entry
+
+    async def get(self, name: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """Return cached metadata for `name`, fetching it only when nothing usable is cached."""
+        ttl = self.ttl if ttl is None else ttl
+        entry = self._lookup(name)
+        if entry is not None:
+            if time.time() - entry[0] >= ttl:
+                self._schedule_refresh(name, fetch)
+            return entry[1]
+
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            entry = self._lookup(name)
+            if entry is None:
+                entry = await self._fetch_exclusive(name, fetch, ttl)
+            return entry[1]
+
+    async def _fetch_exclusive(self, name: str, fetch: Callable[[], Awaitable[Any]],
+                               ttl: float) -> Tuple[float, Any]:
+        """Fetch under the cross-process lock, reusing an entry another process wrote meanwhile."""
+        lock_file = None
+        try:
+            if fcntl is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                lock_file = open(os.path.join(self.cache_dir, f"{name}.lock"), 'w')
+                await asyncio.to_thread(fcntl.flock, lock_file.fileno(), fcntl.LOCK_EX)
+                entry = self._read(name)
+                if entry is not None and time.time() - entry[0] < ttl:
+                    self._memory[name] = entry
+                    return entry
+
+            started = time.perf_counter()
+            data = await fetch()
+            entry = (time.time(), data)
+            await asyncio.to_thread(self._write, name, *entry)
+            self._memory[name] = entry
+            self.logger.info(f"📦 Fetched and cached {name} market metadata in {time.perf_counter() - started:.2f}s")
+            return entry
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # Releases the flock
+
+    def _schedule_refresh(self, name: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        task = self._refreshing.get(name)
+        if task is None or task.done():
+            self._refreshing[name] = asyncio.create_task(self._refresh(name, fetch))
+
+    async def _refresh(self, name: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Replace a stale entry in the background; on failure the stale data stays in use."""
+        try:
+            lock = self._locks.setdefault(name, asyncio.Lock())
+            async with lock:
+                await self._fetch_exclusive(name, fetch, self.ttl)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Background refresh of {name} failed, keeping cached copy: {e}")
+
+    def invalidate(self, name: str) -> None:
+        """Drop an entry from memory and disk."""
+        self._memory.pop(name, None)
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+
+
+_market_cache_instance = None
+
+def get_market_cache() -> MarketMetadataCache:
+    """Get or create the global market metadata cache."""
+    global _market_cache_instance
+    if _market_cache_instance is None:
+        _market_cache_instance = MarketMetadataCache(
+            os.getenv('MARKET_CACHE_DIR', 'data/market_cache'),
+            float(os.getenv('MARKET_CACHE_TTL', str(6 * 3600)))
+        )
+    return _market_cache_instance
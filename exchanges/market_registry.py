@@ -0,0 +1,63 @@
+"""
+Process-wide registry of exchange market metadata.
+
+Every UnifiedExchange connected to the same exchange sees the same markets, so
+when many users share one interpreter (python-bot/tenant_host.py) the markets
+are fetched once per exchange and installed into each ccxt client, and the
+triangle universe built from them is computed once as well. Markets are
+persisted through exchanges/market_cache.py, so a warm start installs them
+without the network. Testnet (sandbox) and live markets are cached separately.
+"""
+
+from typing import Dict, List, Any, Callable, Tuple
+
+from exchanges.market_cache import get_market_cache
+from utils.logger import setup_logger
+
+
+class MarketRegistry:
+    """Shared ccxt markets and derived triangle lists per exchange and environment."""
+
+    def __init__(self):
+        self.logger = setup_logger('MarketRegistry')
+        self._triangles: Dict[Tuple[str, bool, Any], List[Tuple[str, str, str]]] = {}
+
+    @staticmethod
+    def _cache_name(exchange_id: str, sandbox: bool) -> str:
+        return f"{exchange_id}.sandbox.markets" if sandbox else f"{exchange_id}.markets"
+
+    async def load_markets(self, exchange_id: str, client, sandbox: bool = False) -> Dict[str, Any]:
+        """Install markets into a ccxt client from the metadata cache, fetching them only on a miss."""
+        async def fetch() -> Dict[str, Any]:
+            await client.load_markets(True)
+            return {'markets': client.markets, 'currencies': client.currencies}
+
+        cached = await get_market_cache().get(self._cache_name(exchange_id, sandbox), fetch)
+        client.set_markets(cached['markets'], cached['currencies'])
+        return client.markets
+
+    def triangles(self, exchange_id: str, key: Any, build: Callable[[], List[Tuple[str, str, str]]],
+                  sandbox: bool = False) -> List[Tuple[str, str, str]]:
+        """Triangle list for an exchange, environment and build options, built once."""
+        cache_key = (exchange_id, sandbox, key)
+        triangles = self._triangles.get(cache_key)
+        if triangles is None:
+            triangles = self._triangles[cache_key] = build()
+        return triangles
+
+    def invalidate(self, exchange_id: str) -> None:
+        """Forget cached metadata for one exchange (both environments) so the next connect refetches it."""
+        for sandbox in (False, True):
+            get_market_cache().invalidate(self._cache_name(exchange_id, sandbox))
+        for cache_key in [k for k in self._triangles if k[0] == exchange_id]:
+            del self._triangles[cache_key]
+
+
+_market_registry_instance = None
+
+def get_market_registry() -> MarketRegistry:
+    """Get or create the global market registry."""
+    global _market_registry_instance
+    if _market_registry_instance is None:
+        _market_registry_instance = MarketRegistry()
+    return _market_registry_instance
@@ -3,19 +3,8 @@ Multi-exchange manager and triangle detector for arbitrage opportunities.
 """
 
 # --- Prevent fatal 'HEAD' Git errors ---
-import subprocess, os
-GIT_COMMIT = "unknown"
-
-try:
-    if os.path.exists(os.path.join(os.path.dirname(__file__), "..", ".git")):
-        repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        commit = subprocess.check_output(
-            ["git", "-C", repo_root, "rev-parse", "HEAD"],
-            stderr=subprocess.DEVNULL
-        ).decode().strip()
-        GIT_COMMIT = commit[:7]
-except Exception:
-    pass  # Keep GIT_COMMIT as "unknown"
+from utils.version import git_commit
+GIT_COMMIT = git_commit()  # Read from .git; no subprocess at import time
 
 print(f"Multi-Exchange Manager (Commit: {GIT_COMMIT})")
 # -----------------------------------------------
@@ -38,33 +27,48 @@ class MultiExchangeManager:
         self.triangles: Dict[str, List[Tuple[str, str, str]]] = {}
 
     async def initialize_exchanges(self, selected_exchanges: List[str] = None) -> bool:
-        """Initialize selected exchanges."""
+        """Initialize selected exchanges concurrently, each bounded by EXCHANGE_CONNECT_TIMEOUT."""
         if selected_exchanges is None:
             selected_exchanges = list(SUPPORTED_EXCHANGES.keys())
 
-        success_count = 0
-
+        known = []
         for exchange_id in selected_exchanges:
             if exchange_id not in SUPPORTED_EXCHANGES:
                 self.logger.warning(f"Unknown exchange: {exchange_id}")
-                continue
+            elif exchange_id not in known:
+                known.append(exchange_id)
 
-            try:
-                exchange = await self._create_exchange(exchange_id)
-                if exchange and await exchange.connect():
-                    self.exchanges[exchange_id] = exchange
-                    self.connected_exchanges.append(exchange_id)
-                    success_count += 1
-                    self.logger.info(f"Successfully connected to {exchange_id}")
-                else:
-                    self.logger.error(f"Failed to connect to {exchange_id}")
+        results = await asyncio.gather(*(self._connect_exchange(exchange_id) for exchange_id in known))
 
-            except Exception as e:
-                self.logger.error(f"Error initializing {exchange_id}: {e}")
+        # Keep the caller's exchange order regardless of which connected first
+        success_count = 0
+        for exchange_id, exchange in zip(known, results):
+            if exchange is not None:
+                self.exchanges[exchange_id] = exchange
+                self.connected_exchanges.append(exchange_id)
+                success_count += 1
 
         self.logger.info(f"Connected to {success_count}/{len(selected_exchanges)} exchanges")
         return success_count > 0
 
+    async def _connect_exchange(self, exchange_id: str) -> Optional[BaseExchange]:
+        """Create and connect one exchange; None if it fails or times out."""
+        exchange = None
+        try:
+            exchange = await self._create_exchange(exchange_id)
+            if exchange and await asyncio.wait_for(exchange.connect(), timeout=Config.EXCHANGE_CONNECT_TIMEOUT):
+                self.logger.info(f"Successfully connected to {exchange_id}")
+                return exchange
+            self.logger.error(f"Failed to connect to {exchange_id}")
+        except asyncio.TimeoutError:
+            self.logger.error(f"⏱️ Connecting to {exchange_id} timed out after {Config.EXCHANGE_CONNECT_TIMEOUT}s")
+        except Exception as e:
+            self.logger.error(f"Error initializing {exchange_id}: {e}")
+
+        if exchange is not None:
+            await exchange.disconnect()
+        return None
+
     async def _create_exchange(self, exchange_id: str) -> Optional[BaseExchange]:
         """Create exchange instance with proper configuration."""
         from exchanges.unified_exchange import UnifiedExchange
@@ -96,7 +100,8 @@ class MultiExchangeManager:
             'zero_fee_pairs': exchange_config.get('zero_fee_pairs', []),
             'maker_fee': exchange_config.get('maker_fee', 0.001),
             'taker_fee': exchange_config.get('taker_fee', 0.001),
-            'paper_trading': Config.PAPER_TRADING
+            'paper_trading': Config.PAPER_TRADING,
+            'connect_step_timeout': Config.CONNECT_STEP_TIMEOUT
         }
 
         return UnifiedExchange(config)
@@ -185,6 +190,9 @@ class MultiExchangeManager:
         self.exchanges.clear()
         self.connected_exchanges.clear()
 
+        from utils.http_sessions import get_http_sessions
+        await get_http_sessions().close_all()
+
     def get_exchange(self, exchange_id: str) -> Optional[BaseExchange]:
         """Get specific exchange instance."""
         return self.exchanges.get(exchange_id)
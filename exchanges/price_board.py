@@ -0,0 +1,147 @@
+"""
+Process-wide board of streamed quotes and USD valuation over them.
+
+Every ticker the bot already fetches (fetch_tickers scans, get_ticker calls,
+websocket price updates) is recorded here per exchange. USD prices are then
+resolved from that board without any REST calls: each market BASE/QUOTE is an
+edge in a conversion graph, weighted by the spread paid to cross it, and every
+asset is priced through its cheapest route to a USD stablecoin (direct, or via
+BTC, ETH, USDC, ...). Markets quoted only by a last trade price carry a fixed
+penalty instead of a zero spread, so they are used only when no reasonably
+priced two-sided route exists. Whole portfolios are valued in one call.
+"""
+
+import heapq
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.logger import setup_logger
+
+USD_ANCHORS = ('USD', 'USDT', 'USDC', 'BUSD')  # Treated as 1:1 with USD
+LAST_ONLY_COST = math.log(1.05)  # Route cost of a last-price-only market: as if it had a 5% spread
+
+
+class PriceBoard:
+    """Latest bid/ask per exchange and symbol, with cached USD resolution."""
+
+    def __init__(self, max_age: float = 300.0, max_hops: int = 3):
+        self.logger = setup_logger('PriceBoard')
+        self.max_age = max_age  # Quotes older than this are ignored when resolving
+        self.max_hops = max_hops  # Longest conversion route considered
+        self._quotes: Dict[str, Dict[str, Tuple[float, float, float, bool]]] = {}  # exchange -> symbol -> (bid, ask, ts, two_sided)
+        self._usd: Dict[str, Dict[str, float]] = {}  # exchange -> asset -> USD price
+        self._dirty: set = set()
+
+    def update(self, exchange_id: str, tickers: Dict[str, Any]) -> None:
+        """Record a ccxt fetch_tickers() result."""
+        book = self._quotes.setdefault(exchange_id, {})
+        now = time.time()
+        for symbol, ticker in tickers.items():
+            if ticker:
+                self._store(book, symbol, ticker.get('bid'), ticker.get('ask'), ticker.get('last'), now)
+        self._dirty.add(exchange_id)
+
+    def update_quote(self, exchange_id: str, symbol: str, bid: Optional[float], ask: Optional[float],
+                     last: Optional[float] = None) -> None:
+        """Record a single quote (get_ticker, websocket updates)."""
+        self._store(self._quotes.setdefault(exchange_id, {}), symbol, bid, ask, last, time.time())
+        self._dirty.add(exchange_id)
+
+    @staticmethod
+    def _store(book: Dict[str, Tuple[float, float, float, bool]], symbol: str, bid, ask, last, now: float) -> None:
+        if '/' not in symbol or ':' in symbol:  # Spot markets only
+            return
+        bid = float(bid or 0)
+        ask = float(ask or 0)
+        two_sided = bid > 0 and ask >= bid
+        if not two_sided:
+            last = float(last or 0)
+            if last <= 0:
+                return
+            bid = ask = last
+        book[symbol] = (bid, ask, now, two_sided)
+
+    def has_prices(self, exchange_id: str) -> bool:
+        return bool(self._quotes.get(exchange_id))
+
+    def _resolve(self, exchange_id: str) -> Dict[str, float]:
+        """USD price of every reachable asset on one exchange, via minimum-spread routes."""
+        if exchange_id not in self._dirty and exchange_id in self._usd:
+            return self._usd[exchange_id]
+
+        # into[asset] lists (other, rate, cost): one unit of `other` converts to `rate` units of `asset`
+        into: Dict[str, List[Tuple[str, float, float]]] = defaultdict(list)
+        cutoff = time.time() - self.max_age
+        for symbol, (bid, ask, ts, two_sided) in self._quotes.get(exchange_id, {}).items():
+            if ts < cutoff:
+                continue
+            base, quote = symbol.split('/', 1)
+            cost = math.log(ask / bid) if two_sided else LAST_ONLY_COST  # Spread paid crossing this market
+            into[quote].append((base, bid, cost))  # Sell base at the bid
+            into[base].append((quote, 1.0 / ask, cost))  # Buy base at the ask
+
+        # Multi-source Dijkstra outward from the USD anchors over (asset, hops) states: the first
+        # pop of an asset is its cheapest route, but a costlier route with fewer hops is still
+        # expanded so the hop limit never hides assets that route would reach
+        prices: Dict[str, float] = {}
+        settled_hops: Dict[str, int] = {}
+        heap = [(0.0, 0, anchor, 1.0) for anchor in USD_ANCHORS]
+        while heap:
+            cost, hops, asset, usd = heapq.heappop(heap)
+            if settled_hops.get(asset, self.max_hops + 1) <= hops:
+                continue  # Dominated: reached before at no more cost and no more hops
+            settled_hops[asset] = hops
+            prices.setdefault(asset, usd)
+            if hops >= self.max_hops:
+                continue
+            for other, rate, edge_cost in into.get(asset, ()):
+                if settled_hops.get(other, self.max_hops + 1) > hops + 1:
+                    heapq.heappush(heap, (cost + edge_cost, hops + 1, other, rate * usd))
+
+        self._usd[exchange_id] = prices
+        self._dirty.discard(exchange_id)
+        return prices
+
+    def usd_price(self, asset: str, exchange_id: Optional[str] = None) -> Optional[float]:
+        """USD price of an asset, preferring `exchange_id` and falling back to any other exchange."""
+        if exchange_id is not None:
+            price = self._resolve(exchange_id).get(asset)
+            if price is not None:
+                return price
+        for other in list(self._quotes):
+            if other != exchange_id:
+                price = self._resolve(other).get(asset)
+                if price is not None:
+                    return price
+        return 1.0 if asset in USD_ANCHORS else None
+
+    def value(self, balances: Dict[str, float], exchange_id: Optional[str] = None) -> Dict[str, Any]:
+        """Value a whole portfolio in one pass: total, per-asset USD values, and assets with no route."""
+        total = 0.0
+        by_asset: Dict[str, float] = {}
+        unpriced: List[str] = []
+        for asset, amount in balances.items():
+            if amount <= 0:
+                continue
+            price = self.usd_price(asset, exchange_id)
+            if price is None:
+                unpriced.append(asset)
+                continue
+            by_asset[asset] = amount * price
+            total += by_asset[asset]
+        return {'total_usd': total, 'by_asset': by_asset, 'unpriced': unpriced}
+
+    def stats(self) -> Dict[str, int]:
+        return {exchange_id: len(book) for exchange_id, book in self._quotes.items()}
+
+
+_price_board_instance = None
+
+def get_price_board() -> PriceBoard:
+    """Get or create the global price board."""
+    global _price_board_instance
+    if _price_board_instance is None:
+        _price_board_instance = PriceBoard()
+    return _price_board_instance
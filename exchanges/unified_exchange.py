@@ -4,26 +4,21 @@ Handles ccxt integration, normalization, and fallback for paper/live modes.
 """
 
 # --- Prevent fatal 'HEAD' Git errors ---
-import subprocess, os
-GIT_COMMIT = "unknown"
-try:
-    if os.path.exists(os.path.join(os.path.dirname(__file__), "..", ".git")):
-        repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        commit = subprocess.check_output(
-            ["git", "-C", repo_root, "rev-parse", "HEAD"],
-            stderr=subprocess.DEVNULL
-        ).decode().strip()
-        GIT_COMMIT = commit[:7]
-except Exception:
-    pass  # Keep GIT_COMMIT as "unknown"
+from utils.version import git_commit
+GIT_COMMIT = git_commit()  # Read from .git; no subprocess at import time
 # -----------------------------------------------
 
-import ccxt.async_support as ccxt
 import asyncio
 import time
 from typing import Dict, List, Any, Optional, Tuple, Callable
 from exchanges.base_exchange import BaseExchange
 from utils.logger import setup_logger
+from utils import metrics
+from exchanges.price_board import get_price_board
+
+# Successful connectivity probes are shared by every exchange in the process
+CONNECTIVITY_CACHE_SECONDS = 30.0
+_last_connectivity_ok = 0.0
 
 
 class UnifiedExchange(BaseExchange):
@@ -34,7 +29,7 @@ class UnifiedExchange(BaseExchange):
         self.exchange_id = config['exchange_id']
         self.name = self.exchange_id  # For compatibility with MultiExchangeDetector
         self.logger = setup_logger(f'Exchange_{self.exchange_id.title()}')
-        self.exchange: Optional[ccxt.Exchange] = None
+        self.exchange: Optional[Any] = None  # ccxt.async_support client, created in connect()
         self.paper_trading = False  # ALWAYS LIVE TRADING
         self.fee_token = config.get('fee_token')
         self.fee_discount = config.get('fee_discount', 0.0)
@@ -47,6 +42,9 @@ class UnifiedExchange(BaseExchange):
         self.live_trading = True  # 🔴 FORCE LIVE TRADING
         self.dry_run = False      # 🔴 NO DRY RUN MODE
         self.trading_pairs: Dict[str, Any] = {}
+        self.connect_step_timeout = config.get('connect_step_timeout', 15.0)
+        # Testnet and live are different markets: shared market data is kept apart per environment
+        self.sandbox = bool(config.get('sandbox', False))
         
         # KuCoin timestamp synchronization
         self.server_time_offset = 0
@@ -57,10 +55,18 @@ class UnifiedExchange(BaseExchange):
         self.logger.info(f"✅ READY: Real-money trading enabled with enforced profit/amount limits.")
 
     async def connect(self) -> bool:
+        """
+        Bootstrap the connection, running independent steps concurrently.
+
+        The connectivity probe runs alongside client setup and market loading
+        (markets come from the shared registry when another connection already
+        fetched them); market verification and the balance fetch then run
+        together. Every step is bounded by `connect_step_timeout`.
+        """
+        started = time.perf_counter()
         try:
-            if not await self._check_internet_connectivity():
-                self.logger.error(f"No internet connection for {self.exchange_id}")
-                return False
+            # ccxt is imported on first connect so importing this module stays cheap
+            import ccxt.async_support as ccxt
 
             # Handle Gate.io special case
             if self.exchange_id == 'gate':
@@ -89,7 +95,7 @@ class UnifiedExchange(BaseExchange):
             exchange_config.update({
                 'apiKey': api_key,
                 'secret': api_secret,
-                'sandbox': False  # ALWAYS LIVE TRADING - NO SANDBOX
+                'sandbox': self.sandbox  # Live unless the credential is explicitly a testnet one
             })
             
             # Add passphrase for exchanges that require it (like KuCoin)
@@ -106,17 +112,50 @@ class UnifiedExchange(BaseExchange):
                 })
                 self.logger.info("🕒 KuCoin timestamp synchronization enabled")
 
+            # All clients for this exchange share one pooled, DNS-cached session
+            from utils.http_sessions import get_http_sessions
+            exchange_config['session'] = get_http_sessions().session(f"ccxt:{self.exchange_id}")
+
             self.exchange = exchange_class(exchange_config)
+            if self.sandbox:
+                self.exchange.set_sandbox_mode(True)
+                self.logger.warning(f"🧪 {self.exchange_id.upper()} connected to the exchange TESTNET (sandbox credential)")
+            metrics.instrument_ccxt(self.exchange, self.exchange_id)
             
             # Synchronize server time for KuCoin
             if self.exchange_id == 'kucoin':
                 await self._synchronize_kucoin_time()
             
-            await self.exchange.load_markets()
-            await self._verify_real_connection()
+            from exchanges.market_registry import get_market_registry
+            online, markets = await asyncio.gather(
+                self._bootstrap_step('connectivity check', self._check_internet_connectivity()),
+                self._bootstrap_step('market load', get_market_registry().load_markets(self.exchange_id, self.exchange, self.sandbox)),
+                return_exceptions=True
+            )
+            if online is not True:
+                self.logger.error(f"No internet connection for {self.exchange_id}")
+                return False
+            if isinstance(markets, BaseException):
+                raise markets
+
+            # Verification must pass; the balance and price seed are informational and may time out
+            verified, balance, _ = await asyncio.gather(
+                self._bootstrap_step('market verification', self._verify_real_connection()),
+                self._bootstrap_step('balance fetch', self._fetch_balances()),
+                self._bootstrap_step('price seed', self._seed_prices()),
+                return_exceptions=True
+            )
+            if isinstance(verified, BaseException):
+                raise verified
+            if isinstance(balance, BaseException):
+                self.logger.warning(f"⚠️ Balance fetch failed during connect to {self.exchange_id}: {balance}")
+                balance = {}
+            
+            self.trading_pairs = {
+                s: m for s, m in self.exchange.markets.items() if m.get("active", False)
+            }
             
             # Verify account balance for live trading
-            balance = await self.get_account_balance()
             if balance:
                 total_balance_usd = await self._calculate_usd_value(balance)
             else:
@@ -137,10 +176,6 @@ class UnifiedExchange(BaseExchange):
                     self.logger.info("✅ Balance detected but low - bot will still function for testing")
             else:
                 self.logger.info(f"✅ Sufficient balance detected: ${total_balance_usd:.2f} USD")
-
-            self.trading_pairs = {
-                s: m for s, m in self.exchange.markets.items() if m.get("active", False)
-            }
             
             # Log available pairs for debugging
             total_pairs = len(self.trading_pairs)
@@ -150,14 +185,25 @@ class UnifiedExchange(BaseExchange):
             self.logger.info(f"📊 {self.exchange_id} trading pairs: {total_pairs} total, {usdt_pairs} USDT pairs, {btc_pairs} BTC pairs")
 
             self.is_connected = True
+            if self.exchange.has.get('fetchTime'):
+                # Keep pooled connections to the order endpoints open between trades
+                get_http_sessions().keep_warm(f"ccxt:{self.exchange_id}", self, self.exchange.fetch_time)
             self.logger.info(f"✅ Connected to {self.exchange_id} - REAL ACCOUNT ACCESS")
             self.logger.info(f"{self.exchange_id}: {len(self.trading_pairs)} trading pairs")
+            self.logger.info(f"⏱️ {self.exchange_id} bootstrap took {time.perf_counter() - started:.2f}s")
             return True
         except Exception as e:
             self.logger.error(f"❌ Failed to connect to {self.exchange_id}: {e}")
             self.logger.error("   Check your API credentials in .env file")
             return False
 
+    async def _bootstrap_step(self, name: str, step) -> Any:
+        """Run one connect step under the bootstrap timeout."""
+        try:
+            return await asyncio.wait_for(step, timeout=self.connect_step_timeout)
+        except asyncio.TimeoutError:
+            raise Exception(f"{name} timed out after {self.connect_step_timeout}s")
+
     async def _synchronize_kucoin_time(self):
         """Synchronize time with KuCoin server to prevent timestamp errors"""
         try:
@@ -190,11 +236,20 @@ class UnifiedExchange(BaseExchange):
                 await self._synchronize_kucoin_time()
 
     async def _check_internet_connectivity(self) -> bool:
+        global _last_connectivity_ok
+        # A recent success from any exchange in this process is good enough
+        if time.time() - _last_connectivity_ok < CONNECTIVITY_CACHE_SECONDS:
+            return True
         import aiohttp
+        from utils.http_sessions import get_http_sessions
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get('https://httpbin.org/status/200') as response:
-                    return response.status == 200
+            url = 'https://httpbin.org/status/200'
+            session = get_http_sessions().for_url(url)
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status == 200:
+                    _last_connectivity_ok = time.time()
+                    return True
+                return False
         except Exception:
             return False
 
@@ -237,6 +292,8 @@ class UnifiedExchange(BaseExchange):
     async def disconnect(self) -> None:
         try:
             if self.exchange:
+                from utils.http_sessions import get_http_sessions
+                get_http_sessions().stop_warm(f"ccxt:{self.exchange_id}", self)
                 await self.exchange.close()
             self.is_connected = False
             self.logger.info(f"Disconnected from {self.exchange_id}")
@@ -248,7 +305,9 @@ class UnifiedExchange(BaseExchange):
 
     async def fetch_tickers(self) -> Dict[str, Any]:
         try:
-            return await self.exchange.fetch_tickers()
+            tickers = await self.exchange.fetch_tickers()
+            get_price_board().update(self.exchange_id, tickers)
+            return tickers
         except Exception as e:
             self.logger.error(f"Error fetching tickers from {self.exchange_id}: {e}")
             return {}
@@ -271,6 +330,7 @@ class UnifiedExchange(BaseExchange):
             if not norm_symbol:
                 return {}
             ticker = await self.exchange.fetch_ticker(norm_symbol)
+            get_price_board().update_quote(self.exchange_id, norm_symbol, ticker.get('bid'), ticker.get('ask'), ticker.get('last'))
             return {
                 'exchange': self.exchange_id,
                 'symbol': norm_symbol,
@@ -341,6 +401,8 @@ class UnifiedExchange(BaseExchange):
                 raise ValueError(f"Invalid order parameters: symbol={symbol}, side={side}, qty={qty}")
             
             # LIGHTNING MODE: Direct execution
+            submit_time = time.perf_counter()
+            metrics.ORDERS_SENT.labels(self.exchange_id, side.lower()).inc()
             
             # Gate.io specific order handling
             if self.exchange_id == 'gate':
@@ -395,6 +457,7 @@ class UnifiedExchange(BaseExchange):
                 order = await self.exchange.create_market_order(symbol, side, qty)
             
             if not order:
+                metrics.ORDER_ERRORS.labels(self.exchange_id).inc()
                 return {
                     'success': False,
                     'status': 'failed',
@@ -415,7 +478,9 @@ class UnifiedExchange(BaseExchange):
 
                 if final_order:
                     order = final_order  # Use the completed order data
+                    completed_latency = time.perf_counter() - submit_time  # Observed only if it filled
                 else:
+                    metrics.ORDER_ERRORS.labels(self.exchange_id).inc()
                     return {
                         'success': False,
                         'status': 'timeout',
@@ -423,6 +488,7 @@ class UnifiedExchange(BaseExchange):
                         'id': order_id
                     }
             else:
+                metrics.ORDER_ERRORS.labels(self.exchange_id).inc()
                 return {
                     'success': False,
                     'status': 'failed',
@@ -451,6 +517,7 @@ class UnifiedExchange(BaseExchange):
             # Verify order was executed successfully
             if status in ['closed', 'filled'] and filled_qty > 0:
                 self.logger.debug(f"⚡ SUCCESS: {order_id}")
+                metrics.FILL_LATENCY.labels(self.exchange_id).observe(completed_latency)
                 
                 # Return success with all details
                 return {
@@ -472,6 +539,7 @@ class UnifiedExchange(BaseExchange):
                 # Order not filled or failed
                 error_msg = f"Order not executed: status={status}, filled={filled_qty}"
                 self.logger.error(f"❌ ORDER FAILED: {error_msg}")
+                metrics.ORDER_ERRORS.labels(self.exchange_id).inc()
                 return {
                     'success': False,
                     'status': 'failed',
@@ -483,6 +551,7 @@ class UnifiedExchange(BaseExchange):
         except Exception as e:
             error_msg = f"{self.exchange_id} order execution failed: {str(e)}"
             self.logger.error(f"❌ ERROR: {error_msg}")
+            metrics.ORDER_ERRORS.labels(self.exchange_id).inc()
             
             # If timestamp error, try to re-sync and retry once
             if self.exchange_id == 'kucoin' and 'KC-API-TIMESTAMP' in str(e):
@@ -687,31 +756,36 @@ class UnifiedExchange(BaseExchange):
             self.logger.error(f"❌ Error waiting for order completion: {e}")
             return None
 
+    async def _fetch_balances(self) -> Dict[str, float]:
+        """Fetch non-zero total balances per currency (no USD valuation)."""
+        self.logger.info(f"💰 Fetching REAL account balance from {self.exchange_id}...")
+        balance = await self.exchange.fetch_balance()
+        
+        # Log the full balance object for debugging
+        self.logger.debug(f"📊 Raw balance response keys: {list(balance.keys())}")
+        
+        # Handle both dict and direct value formats
+        result = {}
+        for currency, info in balance.items():
+            if currency in ['info', 'timestamp', 'datetime']:
+                continue
+            if isinstance(info, dict):
+                free_balance = float(info.get('free', 0.0))
+                locked_balance = float(info.get('used', 0.0))
+                total_balance = free_balance + locked_balance
+                if total_balance > 0.000001:  # Only include meaningful balances
+                    result[currency] = total_balance
+                    self.logger.debug(f"💰 REAL BALANCE - {currency}: {total_balance:.8f} (free: {free_balance:.8f}, locked: {locked_balance:.8f})")
+            elif isinstance(info, (int, float)) and float(info) > 0:
+                result[currency] = float(info)
+                self.logger.debug(f"💰 REAL BALANCE - {currency}: {float(info):.8f}")
+        return result
+
     async def get_account_balance(self) -> Dict[str, float]:
         if not self.is_connected:
             return {}
         try:
-            self.logger.info(f"💰 Fetching REAL account balance from {self.exchange_id}...")
-            balance = await self.exchange.fetch_balance()
-            
-            # Log the full balance object for debugging
-            self.logger.debug(f"📊 Raw balance response keys: {list(balance.keys())}")
-            
-            # Handle both dict and direct value formats
-            result = {}
-            for currency, info in balance.items():
-                if currency in ['info', 'timestamp', 'datetime']:
-                    continue
-                if isinstance(info, dict):
-                    free_balance = float(info.get('free', 0.0))
-                    locked_balance = float(info.get('used', 0.0))
-                    total_balance = free_balance + locked_balance
-                    if total_balance > 0.000001:  # Only include meaningful balances
-                        result[currency] = total_balance
-                        self.logger.debug(f"💰 REAL BALANCE - {currency}: {total_balance:.8f} (free: {free_balance:.8f}, locked: {locked_balance:.8f})")
-                elif isinstance(info, (int, float)) and float(info) > 0:
-                    result[currency] = float(info)
-                    self.logger.debug(f"💰 REAL BALANCE - {currency}: {float(info):.8f}")
+            result = await self._fetch_balances()
             
             # Get current prices for USD conversion
             total_usd_estimate = await self._calculate_usd_value(result)
@@ -744,56 +818,24 @@ class UnifiedExchange(BaseExchange):
         }
     
     async def _calculate_usd_value(self, balances: Dict[str, float]) -> float:
-        """Calculate USD value of all balances using current market prices."""
+        """Value balances in USD from the shared price board (no REST calls)."""
         if not balances:
             self.logger.warning("No balances to calculate USD value for")
             return 0.0
-            
-        total_usd = 0.0
         
-        for currency, amount in balances.items():
-            if amount <= 0:
-                continue
-                
-            try:
-                if currency in ['USDT', 'USDC', 'BUSD', 'USD']:
-                    # Stablecoins are 1:1 with USD
-                    usd_value = amount
-                    total_usd += usd_value
-                    self.logger.info(f"💵 {currency}: {amount:.8f} = ${usd_value:.2f} USD")
-                else:
-                    # Try to get current price vs USDT
-                    symbol = f"{currency}/USDT"
-                    if hasattr(self, 'trading_pairs') and symbol in self.trading_pairs:
-                        ticker = await self.get_ticker(symbol)
-                        if ticker and ticker.get('last'):
-                            price = float(ticker['last'])
-                            usd_value = amount * price
-                            total_usd += usd_value
-                            self.logger.info(f"💵 {currency}: {amount:.8f} × ${price:.2f} = ${usd_value:.2f} USD")
-                        else:
-                            self.logger.info(f"💵 {currency}: {amount:.8f} (no current price)")
-                    else:
-                        # Fallback to rough estimates for major currencies
-                        if currency == 'BTC':
-                            usd_value = amount * 95000  # Updated BTC price estimate
-                            total_usd += usd_value
-                            self.logger.info(f"💵 {currency}: {amount:.8f} × $118,000 ≈ ${usd_value:.2f} USD (estimate)")
-                        elif currency == 'ETH':
-                            usd_value = amount * 3200  # Updated ETH price estimate
-                            total_usd += usd_value
-                            self.logger.info(f"💵 {currency}: {amount:.8f} × $3,200 ≈ ${usd_value:.2f} USD (estimate)")
-                        elif currency == 'BNB':
-                            usd_value = amount * 650  # Updated BNB price estimate
-                            total_usd += usd_value
-                            self.logger.info(f"💵 {currency}: {amount:.8f} × $650 ≈ ${usd_value:.2f} USD (estimate)")
-                        else:
-                            self.logger.info(f"💵 {currency}: {amount:.8f} (no USD conversion available)")
-            except Exception as e:
-                self.logger.error(f"Error calculating USD value for {currency}: {e}")
+        valuation = get_price_board().value(balances, self.exchange_id)
+        for currency, usd_value in sorted(valuation['by_asset'].items(), key=lambda x: x[1], reverse=True):
+            self.logger.info(f"💵 {currency}: {balances[currency]:.8f} = ${usd_value:.2f} USD")
+        if valuation['unpriced']:
+            self.logger.info(f"💵 No USD conversion available for: {', '.join(valuation['unpriced'])}")
         
-        self.logger.info(f"💰 Total USD value calculated: ${total_usd:.2f}")
-        return total_usd
+        self.logger.info(f"💰 Total USD value calculated: ${valuation['total_usd']:.2f}")
+        return valuation['total_usd']
+
+    async def _seed_prices(self) -> None:
+        """Fill the price board with one batched ticker fetch if nothing has fed it yet."""
+        if not get_price_board().has_prices(self.exchange_id):
+            await self.fetch_tickers()
 
     async def get_trading_fees(self, symbol: str) -> Tuple[float, float]:
         """Get accurate trading fees for the specific exchange with fee token discounts."""
@@ -9,12 +9,10 @@ import asyncio
 import threading
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
 from models import arbitrage_opportunity
 from utils.websocket_manager import WebSocketManager
 from utils.trade_logger import get_trade_logger
+from utils.opportunity_stream import OpportunityBook, opportunity_id
 
 from config.config import Config
 from config.exchanges_config import SUPPORTED_EXCHANGES
@@ -45,9 +43,21 @@ class ArbitrageBotGUI:
         # GUI state
         self.running = False
         self.opportunities = []
+        self.opportunity_book = OpportunityBook()
         self.selected_exchanges = []
         self.auto_trading = False
         
+        # Opportunities treeview state: rows are keyed by stable opportunity ID
+        self._displayed_opportunities = None
+        self._tree_rows: Dict[str, tuple] = {}  # iid -> (values, tags) currently shown
+        self._row_opportunities: Dict[str, Any] = {}  # iid -> opportunity object
+        
+        # WebSocket messages arrive on another thread; they are coalesced here and
+        # applied by the GUI thread once per frame
+        self._ws_lock = threading.Lock()
+        self._pending_opportunities = None
+        self._pending_trades: List[Dict[str, Any]] = []
+        
         # Setup GUI
         self.setup_gui()
         
@@ -60,23 +70,50 @@ class ArbitrageBotGUI:
         self.async_thread.start()
     
     def _handle_websocket_message(self, message: Dict[str, Any]):
-        """Handle WebSocket messages in the GUI."""
+        """Queue WebSocket messages for the next GUI frame (runs on the WebSocket thread)."""
         try:
             event_type = message.get('type')
             data = message.get('data')
             
             if event_type == 'opportunities_update':
-                # Update opportunities in GUI thread
-                self.root.after(0, lambda: self._update_opportunities_from_websocket(data))
+                # Only the latest opportunity list matters
+                with self._ws_lock:
+                    self._pending_opportunities = data
+            elif event_type in ('opportunities_snapshot', 'opportunities_delta'):
+                # Rebuild the full list from the delta stream
+                if self.opportunity_book.apply_message(event_type, data):
+                    opportunities = self.opportunity_book.opportunities()
+                    with self._ws_lock:
+                        self._pending_opportunities = opportunities
             elif event_type == 'trade_executed':
-                # Update trade history in GUI thread
-                self.root.after(0, lambda: self._update_trade_history_from_websocket(data))
+                with self._ws_lock:
+                    self._pending_trades.append(data)
             
-            self.logger.info(f"Processed WebSocket message: {event_type}")
+            self.logger.debug(f"Queued WebSocket message: {event_type}")
             
         except Exception as e:
             self.logger.error(f"Error handling WebSocket message: {e}")
     
+    def _flush_websocket_updates(self):
+        """Apply everything queued since the last frame in one UI update."""
+        try:
+            with self._ws_lock:
+                opportunities = self._pending_opportunities
+                trades = self._pending_trades
+                self._pending_opportunities = None
+                self._pending_trades = []
+            
+            if opportunities is not None:
+                self._update_opportunities_from_websocket(opportunities)
+                self.update_opportunities_display()
+            for trade_data in trades:
+                self._update_trade_history_from_websocket(trade_data)
+                
+        except Exception as e:
+            self.logger.error(f"Error applying WebSocket updates: {e}")
+        
+        self.root.after(Config.GUI_FRAME_INTERVAL, self._flush_websocket_updates)
+    
     def _update_opportunities_from_websocket(self, opportunities_data):
         """Update opportunities display from WebSocket data."""
         try:
@@ -86,6 +123,7 @@ class ArbitrageBotGUI:
                 for opp_data in opportunities_data:
                     # Create a simple opportunity object for display
                     opportunity = type('Opportunity', (), {
+                        'id': opp_data.get('id'),
                         'exchange': opp_data.get('exchange', 'Unknown'),
                         'triangle_path': opp_data.get('trianglePath', ''),
                         'profit_percentage': opp_data.get('profitPercentage', 0),
@@ -95,7 +133,7 @@ class ArbitrageBotGUI:
                     })()
                     self.opportunities.append(opportunity)
                 
-                self.logger.info(f"Updated GUI with {len(self.opportunities)} opportunities from WebSocket")
+                self.logger.debug(f"Updated GUI with {len(self.opportunities)} opportunities from WebSocket")
         except Exception as e:
             self.logger.error(f"Error updating opportunities from WebSocket: {e}")
     
@@ -132,6 +170,7 @@ class ArbitrageBotGUI:
         
         # Start GUI update loop
         self.update_gui()
+        self._flush_websocket_updates()
     
     def create_control_panel(self):
         """Create the control panel."""
@@ -247,6 +286,10 @@ class ArbitrageBotGUI:
         self.opportunities_tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
+        # Row colours: green for ≥0.4%, red below
+        self.opportunities_tree.tag_configure("green", background="lightgreen", foreground="darkgreen")
+        self.opportunities_tree.tag_configure("red", background="lightcoral", foreground="darkred")
+        
         # Bind double-click event
         self.opportunities_tree.bind("<Double-1>", self.on_opportunity_double_click)
         
@@ -396,7 +439,9 @@ class ArbitrageBotGUI:
                 {
                     'min_profit_percentage': self.min_profit_var.get(),
                     'max_trade_amount': self.max_trade_var.get(),
-                    'prioritize_zero_fee': Config.PRIORITIZE_ZERO_FEE
+                    'prioritize_zero_fee': Config.PRIORITIZE_ZERO_FEE,
+                    'exchange_scan_deadline': Config.EXCHANGE_SCAN_DEADLINE,
+                    'scan_top_k': Config.SCAN_TOP_K
                 }
             )
             await self.detector.initialize()
@@ -660,70 +705,104 @@ class ArbitrageBotGUI:
             self.logger.error(f"Error validating triangle path: {e}")
             return False
     
+    def _opportunity_row(self, opportunity) -> tuple:
+        """Treeview (values, tags) for one opportunity."""
+        # Handle both ArbitrageOpportunity and ArbitrageResult objects
+        if hasattr(opportunity, 'exchange'):
+            exchange = opportunity.exchange
+        elif hasattr(opportunity, 'name'):
+            exchange = opportunity.name
+        else:
+            exchange = 'Unknown'
+        
+        # Format the triangle path properly
+        if hasattr(opportunity, 'triangle_path'):
+            if isinstance(opportunity.triangle_path, list):
+                # For USDT-based triangles: Always show as 4-step cycle
+                if len(opportunity.triangle_path) >= 3:
+                    # 3 currencies: USDT, Currency1, Currency2 → show as USDT → Currency1 → Currency2 → USDT
+                    path = f"{opportunity.triangle_path[0]} → {opportunity.triangle_path[1]} → {opportunity.triangle_path[2]} → {opportunity.triangle_path[0]}"
+                else:
+                    path = ' → '.join(opportunity.triangle_path)
+            else:
+                path = str(opportunity.triangle_path)
+        else:
+            path = 'Unknown Path'
+        
+        profit_pct = getattr(opportunity, 'profit_percentage', 0)
+        profit_amt = getattr(opportunity, 'profit_amount', 0)
+        initial_amt = getattr(opportunity, 'initial_amount', 0)
+        
+        values = (
+            exchange,
+            path,
+            f"{'+' if profit_pct >= 0 else ''}{profit_pct:.4f}%",
+            f"${'+' if profit_amt >= 0 else ''}{profit_amt:.4f}",
+            f"${initial_amt:.2f}",
+            "Execute"
+        )
+        
+        # Color code by profitability with 3 levels
+        if profit_pct >= 0.4:
+            tags = ("green",)  # Green for ≥0.4%
+        else:
+            tags = ("red",)  # Red for 0-0.4%
+        
+        return values, tags
+    
+    def _opportunity_key(self, opportunity) -> str:
+        """Stable treeview row ID for an opportunity."""
+        key = getattr(opportunity, 'id', None)
+        if key:
+            return key
+        exchange = getattr(opportunity, 'exchange', None) or getattr(opportunity, 'name', 'Unknown')
+        triangle_path = getattr(opportunity, 'triangle_path', '')
+        if isinstance(triangle_path, str):
+            triangle_path = [triangle_path]
+        return opportunity_id(exchange, triangle_path)
+    
     def update_opportunities_display(self):
-        """Update the opportunities treeview with proper triangle path formatting."""
+        """Update the opportunities treeview, touching only the rows that changed."""
         try:
-            # Clear existing items
-            for item in self.opportunities_tree.get_children():
-                self.opportunities_tree.delete(item)
-            
-            # Add current opportunities
-            for i, opportunity in enumerate(self.opportunities[:Config.MAX_OPPORTUNITIES_DISPLAY]):
-                # Handle both ArbitrageOpportunity and ArbitrageResult objects
-                if hasattr(opportunity, 'exchange'):
-                    exchange = opportunity.exchange
-                elif hasattr(opportunity, 'name'):
-                    exchange = opportunity.name
-                else:
-                    exchange = 'Unknown'
-                
-                # Format the triangle path properly
-                if hasattr(opportunity, 'triangle_path'):
-                    if isinstance(opportunity.triangle_path, list):
-                        # For USDT-based triangles: Always show as 4-step cycle
-                        if len(opportunity.triangle_path) >= 3:
-                            # 3 currencies: USDT, Currency1, Currency2 → show as USDT → Currency1 → Currency2 → USDT
-                            path = f"{opportunity.triangle_path[0]} → {opportunity.triangle_path[1]} → {opportunity.triangle_path[2]} → {opportunity.triangle_path[0]}"
-                        else:
-                            path = ' → '.join(opportunity.triangle_path)
-                    else:
-                        path = str(opportunity.triangle_path)
-                else:
-                    path = 'Unknown Path'
-                
-                profit_pct = getattr(opportunity, 'profit_percentage', 0)
-                profit_amt = getattr(opportunity, 'profit_amount', 0)
-                initial_amt = getattr(opportunity, 'initial_amount', 0)
-                
-                # Check if profitable
-                is_profitable = False
-                if hasattr(opportunity, 'is_profitable'):
-                    is_profitable = opportunity.is_profitable
-                elif hasattr(opportunity, 'net_profit_percent'):
-                    is_profitable = opportunity.net_profit_percent >= 0.4
-                else:
-                    is_profitable = profit_pct >= 0.4
-                
-                values = (
-                    exchange,
-                    path,
-                    f"{'+' if profit_pct >= 0 else ''}{profit_pct:.4f}%",
-                    f"${'+' if profit_amt >= 0 else ''}{profit_amt:.4f}",
-                    f"${initial_amt:.2f}",
-                    "Execute"
-                )
-                
-                # Color code by profitability with 3 levels
-                if profit_pct >= 0.4:
-                    tags = ("green",)  # Green for ≥0.4%
+            if self.opportunities is self._displayed_opportunities:
+                return
+            self._displayed_opportunities = self.opportunities
+            
+            # Build the target rows, keyed by stable opportunity ID
+            rows = []
+            row_opportunities = {}
+            for opportunity in self.opportunities[:Config.MAX_OPPORTUNITIES_DISPLAY]:
+                key = self._opportunity_key(opportunity)
+                if key in row_opportunities:
+                    continue
+                row_opportunities[key] = opportunity
+                rows.append((key, self._opportunity_row(opportunity)))
+            
+            tree = self.opportunities_tree
+            
+            # Delete rows that are gone
+            for key in list(self._tree_rows):
+                if key not in row_opportunities:
+                    tree.delete(key)
+                    del self._tree_rows[key]
+            
+            # Insert new rows, update changed ones, then move rows into target order
+            order = list(tree.get_children())
+            for index, (key, row) in enumerate(rows):
+                values, tags = row
+                if key not in self._tree_rows:
+                    tree.insert("", index, iid=key, values=values, tags=tags)
+                    order.insert(index, key)
                 else:
-                    tags = ("red",)  # Red for 0-0.4%
-                
-                self.opportunities_tree.insert("", "end", values=values, tags=tags)
+                    if self._tree_rows[key] != row:
+                        tree.item(key, values=values, tags=tags)
+                    if order[index] != key:
+                        tree.move(key, "", index)
+                        order.remove(key)
+                        order.insert(index, key)
+                self._tree_rows[key] = row
             
-            # Configure tags with 2-color system
-            self.opportunities_tree.tag_configure("green", background="lightgreen", foreground="darkgreen")
-            self.opportunities_tree.tag_configure("red", background="lightcoral", foreground="darkred")
+            self._row_opportunities = row_opportunities
             
         except Exception as e:
             self.logger.error(f"Error updating opportunities display: {e}")
@@ -763,11 +842,8 @@ class ArbitrageBotGUI:
         try:
             selection = self.opportunities_tree.selection()
             if selection:
-                item = self.opportunities_tree.item(selection[0])
-                index = self.opportunities_tree.index(selection[0])
-                
-                if index < len(self.opportunities):
-                    opportunity = self.opportunities[index]
+                opportunity = self._row_opportunities.get(selection[0])
+                if opportunity is not None:
                     self.show_opportunity_details(opportunity)
         except Exception as e:
             self.logger.error(f"Error handling opportunity double click: {e}")
@@ -831,9 +907,8 @@ Detected At: {opportunity.detected_at.strftime('%Y-%m-%d %H:%M:%S')}
                 messagebox.showwarning("Warning", "Please select an opportunity to execute")
                 return
             
-            index = self.opportunities_tree.index(selection[0])
-            if index < len(self.opportunities):
-                opportunity = self.opportunities[index]
+            opportunity = self._row_opportunities.get(selection[0])
+            if opportunity is not None:
                 asyncio.run_coroutine_threadsafe(
                     self.executor.execute_arbitrage(opportunity),
                     self.loop
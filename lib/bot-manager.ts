@@ -1,8 +1,9 @@
 import { spawn, ChildProcess } from 'child_process';
+import { Duplex } from 'stream';
 import path from 'path';
 import { db } from './db';
 import { botInstances, trades } from './db/schema';
-import { eq } from 'drizzle-orm';
+import { eq, inArray } from 'drizzle-orm';
 
 interface BotInstance {
   id: string;
@@ -32,54 +33,166 @@ interface BotSettings {
   };
 }
 
+interface TenantStats {
+  userId: string;
+  running: boolean;
+  exchanges: string[];
+  tradesExecuted: number;
+  totalProfit: number;
+  opportunitiesFound: number;
+}
+
+// Framed IPC with the tenant host (python-bot/tenant_host.py, utils/ipc.py):
+// newline-delimited JSON frames on fd 3, kept separate from log output on stdout/stderr.
+type HostFrame =
+  | { type: 'reply'; id: number; cmd: string; userId?: string; ok: boolean; error?: string }
+  | { type: 'trade'; userId: string; data: any }
+  | { type: 'stats'; data: TenantStats[] }
+  | { type: 'heartbeat'; data: { tenants: string[] } }
+  | { type: 'tenant_stopped'; userId: string; error?: string | null };
+
+interface TenantHost {
+  process: ChildProcess;
+  channel: Duplex;
+  outbox: string[];
+  writable: boolean;
+  nextCommandId: number;
+  pending: Map<number, { resolve: (frame: HostFrame) => void; reject: (error: Error) => void }>;
+}
+
+const IPC_FD = 3;
+const COMMAND_TIMEOUT_MS = 30000;
+const TRADE_FLUSH_MS = 250;
+
 // In-memory store for active bot instances
 const activeBots = new Map<string, BotInstance>();
+const latestStats = new Map<string, TenantStats>();
+let host: TenantHost | null = null;
+let tradeBatch: { userId: string; tradeData: any }[] = [];
+let tradeFlushTimer: NodeJS.Timeout | null = null;
 
-export async function startBotForUser(
-  userId: string, 
-  credentials: ExchangeCredential[], 
-  settings: BotSettings
-): Promise<BotInstance> {
-  try {
-    // Stop existing bot if running
-    await stopBotForUser(userId);
+function ensureHost(): TenantHost {
+  if (host) {
+    return host;
+  }
 
-    // Create environment variables for the bot
-    const env: NodeJS.ProcessEnv = {
+  const hostPath = path.join(process.cwd(), 'python-bot', 'tenant_host.py');
+  const hostProcess: ChildProcess = spawn('python', [hostPath], {
+    env: {
       ...process.env,
-      USER_ID: userId,
-      BOT_SETTINGS: JSON.stringify(settings),
-      BOT_CREDENTIALS: JSON.stringify(credentials),
-      MIN_PROFIT_PERCENTAGE: settings.minProfitPercentage.toString(),
-      MAX_TRADE_AMOUNT: settings.maxTradeAmount.toString(),
-      AUTO_TRADING_MODE: settings.autoTradingMode.toString(),
-      SELECTED_EXCHANGES: settings.selectedExchanges.join(','),
+      BOT_IPC_FD: IPC_FD.toString(),
       NODE_ENV: process.env.NODE_ENV || 'development', // Ensure NODE_ENV is present
-    };
+    },
+    stdio: ['ignore', 'pipe', 'pipe', 'pipe'],
+    cwd: path.join(process.cwd(), 'python-bot'),
+  });
+
+  const instance: TenantHost = {
+    process: hostProcess,
+    channel: hostProcess.stdio[IPC_FD] as Duplex,
+    outbox: [],
+    writable: true,
+    nextCommandId: 1,
+    pending: new Map(),
+  };
 
-    // Add exchange-specific credentials to environment
-    credentials.forEach((cred) => {
-      const prefix = cred.exchangeId.toUpperCase();
-      env[`${prefix}_API_KEY`] = cred.apiKey;
-      env[`${prefix}_API_SECRET`] = cred.apiSecret;
-      if (cred.passphrase) {
-        env[`${prefix}_PASSPHRASE`] = cred.passphrase;
+  // Reassemble frames across chunk boundaries
+  let buffer = '';
+  instance.channel.setEncoding('utf8');
+  instance.channel.on('data', (chunk: string) => {
+    buffer += chunk;
+    let newline: number;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+      const line = buffer.slice(0, newline);
+      buffer = buffer.slice(newline + 1);
+      if (line) {
+        handleHostFrame(instance, line);
       }
-      env[`${prefix}_SANDBOX`] = cred.sandbox.toString();
-    });
+    }
+  });
+
+  instance.channel.on('drain', () => {
+    instance.writable = true;
+    flushOutbox(instance);
+  });
+
+  instance.channel.on('error', (error: Error) => {
+    console.error('Tenant host IPC error:', error);
+  });
+
+  // stdout/stderr carry logs only
+  hostProcess.stdout?.on('data', (data: Buffer) => {
+    console.log('Tenant host:', data.toString());
+  });
+
+  hostProcess.stderr?.on('data', (data: Buffer) => {
+    console.log('Tenant host:', data.toString());
+  });
+
+  hostProcess.on('exit', (code: number | null) => {
+    console.log('Tenant host exited with code:', code);
+    handleHostExit(instance, `Tenant host exited with code ${code}`);
+  });
 
-    // Start Python bot process
-    const botPath = path.join(process.cwd(), 'python-bot', 'main_saas.py');
-    const botProcess: ChildProcess = spawn('python', [botPath], {
-      env,
-      stdio: ['pipe', 'pipe', 'pipe'],
-      cwd: path.join(process.cwd(), 'python-bot'),
+  hostProcess.on('error', (error: Error) => {
+    console.error('Tenant host error:', error);
+    handleHostExit(instance, error.message);
+  });
+
+  console.log(`Started tenant host with PID ${hostProcess.pid}`);
+  host = instance;
+  return instance;
+}
+
+function flushOutbox(instance: TenantHost) {
+  // Respect socket backpressure: stop writing until 'drain'
+  while (instance.writable && instance.outbox.length > 0) {
+    instance.writable = instance.channel.write(instance.outbox.shift()!);
+  }
+}
+
+function sendCommand(cmd: string, fields: Record<string, unknown> = {}): Promise<HostFrame> {
+  const instance = ensureHost();
+  const id = instance.nextCommandId++;
+
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      instance.pending.delete(id);
+      reject(new Error(`Tenant host did not answer ${cmd} within ${COMMAND_TIMEOUT_MS}ms`));
+    }, COMMAND_TIMEOUT_MS);
+
+    instance.pending.set(id, {
+      resolve: (frame) => {
+        clearTimeout(timer);
+        resolve(frame);
+      },
+      reject: (error) => {
+        clearTimeout(timer);
+        reject(error);
+      },
     });
 
+    instance.outbox.push(JSON.stringify({ type: 'command', cmd, id, ...fields }) + '\n');
+    flushOutbox(instance);
+  });
+}
+
+export async function startBotForUser(
+  userId: string,
+  credentials: ExchangeCredential[],
+  settings: BotSettings
+): Promise<BotInstance> {
+  try {
+    // The host restarts the tenant if it is already running
+    const reply = await sendCommand('add_tenant', { userId, settings, credentials });
+    if (reply.type !== 'reply' || !reply.ok) {
+      throw new Error(reply.type === 'reply' && reply.error ? reply.error : 'Tenant host rejected the bot');
+    }
+
     const botInstance: BotInstance = {
       id: `bot_${userId}_${Date.now()}`,
       userId,
-      process: botProcess,
+      process: host!.process,
       status: 'running',
       startedAt: new Date(),
     };
@@ -87,28 +200,7 @@ export async function startBotForUser(
     // Store in memory
     activeBots.set(userId, botInstance);
 
-    // Set up process event handlers
-    botProcess.stdout?.on('data', (data: Buffer) => {
-      console.log(`Bot ${userId} stdout:`, data.toString());
-      handleBotOutput(userId, data.toString());
-    });
-
-    botProcess.stderr?.on('data', (data: Buffer) => {
-      console.error(`Bot ${userId} stderr:`, data.toString());
-      handleBotError(userId, data.toString());
-    });
-
-    botProcess.on('exit', (code: number | null) => {
-      console.log(`Bot ${userId} exited with code:`, code);
-      handleBotExit(userId, code);
-    });
-
-    botProcess.on('error', (error: Error) => {
-      console.error(`Bot ${userId} error:`, error);
-      handleBotProcessError(userId, error);
-    });
-
-    console.log(`Started bot for user ${userId} with PID ${botProcess.pid}`);
+    console.log(`Started bot for user ${userId} in tenant host ${host!.process.pid}`);
     return botInstance;
 
   } catch (error) {
@@ -120,21 +212,15 @@ export async function startBotForUser(
 export async function stopBotForUser(userId: string): Promise<void> {
   try {
     const botInstance = activeBots.get(userId);
-    
-    if (botInstance && botInstance.process) {
-      // Gracefully terminate the process
-      botInstance.process.kill('SIGTERM');
-      
-      // Force kill after 10 seconds if still running
-      setTimeout(() => {
-        if (botInstance.process && !botInstance.process.killed) {
-          botInstance.process.kill('SIGKILL');
-        }
-      }, 10000);
+
+    if (botInstance && host) {
+      // The host stops the session gracefully and cancels it if it does not finish in time
+      await sendCommand('remove_tenant', { userId });
 
       // Remove from active bots
       activeBots.delete(userId);
-      
+      latestStats.delete(userId);
+
       console.log(`Stopped bot for user ${userId}`);
     }
   } catch (error) {
@@ -147,122 +233,125 @@ export async function getBotStatus(userId: string): Promise<BotInstance | null>
   return activeBots.get(userId) || null;
 }
 
+export async function getBotStats(userId: string): Promise<TenantStats | null> {
+  return latestStats.get(userId) || null;
+}
+
 export async function getAllActiveBots(): Promise<BotInstance[]> {
   return Array.from(activeBots.values());
 }
 
 export async function emergencyStopAllBots(): Promise<void> {
   console.log('EMERGENCY STOP: Stopping all bot instances');
-  
-  const promises = Array.from(activeBots.keys()).map(userId => 
-    stopBotForUser(userId).catch(error => 
+
+  const promises = Array.from(activeBots.keys()).map(userId =>
+    stopBotForUser(userId).catch(error =>
       console.error(`Failed to stop bot for user ${userId}:`, error)
     )
   );
-  
+
   await Promise.all(promises);
   console.log('EMERGENCY STOP: All bots stopped');
 }
 
 // Event handlers
-async function handleBotOutput(userId: string, output: string) {
+function handleHostFrame(instance: TenantHost, line: string) {
+  let frame: HostFrame;
   try {
-    // Parse bot output for trade information
-    if (output.includes('TRADE_COMPLETED')) {
-      const tradeData = parseTradeOutput(output);
-      if (tradeData) {
-        await saveTrade(userId, tradeData);
-      }
-    }
-    
-    // Update heartbeat
-    await updateBotHeartbeat(userId);
+    frame = JSON.parse(line);
   } catch (error) {
-    console.error('Error handling bot output:', error);
+    console.error('Invalid frame from tenant host:', error);
+    return;
   }
-}
 
-async function handleBotError(userId: string, error: string) {
-  try {
-    console.error(`Bot error for user ${userId}:`, error);
-    
-    // Update bot status to error
-    await db.update(botInstances)
-      .set({
-        status: 'error',
-        stoppedAt: new Date(),
-      })
-      .where(eq(botInstances.userId, userId));
-      
-  } catch (dbError) {
-    console.error('Error updating bot status:', dbError);
+  switch (frame.type) {
+    case 'reply': {
+      const pending = instance.pending.get(frame.id);
+      if (pending) {
+        instance.pending.delete(frame.id);
+        pending.resolve(frame);
+      }
+      break;
+    }
+    case 'trade':
+      queueTrade(frame.userId, frame.data);
+      break;
+    case 'heartbeat':
+      updateBotHeartbeats(frame.data.tenants);
+      break;
+    case 'stats':
+      frame.data.forEach((stats) => latestStats.set(stats.userId, stats));
+      break;
+    case 'tenant_stopped':
+      handleBotExit(frame.userId, frame.error ?? null);
+      break;
   }
 }
 
-async function handleBotExit(userId: string, code: number | null) {
+async function handleBotExit(userId: string, error: string | null) {
   try {
     activeBots.delete(userId);
-    
+    latestStats.delete(userId);
+
     await db.update(botInstances)
       .set({
-        status: 'stopped',
+        status: error ? 'error' : 'stopped',
         stoppedAt: new Date(),
       })
       .where(eq(botInstances.userId, userId));
-      
-    console.log(`Bot for user ${userId} exited with code ${code}`);
-  } catch (error) {
-    console.error('Error handling bot exit:', error);
+
+    console.log(`Bot for user ${userId} stopped${error ? `: ${error}` : ''}`);
+  } catch (dbError) {
+    console.error('Error handling bot exit:', dbError);
   }
 }
 
-async function handleBotProcessError(userId: string, error: Error) {
-  try {
-    activeBots.delete(userId);
-    
-    await db.update(botInstances)
-      .set({
-        status: 'error',
-        stoppedAt: new Date(),
-      })
-      .where(eq(botInstances.userId, userId));
-      
-    console.error(`Bot process error for user ${userId}:`, error);
-  } catch (dbError) {
-    console.error('Error handling bot process error:', dbError);
+function handleHostExit(instance: TenantHost, reason: string) {
+  if (host !== instance) {
+    return;
   }
+  host = null;
+
+  instance.pending.forEach(({ reject }) => reject(new Error(reason)));
+  instance.pending.clear();
+
+  // Every tenant lived in the host process
+  Array.from(activeBots.keys()).forEach((userId) => handleBotExit(userId, reason));
 }
 
-async function updateBotHeartbeat(userId: string) {
+async function updateBotHeartbeats(userIds: string[]) {
+  if (userIds.length === 0) {
+    return;
+  }
   try {
     await db.update(botInstances)
       .set({
         lastHeartbeat: new Date(),
       })
-      .where(eq(botInstances.userId, userId));
+      .where(inArray(botInstances.userId, userIds));
   } catch (error) {
-    console.error('Error updating bot heartbeat:', error);
+    console.error('Error updating bot heartbeats:', error);
   }
 }
 
-function parseTradeOutput(output: string): any | null {
-  try {
-    // Parse the trade output from the Python bot
-    // This would need to match the output format from your bot
-    const tradeMatch = output.match(/TRADE_COMPLETED: (.+)/);
-    if (tradeMatch) {
-      return JSON.parse(tradeMatch[1]);
-    }
-    return null;
-  } catch (error) {
-    console.error('Error parsing trade output:', error);
-    return null;
+function queueTrade(userId: string, tradeData: any) {
+  // Batch inserts so bursts of trades become one statement
+  tradeBatch.push({ userId, tradeData });
+  if (!tradeFlushTimer) {
+    tradeFlushTimer = setTimeout(flushTrades, TRADE_FLUSH_MS);
   }
 }
 
-async function saveTrade(userId: string, tradeData: any) {
+async function flushTrades() {
+  const batch = tradeBatch;
+  tradeBatch = [];
+  tradeFlushTimer = null;
+  if (batch.length === 0) {
+    return;
+  }
+
   try {
-    await db.insert(trades).values({
+    await db.insert(trades).values(batch.map(({ userId, tradeData }) => ({
       userId,
       exchangeId: tradeData.exchange,
       trianglePath: tradeData.trianglePath,
@@ -275,10 +364,10 @@ async function saveTrade(userId: string, tradeData: any) {
       executionTimeMs: tradeData.executionTimeMs,
       errorMessage: tradeData.errorMessage,
       tradeData: tradeData,
-    });
-    
-    console.log(`Saved trade for user ${userId}:`, tradeData);
+    })));
+
+    console.log(`Saved ${batch.length} trades`);
   } catch (error) {
-    console.error('Error saving trade:', error);
+    console.error('Error saving trades:', error);
   }
-}
\ No newline at end of file
+}
@@ -1,4 +1,9 @@
 import sys
+
+if __name__ == "__main__" and '--profile-startup' in sys.argv:
+    from utils.startup_profile import profile_startup
+    sys.exit(profile_startup('main'))
+
 import asyncio
 import signal
 from typing import Dict, Any
@@ -5,41 +5,32 @@ Main entry point for the GUI-based triangular arbitrage bot.
 
 import sys
 import os
-import asyncio
-import tkinter as tk
-from tkinter import messagebox
+import importlib.util
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+if __name__ == "__main__" and '--profile-startup' in sys.argv:
+    from utils.startup_profile import profile_startup
+    sys.exit(profile_startup('main_gui'))
+
+from tkinter import messagebox
+
 from config.config import Config
 from gui.main_window import ArbitrageBotGUI
-from utils.logger import setup_logger
-
-# Import and start web server for React frontend
-try:
-    from api.web_server import start_web_server_background
-    WEB_SERVER_AVAILABLE = True
-except ImportError:
-    WEB_SERVER_AVAILABLE = False
 
 def check_dependencies():
-    """Check if all required dependencies are installed."""
-    try:
-        import ccxt
-        import customtkinter
-        import matplotlib
-        import pandas
-        import numpy
-        return True
-    except ImportError as e:
-        messagebox.showerror(
-            "Missing Dependencies",
-            f"Required dependency not found: {e}\n\n"
-            "Please install all dependencies:\n"
-            "pip install -r requirements.txt"
-        )
-        return False
+    """Check if all required dependencies are installed (without importing them)."""
+    for module in ('ccxt', 'customtkinter'):
+        if importlib.util.find_spec(module) is None:
+            messagebox.showerror(
+                "Missing Dependencies",
+                f"Required dependency not found: {module}\n\n"
+                "Please install all dependencies:\n"
+                "pip install -r requirements.txt"
+            )
+            return False
+    return True
 
 def check_configuration():
     """Check if configuration is valid."""
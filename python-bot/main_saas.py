@@ -10,35 +10,47 @@ import os
 import sys
 import signal
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from datetime import datetime
 import logging
 
 # Add the parent directory to the path to import existing bot modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+if __name__ == "__main__" and '--profile-startup' in sys.argv:
+    from utils.startup_profile import profile_startup
+    sys.exit(profile_startup('main_saas'))
+
 from config.config import Config
 from exchanges.unified_exchange import UnifiedExchange
-from arbitrage.triangle_detector import TriangleDetector
+from arbitrage.shared_detection import CandidateInbox, TriangleCandidate, get_detection_hub
+from arbitrage.execution_allocator import get_execution_allocator
 from arbitrage.trade_executor import TradeExecutor
 from utils.logger import setup_logger
 
 class SaaSArbitrageBot:
     """Multi-tenant arbitrage bot for SaaS platform."""
     
-    def __init__(self):
-        self.user_id = os.getenv('USER_ID')
+    def __init__(self, user_id: Optional[str] = None, settings: Optional[Dict[str, Any]] = None,
+                 credentials: Optional[List[Dict[str, Any]]] = None,
+                 on_trade: Optional[Callable[[Dict[str, Any]], None]] = None):
+        # Standalone processes are configured through the environment; the tenant host passes values in
+        self.user_id = user_id if user_id is not None else os.getenv('USER_ID')
         self.logger = setup_logger(f'SaaSBot_{self.user_id}', 'INFO')
         
         # Load user-specific settings
-        self.settings = json.loads(os.getenv('BOT_SETTINGS', '{}'))
-        self.credentials = json.loads(os.getenv('BOT_CREDENTIALS', '[]'))
+        self.settings = settings if settings is not None else json.loads(os.getenv('BOT_SETTINGS', '{}'))
+        self.credentials = credentials if credentials is not None else json.loads(os.getenv('BOT_CREDENTIALS', '[]'))
+        self.on_trade = on_trade
         
         # Bot components
         self.exchanges = {}
-        self.detectors = {}
+        self.inbox = CandidateInbox()  # Candidates from the shared per-exchange detectors
         self.executor = None
         self.running = False
+        self._stop_event = asyncio.Event()
+        self._fee_cache: Dict[str, tuple] = {}  # exchange_id -> (fetched_at, taker_fee)
+        self._balance_cache: Dict[str, tuple] = {}  # exchange_id -> (fetched_at, balances)
         
         # Statistics
         self.trades_executed = 0
@@ -52,7 +64,8 @@ class SaaSArbitrageBot:
     async def initialize(self) -> bool:
         """Initialize bot components for the user."""
         try:
-            # Initialize exchanges with user credentials
+            # Connect all of the user's exchanges concurrently
+            exchanges = []
             for cred in self.credentials:
                 exchange_config = {
                     'exchange_id': cred['exchangeId'],
@@ -63,30 +76,29 @@ class SaaSArbitrageBot:
                     'fee_token': self._get_fee_token(cred['exchangeId']),
                     'fee_discount': self._get_fee_discount(cred['exchangeId']),
                 }
-                
-                exchange = UnifiedExchange(exchange_config)
-                
-                if await exchange.connect():
-                    self.exchanges[cred['exchangeId']] = exchange
-                    self.logger.info(f"Connected to {cred['exchangeId']} for user {self.user_id}")
+                exchanges.append(UnifiedExchange(exchange_config))
+            
+            results = await asyncio.gather(
+                *(asyncio.wait_for(exchange.connect(), timeout=Config.EXCHANGE_CONNECT_TIMEOUT) for exchange in exchanges),
+                return_exceptions=True
+            )
+            for exchange, connected in zip(exchanges, results):
+                if connected is True:
+                    self.exchanges[exchange.exchange_id] = exchange
+                    self.logger.info(f"Connected to {exchange.exchange_id} for user {self.user_id}")
                 else:
-                    self.logger.error(f"Failed to connect to {cred['exchangeId']} for user {self.user_id}")
+                    self.logger.error(f"Failed to connect to {exchange.exchange_id} for user {self.user_id}")
+                    await exchange.disconnect()
             
             if not self.exchanges:
                 self.logger.error("No exchanges connected")
                 return False
             
-            # Initialize detectors for each exchange
+            # Subscribe to shared detection for each exchange (one detector per exchange per process)
+            hub = get_detection_hub()
             for exchange_id, exchange in self.exchanges.items():
-                detector_config = {
-                    'min_profit_percentage': self.settings.get('minProfitPercentage', 0.5),
-                    'max_trade_amount': self.settings.get('maxTradeAmount', 100),
-                    'max_slippage_percentage': 0.05,
-                }
-                
-                detector = TriangleDetector(exchange, detector_config)
-                await detector.initialize()
-                self.detectors[exchange_id] = detector
+                hub.subscribe(exchange_id, self.user_id, exchange, self.inbox,
+                              self.settings.get('minProfitPercentage', 0.5))
             
             # Initialize trade executor
             executor_config = {
@@ -153,62 +165,149 @@ class SaaSArbitrageBot:
         """Main trading loop."""
         while self.running:
             try:
-                # Scan for opportunities on all connected exchanges
+                # Wait for the next shared scan and apply this user's own filters
                 all_opportunities = []
+                batches = await self.inbox.take(timeout=5)
+                if not self.running:
+                    break
                 
-                for exchange_id, detector in self.detectors.items():
-                    opportunities = await detector.scan_opportunities()
-                    for opp in opportunities:
-                        opp.exchange = exchange_id
-                        all_opportunities.append(opp)
+                for exchange_id, candidates in batches.items():
+                    all_opportunities.extend(await self._filter_candidates(exchange_id, candidates))
                 
                 # Sort by profitability
-                all_opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
+                all_opportunities.sort(key=lambda x: x[0].profit_percentage, reverse=True)
                 
                 if all_opportunities:
                     self.opportunities_found += len(all_opportunities)
                     self.logger.info(f"Found {len(all_opportunities)} opportunities")
                     
-                    # Execute most profitable opportunity
-                    best_opportunity = all_opportunities[0]
-                    
-                    if (best_opportunity.profit_percentage >= self.settings.get('minProfitPercentage', 0.5) and
-                        best_opportunity.is_profitable):
-                        
-                        success = await self.executor.execute_arbitrage(best_opportunity)
-                        
-                        if success:
-                            self.trades_executed += 1
-                            self.total_profit += best_opportunity.profit_amount
-                            
-                            # Output trade completion for parent process
-                            trade_data = {
-                                'exchange': best_opportunity.exchange,
-                                'trianglePath': best_opportunity.triangle_path,
-                                'initialAmount': best_opportunity.initial_amount,
-                                'finalAmount': best_opportunity.final_amount,
-                                'profitAmount': best_opportunity.profit_amount,
-                                'profitPercentage': best_opportunity.profit_percentage,
-                                'fees': best_opportunity.estimated_fees,
-                                'status': 'success',
-                                'executionTimeMs': 1000,  # Placeholder
-                                'timestamp': datetime.now().isoformat(),
-                            }
-                            
-                            print(f"TRADE_COMPLETED: {json.dumps(trade_data)}")
-                            self.logger.info(f"Trade completed successfully: {best_opportunity}")
-                
-                # Wait before next scan
-                await asyncio.sleep(5)
+                    # Execute the most profitable opportunity this user is allocated a share of
+                    for opportunity, candidate in all_opportunities:
+                        opportunity = await self._allocate(opportunity, candidate)
+                        if opportunity is None:
+                            continue
+                        await self._execute(opportunity)
+                        break
                 
             except Exception as e:
                 self.logger.error(f"Error in trading loop: {e}")
-                await asyncio.sleep(10)
+                await self._wait(10)
+    
+    async def _filter_candidates(self, exchange_id: str, candidates: List[TriangleCandidate]) -> List[Tuple[Any, TriangleCandidate]]:
+        """Price shared candidates with this user's amount and fees, keeping (opportunity, candidate) pairs that pass."""
+        min_profit = self.settings.get('minProfitPercentage', 0.5)
+        trade_amount = self.settings.get('maxTradeAmount', 100)
+        slippage_pct = 0.05 / 100
+        
+        opportunities = []
+        taker_fee = None
+        balances = None
+        for candidate in candidates:
+            if candidate.gross_profit_pct < min_profit:
+                break  # Candidates are sorted best-first
+            if taker_fee is None:
+                taker_fee = await self._get_taker_fee(exchange_id)
+                balances = await self._get_balances(exchange_id)
+            if balances is not None and balances.get(candidate.base, 0.0) < trade_amount:
+                continue
+            
+            opportunity = candidate.build(trade_amount, taker_fee, slippage_pct)
+            if opportunity.is_profitable and opportunity.profit_percentage >= min_profit:
+                opportunities.append((opportunity, candidate))
+        
+        return opportunities
+    
+    async def _allocate(self, opportunity, candidate: TriangleCandidate):
+        """Claim this user's share of a candidate other tenants may also want; None means skip it."""
+        allocation = await get_execution_allocator().request(candidate, self.user_id, opportunity.initial_amount)
+        if not allocation.granted:
+            self.logger.info(f"⏭️ Skipping {opportunity.triangle_path}: no depth left for this user")
+            return None
+        
+        if allocation.amount < opportunity.initial_amount:
+            # Re-price for the smaller slice
+            taker_fee = await self._get_taker_fee(candidate.exchange)
+            opportunity = candidate.build(allocation.amount, taker_fee, 0.05 / 100)
+        
+        if allocation.delay:
+            # Stagger behind other tenants granted the same triangle
+            await asyncio.sleep(allocation.delay)
+        return opportunity
+    
+    async def _execute(self, opportunity) -> None:
+        """Execute one opportunity and report it if it completes."""
+        success = await self.executor.execute_arbitrage(opportunity)
+        
+        if success:
+            self.trades_executed += 1
+            self.total_profit += opportunity.profit_amount
+            
+            # Output trade completion for parent process
+            trade_data = {
+                'exchange': opportunity.exchange,
+                'trianglePath': opportunity.triangle_path,
+                'initialAmount': opportunity.initial_amount,
+                'finalAmount': opportunity.final_amount,
+                'profitAmount': opportunity.profit_amount,
+                'profitPercentage': opportunity.profit_percentage,
+                'fees': opportunity.estimated_fees,
+                'status': 'success',
+                'executionTimeMs': 1000,  # Placeholder
+                'timestamp': datetime.now().isoformat(),
+            }
+            
+            self._report_trade(trade_data)
+            self.logger.info(f"Trade completed successfully: {opportunity}")
+            self._balance_cache.pop(opportunity.exchange, None)
+    
+    async def _get_taker_fee(self, exchange_id: str, max_age: float = 60.0) -> float:
+        """Taker fee for this user's account (fee-token discounts differ per user), cached."""
+        cached = self._fee_cache.get(exchange_id)
+        if cached and time.time() - cached[0] < max_age:
+            return cached[1]
+        # Account-level fee; SaaS exchanges are configured without per-pair zero-fee overrides
+        _, taker_fee = await self.exchanges[exchange_id].get_trading_fees('')
+        self._fee_cache[exchange_id] = (time.time(), taker_fee)
+        return taker_fee
+    
+    async def _get_balances(self, exchange_id: str, max_age: float = 30.0) -> Optional[Dict[str, float]]:
+        """This user's balances, cached; None if they could not be fetched."""
+        cached = self._balance_cache.get(exchange_id)
+        if cached and time.time() - cached[0] < max_age:
+            return cached[1]
+        try:
+            balances = await self.exchanges[exchange_id].get_account_balance() or None
+        except Exception as e:
+            self.logger.error(f"Error fetching balance on {exchange_id}: {e}")
+            balances = None
+        self._balance_cache[exchange_id] = (time.time(), balances)
+        return balances
+    
+    async def _wait(self, seconds: float) -> None:
+        """Sleep between scans, waking early when the bot is stopped."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    def _report_trade(self, trade_data: Dict[str, Any]) -> None:
+        """Hand a completed trade to the IPC channel / tenant host, or print it when run by hand."""
+        if self.on_trade:
+            self.on_trade(trade_data)
+        else:
+            print(f"TRADE_COMPLETED: {json.dumps(trade_data)}")
+    
+    def stop(self) -> None:
+        """Ask the trading loop to exit after the current iteration."""
+        self.running = False
+        self._stop_event.set()
+        self.inbox.wake()
     
     async def cleanup(self) -> None:
         """Cleanup resources."""
         self.logger.info("Shutting down bot...")
         self.running = False
+        get_detection_hub().unsubscribe(self.user_id)
         
         for exchange in self.exchanges.values():
             try:
@@ -221,12 +320,26 @@ class SaaSArbitrageBot:
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals."""
         self.logger.info(f"Received signal {signum}, shutting down...")
-        self.running = False
+        self.stop()
 
 async def main():
     """Main entry point for SaaS bot."""
     bot = SaaSArbitrageBot()
     
+    # Report trades as framed IPC messages when the parent provides a channel
+    channel = None
+    if os.getenv('BOT_IPC_FD'):
+        from utils.ipc import IpcChannel
+        channel = IpcChannel.from_env()
+        await channel.open()
+        bot.on_trade = lambda trade_data: channel.send('trade', trade_data, userId=bot.user_id)
+
+        async def stop_when_channel_breaks():
+            await channel.broken.wait()
+            bot.logger.error(f"❌ Lost IPC channel to the parent ({channel.error!r}), shutting down")
+            bot.stop()
+        asyncio.create_task(stop_when_channel_breaks())
+    
     # Setup signal handlers
     signal.signal(signal.SIGINT, bot._signal_handler)
     signal.signal(signal.SIGTERM, bot._signal_handler)
@@ -239,6 +352,10 @@ async def main():
         print(f"Fatal error: {e}")
     finally:
         await bot.cleanup()
+        from utils.http_sessions import get_http_sessions
+        await get_http_sessions().close_all()
+        if channel:
+            await channel.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
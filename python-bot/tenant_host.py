@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+SaaS Tenant Host
+Runs many users' SaaSArbitrageBot sessions as isolated asyncio tasks in one process.
+
+Each tenant keeps its own credentials, exchange connections and executor; market
+metadata and triangle lists are shared through the process-wide market registry,
+and opportunity detection runs once per exchange (arbitrage/shared_detection.py).
+
+Control channel: framed IPC (utils/ipc.py) on the fd in BOT_IPC_FD, or stdin/stdout.
+  {"type": "command", "cmd": "add_tenant", "id": 1, "userId": "...", "settings": {...}, "credentials": [...]}
+  {"type": "command", "cmd": "remove_tenant", "id": 2, "userId": "..."}
+  {"type": "command", "cmd": "list_tenants", "id": 3}
+  {"type": "command", "cmd": "shutdown", "id": 4}
+Events: reply, trade, stats (every STATS_INTERVAL), heartbeat (every HEARTBEAT_INTERVAL), tenant_stopped.
+"""
+
+import asyncio
+import os
+import sys
+import signal
+from typing import Dict, Any, List, Optional
+
+# Without a dedicated IPC fd the control channel owns stdout; logs and stray prints go to stderr
+if not os.getenv('BOT_IPC_FD'):
+    sys.stdout = sys.stderr
+
+# Add the parent directory to the path to import existing bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+if __name__ == "__main__" and '--profile-startup' in sys.argv:
+    from utils.startup_profile import profile_startup
+    sys.exit(profile_startup('tenant_host'))
+
+from main_saas import SaaSArbitrageBot
+from arbitrage.shared_detection import get_detection_hub
+from arbitrage.execution_allocator import get_execution_allocator
+from utils.logger import setup_logger
+from utils.ipc import IpcChannel
+from utils.http_sessions import get_http_sessions
+
+HEARTBEAT_INTERVAL = 5.0
+STATS_INTERVAL = 30.0
+
+class TenantHost:
+    """Hosts SaaSArbitrageBot sessions for many users in one interpreter."""
+
+    def __init__(self, channel: IpcChannel, max_tenants: int = 200, stop_timeout: float = 15.0):
+        self.logger = setup_logger('TenantHost', 'INFO')
+        self.channel = channel
+        self.max_tenants = max_tenants
+        self.stop_timeout = stop_timeout
+        self.tenants: Dict[str, SaaSArbitrageBot] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.running = False
+        self._shutdown = asyncio.Event()
+        self._commands: set = set()  # In-flight command tasks
+
+        self.logger.info(f"🏠 Tenant host initialized (max {max_tenants} tenants)")
+
+
+    async def add_tenant(self, user_id: str, settings: Dict[str, Any], credentials: List[Dict[str, Any]]) -> bool:
+        """Start (or restart) a tenant's bot session."""
+        if user_id in self.tenants:
+            await self.remove_tenant(user_id)
+
+        if len(self.tenants) >= self.max_tenants:
+            self.logger.error(f"❌ Tenant limit reached ({self.max_tenants}), rejecting {user_id}")
+            return False
+
+        bot = SaaSArbitrageBot(
+            user_id=user_id,
+            settings=settings,
+            credentials=credentials,
+            on_trade=lambda trade_data: self.channel.send('trade', trade_data, userId=user_id)
+        )
+        self.tenants[user_id] = bot
+        self.tasks[user_id] = asyncio.create_task(self._run_tenant(user_id, bot))
+        self.logger.info(f"➕ Tenant {user_id} added ({len(self.tenants)} active)")
+        return True
+
+    async def _run_tenant(self, user_id: str, bot: SaaSArbitrageBot) -> None:
+        """Run one tenant; its failures never affect other tenants."""
+        error = None
+        try:
+            await bot.start()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e)
+            self.logger.error(f"Tenant {user_id} crashed: {e}")
+        finally:
+            # Only clear the slot if it still belongs to this session (not a restart)
+            if self.tenants.get(user_id) is bot:
+                del self.tenants[user_id]
+                self.tasks.pop(user_id, None)
+            self.channel.send('tenant_stopped', userId=user_id, error=error)
+
+    async def remove_tenant(self, user_id: str) -> bool:
+        """Stop a tenant gracefully, cancelling it if it does not finish in time."""
+        bot = self.tenants.pop(user_id, None)
+        task = self.tasks.pop(user_id, None)
+        if bot is None:
+            return False
+
+        bot.stop()
+        if task:
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout=self.stop_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"⚠️ Tenant {user_id} did not stop in {self.stop_timeout}s, cancelling")
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            except Exception as e:
+                self.logger.error(f"Error stopping tenant {user_id}: {e}")
+
+        self.logger.info(f"➖ Tenant {user_id} removed ({len(self.tenants)} active)")
+        return True
+
+    def list_tenants(self) -> List[Dict[str, Any]]:
+        """Per-tenant status."""
+        return [
+            {
+                'userId': user_id,
+                'running': bot.running,
+                'exchanges': list(bot.exchanges.keys()),
+                'tradesExecuted': bot.trades_executed,
+                'totalProfit': bot.total_profit,
+                'opportunitiesFound': bot.opportunities_found,
+            }
+            for user_id, bot in self.tenants.items()
+        ]
+
+    async def handle_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one control command and build its reply."""
+        cmd = command.get('cmd')
+        user_id = command.get('userId')
+        reply: Dict[str, Any] = {'cmd': cmd, 'userId': user_id, 'id': command.get('id')}
+
+        try:
+            if cmd == 'add_tenant':
+                reply['ok'] = await self.add_tenant(user_id, command.get('settings', {}), command.get('credentials', []))
+            elif cmd == 'remove_tenant':
+                reply['ok'] = await self.remove_tenant(user_id)
+            elif cmd == 'list_tenants':
+                reply['ok'] = True
+                reply['tenants'] = self.list_tenants()
+                reply['detection'] = get_detection_hub().stats()
+                reply['allocation'] = get_execution_allocator().stats()
+            elif cmd == 'shutdown':
+                reply['ok'] = True
+                self._shutdown.set()
+            else:
+                reply['ok'] = False
+                reply['error'] = f"Unknown command: {cmd}"
+        except Exception as e:
+            self.logger.error(f"Error handling command {cmd}: {e}")
+            reply['ok'] = False
+            reply['error'] = str(e)
+
+        return reply
+
+    async def _read_commands(self) -> None:
+        """Dispatch command frames until the parent closes the channel."""
+        async for frame in self.channel.commands():
+            if frame.get('type') != 'command':
+                self.logger.warning(f"Ignoring unexpected frame type: {frame.get('type')}")
+                continue
+            # Commands run concurrently so a slow tenant start does not block the channel
+            task = asyncio.create_task(self._dispatch(frame))
+            self._commands.add(task)
+            task.add_done_callback(self._commands.discard)
+
+        self._shutdown.set()
+
+    async def _dispatch(self, command: Dict[str, Any]) -> None:
+        reply = await self.handle_command(command)
+        self.channel.send('reply', **reply)
+
+    async def _report_loop(self) -> None:
+        """Send heartbeats, and per-tenant stats less often."""
+        last_stats = 0.0
+        loop = asyncio.get_running_loop()
+        while self.running:
+            self.channel.send('heartbeat', {'tenants': list(self.tenants.keys()), 'ipc': self.channel.stats()})
+            if loop.time() - last_stats >= STATS_INTERVAL:
+                self.channel.send('stats', self.list_tenants())
+                last_stats = loop.time()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def _watch_channel(self) -> None:
+        """Shut down when the IPC channel breaks: trades and replies can no longer reach the parent."""
+        await self.channel.broken.wait()
+        self.logger.error(f"❌ Lost IPC channel to the parent ({self.channel.error!r}), shutting down")
+        self._shutdown.set()
+
+    async def serve(self) -> None:
+        """Serve control commands until shutdown, then stop every tenant."""
+        self.running = True
+        reader_task = asyncio.create_task(self._read_commands())
+        report_task = asyncio.create_task(self._report_loop())
+        watch_task = asyncio.create_task(self._watch_channel())
+
+        await self._shutdown.wait()
+
+        self.running = False
+        reader_task.cancel()
+        report_task.cancel()
+        watch_task.cancel()
+        await self.shutdown()
+        await self.channel.close()
+
+    async def shutdown(self) -> None:
+        """Stop all tenants concurrently."""
+        user_ids = list(self.tenants.keys())
+        if user_ids:
+            self.logger.info(f"Stopping {len(user_ids)} tenants...")
+            await asyncio.gather(*(self.remove_tenant(user_id) for user_id in user_ids), return_exceptions=True)
+        await get_http_sessions().close_all()
+        self.logger.info("Tenant host shutdown complete")
+
+    def _signal_handler(self):
+        """Handle shutdown signals."""
+        self.logger.info("Received shutdown signal")
+        self._shutdown.set()
+
+async def main():
+    """Main entry point for the tenant host."""
+    channel = IpcChannel.from_env()
+    await channel.open()
+    host = TenantHost(channel, max_tenants=int(os.getenv('MAX_TENANTS', '200')))
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, host._signal_handler)
+        except NotImplementedError:
+            pass  # Windows
+
+    await host.serve()
+
+if __name__ == "__main__":
+    asyncio.run(main())
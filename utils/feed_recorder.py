@@ -0,0 +1,250 @@
+"""
+Raw market-feed recorder and deterministic replayer.
+
+The recorder captures WebSocket frames exactly as received, together with a
+nanosecond receive timestamp, into rotating gzip files. Recording only costs a
+queue put on the event loop; encoding, compression and disk I/O run on a
+background thread.
+
+The replayer feeds recorded frames back into a detector's message handler
+(`process_data` or `_handle_websocket_message`) at original or accelerated
+speed, so detector changes can be benchmarked on identical real traffic.
+
+File format: a sequence of frames, each `<q I B` header (receive time ns,
+payload length, 1 if text else 0) followed by the payload bytes.
+
+Usage:
+    FEED_RECORD_DIR=data/feeds python main_gui.py      # record
+    python -m utils.feed_recorder data/feeds/binance_*.feed.gz --detector simple --speed 10
+"""
+
+import os
+import gzip
+import glob
+import time
+import queue
+import atexit
+import struct
+import asyncio
+import inspect
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger('FeedRecorder')
+
+_HEADER = struct.Struct('<qIB')
+_STOP = object()
+
+
+class FeedRecorder:
+    """Append raw WebSocket frames with receive timestamps to rotating compressed files."""
+
+    def __init__(self, exchange_id: str, directory: str = 'data/feeds',
+                 max_file_bytes: int = 64 * 1024 * 1024, compresslevel: int = 1,
+                 max_queue: int = 100000):
+        self.exchange_id = exchange_id
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.compresslevel = compresslevel
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+        self.files_written: List[str] = []
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._file_bytes = 0
+        self._file_seq = 0
+        # Unique per recorder so recorders for one exchange never share a file name
+        self._recorder_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer_loop, name=f"feed-recorder-{exchange_id}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        logger.info(f"🎙️ Recording {exchange_id} feed to {directory}")
+
+    @classmethod
+    def from_env(cls, exchange_id: str) -> Optional['FeedRecorder']:
+        """Create a recorder when FEED_RECORD_DIR is set, otherwise return None."""
+        directory = os.getenv('FEED_RECORD_DIR', '').strip()
+        if not directory:
+            return None
+        return cls(exchange_id, directory)
+
+    def record(self, message: Union[str, bytes]) -> None:
+        """Capture one frame. Never blocks: frames are dropped if the writer falls behind."""
+        try:
+            self._queue.put_nowait((time.time_ns(), message))
+            self.frames_recorded += 1
+        except queue.Full:
+            self.frames_dropped += 1
+
+    def close(self) -> None:
+        """Flush pending frames and close the current file."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=10)
+
+    def _open_next_file(self) -> None:
+        if self._file:
+            self._file.close()
+        self._file_seq += 1
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.directory,
+                            f"{self.exchange_id}_{stamp}_{self._recorder_id}_{self._file_seq:04d}.feed.gz")
+        self._file = gzip.open(path, 'xb', compresslevel=self.compresslevel)  # Never overwrite a recording
+        self._file_bytes = 0
+        self.files_written.append(path)
+
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            # Drain whatever else is queued so compression works on larger batches
+            batch = [item]
+            stop = False
+            while True:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is _STOP:
+                    stop = True
+                    break
+                batch.append(extra)
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Error writing {self.exchange_id} feed recording: {e}")
+
+            if stop:
+                break
+
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write_batch(self, batch: List[Tuple[int, Union[str, bytes]]]) -> None:
+        chunks = []
+        size = 0
+        for recv_ns, message in batch:
+            is_text = isinstance(message, str)
+            payload = message.encode('utf-8') if is_text else bytes(message)
+            chunks.append(_HEADER.pack(recv_ns, len(payload), 1 if is_text else 0))
+            chunks.append(payload)
+            size += _HEADER.size + len(payload)
+
+        if self._file is None or self._file_bytes >= self.max_file_bytes:
+            self._open_next_file()
+        self._file.write(b''.join(chunks))
+        self._file_bytes += size
+
+
+def read_frames(path: str) -> Iterator[Tuple[int, Union[str, bytes]]]:
+    """Yield (receive_time_ns, message) from one recording file."""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return  # end of file (or truncated tail from an unclean shutdown)
+            recv_ns, length, is_text = _HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield recv_ns, payload.decode('utf-8') if is_text else payload
+
+
+class FeedReplayer:
+    """Replay recorded frames into a detector handler, deterministically and in order."""
+
+    def __init__(self, paths: List[str]):
+        self.paths = sorted(paths)
+
+    def frames(self) -> Iterator[Tuple[int, Union[str, bytes]]]:
+        for path in self.paths:
+            yield from read_frames(path)
+
+    @staticmethod
+    def handler_for(detector: Any) -> Callable:
+        """Pick the raw-message entry point of a detector."""
+        for name in ('process_data', '_handle_websocket_message', '_process_websocket_message'):
+            handler = getattr(detector, name, None)
+            if handler:
+                return handler
+        raise AttributeError(f"{type(detector).__name__} has no raw message handler")
+
+    async def replay(self, handler: Callable, speed: Optional[float] = 1.0) -> Dict[str, Any]:
+        """
+        Feed every frame to `handler` (sync or async).
+        speed=1.0 reproduces the original pacing, 10.0 runs ten times faster,
+        and None/0 replays as fast as possible.
+        """
+        is_async = inspect.iscoroutinefunction(handler)
+        frames = 0
+        first_ns = None
+        start = time.perf_counter()
+
+        for recv_ns, message in self.frames():
+            if speed:
+                if first_ns is None:
+                    first_ns = recv_ns
+                # Pace against the start of the replay so sleeps don't accumulate drift
+                due = (recv_ns - first_ns) / 1e9 / speed
+                delay = due - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if is_async:
+                await handler(message)
+            else:
+                handler(message)
+            frames += 1
+
+        elapsed = time.perf_counter() - start
+        return {
+            'frames': frames,
+            'elapsed_seconds': elapsed,
+            'frames_per_second': frames / elapsed if elapsed > 0 else 0.0
+        }
+
+
+async def main():
+    """Replay recordings into a detector and report throughput."""
+    import argparse
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description='Replay recorded market feeds into a detector')
+    parser.add_argument('files', nargs='+', help='Recording files or glob patterns')
+    parser.add_argument('--detector', choices=['simple', 'realtime'], default='simple')
+    parser.add_argument('--exchange', default='binance')
+    parser.add_argument('--speed', type=float, default=0.0, help='1.0 = original pace, 0 = as fast as possible')
+    args = parser.parse_args()
+
+    paths = [p for pattern in args.files for p in glob.glob(pattern)]
+    if not paths:
+        print("No recording files found")
+        return
+
+    if args.detector == 'simple':
+        from arbitrage.simple_triangle_detector import SimpleTriangleDetector
+        detector = SimpleTriangleDetector(min_profit_pct=0.01, exchange_id=args.exchange)
+        await detector.get_pairs()
+    else:
+        from arbitrage.realtime_detector import RealtimeArbitrageDetector
+        detector = RealtimeArbitrageDetector()
+        await detector.initialize()
+
+    replayer = FeedReplayer(paths)
+    stats = await replayer.replay(FeedReplayer.handler_for(detector), speed=args.speed or None)
+    print(f"▶️ Replayed {stats['frames']} frames in {stats['elapsed_seconds']:.2f}s "
+          f"({stats['frames_per_second']:.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
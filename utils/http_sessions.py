@@ -0,0 +1,152 @@
+"""
+Process-wide pooled aiohttp sessions.
+
+One ClientSession per host (or per exchange for ccxt clients) and event loop,
+with a tuned connection pool, DNS cache and long keep-alive, instead of a new
+session and TCP/TLS handshake per request. ccxt clients for the same exchange
+share one session, so every tenant in python-bot/tenant_host.py reuses the same
+warm connections.
+
+keep_warm() registers a cheap probe (e.g. the exchange's fetch_time) that runs
+every `interval` seconds on a pooled session, so the first order after a quiet
+period does not pay for DNS, TCP and TLS setup.
+"""
+
+import asyncio
+import ssl
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from utils.logger import setup_logger
+
+try:
+    import certifi
+except ImportError:
+    certifi = None
+
+
+class HttpSessionRegistry:
+    """Shared aiohttp sessions keyed by host and event loop, with keep-alive warming."""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 32, dns_ttl: int = 300,
+                 keepalive_timeout: float = 75.0, warm_interval: float = 25.0):
+        self.logger = setup_logger('HttpSessions')
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl  # Seconds resolved addresses are reused
+        self.keepalive_timeout = keepalive_timeout  # Idle pooled connections are kept this long
+        self.warm_interval = warm_interval  # Must stay below server and pool idle timeouts
+        self._sessions: Dict[Tuple[int, str], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        self._probes: Dict[Tuple[int, str], Dict[Any, Callable[[], Awaitable[Any]]]] = {}
+        self._warmers: Dict[Tuple[int, str], asyncio.Task] = {}
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Pool key for a URL: scheme and host."""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _ssl_context(self) -> ssl.SSLContext:
+        if certifi is not None:
+            return ssl.create_default_context(cafile=certifi.where())
+        return ssl.create_default_context()
+
+    def session(self, key: str) -> aiohttp.ClientSession:
+        """Shared session for a host key (see host_key) or an exchange pool like 'ccxt:binance'."""
+        loop = asyncio.get_running_loop()
+        self._forget_closed_loops()
+        slot = (id(loop), key)
+        entry = self._sessions.get(slot)
+        if entry is None or entry[1].closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True,
+                ssl=self._ssl_context()
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30, connect=10),
+                trust_env=True
+            )
+            self._sessions[slot] = (loop, session)
+            return session
+        return entry[1]
+
+    def for_url(self, url: str) -> aiohttp.ClientSession:
+        """Shared session for the host of `url`."""
+        return self.session(self.host_key(url))
+
+    def _forget_closed_loops(self) -> None:
+        """Drop sessions left behind by event loops that have since been closed (GUI restarts)."""
+        for slot in [s for s, (loop, _) in self._sessions.items() if loop.is_closed()]:
+            del self._sessions[slot]
+            self._probes.pop(slot, None)
+            self._warmers.pop(slot, None)
+
+    def keep_warm(self, key: str, owner: Any, probe: Callable[[], Awaitable[Any]]) -> None:
+        """Run `probe` periodically to keep pooled connections for `key` open; one warmer per key."""
+        slot = (id(asyncio.get_running_loop()), key)
+        self._probes.setdefault(slot, {})[owner] = probe
+        task = self._warmers.get(slot)
+        if task is None or task.done():
+            self._warmers[slot] = asyncio.create_task(self._warm_loop(slot))
+
+    def stop_warm(self, key: str, owner: Any) -> None:
+        """Remove an owner's probe; the warmer stops once no owner is left."""
+        try:
+            slot = (id(asyncio.get_running_loop()), key)
+        except RuntimeError:
+            return
+        probes = self._probes.get(slot)
+        if probes is not None:
+            probes.pop(owner, None)
+
+    async def _warm_loop(self, slot: Tuple[int, str]) -> None:
+        key = slot[1]
+        while self._probes.get(slot):
+            await asyncio.sleep(self.warm_interval)
+            probes = self._probes.get(slot)
+            if not probes:
+                break
+            # Any owner's client will do: they share the pool
+            probe = next(iter(probes.values()))
+            try:
+                await asyncio.wait_for(probe(), timeout=10)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.debug(f"Keep-alive probe for {key} failed: {e}")
+        self._probes.pop(slot, None)
+        self._warmers.pop(slot, None)
+
+    async def close_all(self) -> None:
+        """Stop warmers and close every session owned by the running loop."""
+        loop_id = id(asyncio.get_running_loop())
+        for slot in [s for s in self._warmers if s[0] == loop_id]:
+            self._warmers.pop(slot).cancel()
+            self._probes.pop(slot, None)
+        for slot in [s for s in self._sessions if s[0] == loop_id]:
+            _, session = self._sessions.pop(slot)
+            if not session.closed:
+                await session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'sessions': len(self._sessions),
+            'warmers': sum(1 for task in self._warmers.values() if not task.done())
+        }
+
+
+_http_sessions_instance = None
+
+def get_http_sessions() -> HttpSessionRegistry:
+    """Get or create the global HTTP session registry."""
+    global _http_sessions_instance
+    if _http_sessions_instance is None:
+        _http_sessions_instance = HttpSessionRegistry()
+    return _http_sessions_instance
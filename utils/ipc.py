@@ -0,0 +1,130 @@
+"""
+Framed IPC between lib/bot-manager.ts and the Python bots.
+
+Frames are newline-delimited JSON objects (json.dumps never emits a raw newline),
+so a frame split across reads is reassembled rather than lost. The channel is a
+dedicated fd passed in BOT_IPC_FD; Node creates extra 'pipe' stdio entries as
+socketpairs, so one fd carries both directions and logs on stdout/stderr never
+mix with frames. Without BOT_IPC_FD the channel falls back to stdin/stdout.
+
+Outbound frames: {"type": "trade" | "stats" | "heartbeat" | "reply" | "tenant_stopped", ...}
+Inbound frames:  {"type": "command", "cmd": "...", "id": ..., ...}
+
+Outbound frames are queued and written in batches; trades and replies are
+never dropped, while stats and heartbeats are dropped once `max_pending` frames
+are waiting on a slow reader. If a write fails (the parent is gone) the channel
+is marked broken: queued frames are discarded, `send` refuses new ones and
+`broken` is set so the owner can shut down.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+from collections import deque
+from typing import Dict, Any, Optional, AsyncIterator
+
+DROPPABLE_TYPES = {'stats', 'heartbeat'}
+
+
+class IpcChannel:
+    """Bidirectional newline-delimited JSON channel with batched, backpressured writes."""
+
+    def __init__(self, fd: Optional[int] = None, max_pending: int = 10000, max_batch: int = 256):
+        self.fd = fd
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer = None
+        self._pending: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self.broken = asyncio.Event()
+        self.error: Optional[BaseException] = None
+        self.sent = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls) -> 'IpcChannel':
+        fd = os.getenv('BOT_IPC_FD')
+        return cls(int(fd) if fd else None)
+
+    async def open(self) -> None:
+        """Attach to the IPC fd (or stdio) and start the batching writer."""
+        loop = asyncio.get_running_loop()
+        if self.fd is not None:
+            sock = socket.socket(fileno=self.fd)
+            self.reader, self.writer = await asyncio.open_connection(sock=sock)
+        else:
+            self.reader = asyncio.StreamReader()
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(self.reader), sys.stdin)
+            transport, protocol = await loop.connect_write_pipe(
+                asyncio.streams.FlowControlMixin, os.fdopen(os.dup(1), 'wb')
+            )
+            self.writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
+    def send(self, message_type: str, data: Any = None, **fields: Any) -> bool:
+        """Queue one frame; returns False if it was discarded (droppable type, or the channel is broken)."""
+        if self.broken.is_set() or (message_type in DROPPABLE_TYPES and len(self._pending) >= self.max_pending):
+            self.dropped += 1
+            return False
+        message = {'type': message_type, **fields}
+        if data is not None:
+            message['data'] = data
+        self._pending.append(message)
+        self._wakeup.set()
+        return True
+
+    async def _writer_loop(self) -> None:
+        """Write queued frames in batches, waiting for the reader to drain between them."""
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending:
+                    count = min(self.max_batch, len(self._pending))
+                    batch = [self._pending.popleft() for _ in range(count)]
+                    payload = ''.join(json.dumps(message, default=str) + '\n' for message in batch)
+                    self.writer.write(payload.encode('utf-8'))
+                    await self.writer.drain()
+                    self.sent += count
+        except Exception as e:
+            # Parent gone (broken pipe / reset): nothing queued can be delivered any more
+            from utils.logger import setup_logger
+            self.error = e
+            self.dropped += len(self._pending)
+            self._pending.clear()
+            self.broken.set()
+            setup_logger('IpcChannel').error(f"❌ IPC channel write failed, channel closed: {e!r}")
+
+    async def commands(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield inbound frames until the parent closes the channel."""
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            try:
+                frame = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(frame, dict):
+                yield frame
+
+    def stats(self) -> Dict[str, int]:
+        return {'pending': len(self._pending), 'sent': self.sent, 'dropped': self.dropped}
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Flush queued frames, then close the channel."""
+        if self._writer_task:
+            deadline = asyncio.get_running_loop().time() + timeout
+            while self._pending and asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.01)
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+        if self.writer:
+            try:
+                self.writer.close()
+            except Exception:
+                pass
@@ -1,12 +1,115 @@
 import logging
 import colorlog
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import os
 import sys
+import time
+import queue
+import atexit
+import threading
 from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+# Records are handed to a background thread; the caller only pays for a queue put.
+LOG_QUEUE_SIZE = 10000
+# Per call site: this many INFO/DEBUG records in a burst, then this many per second
+RATE_LIMIT_BURST = 50
+RATE_LIMIT_PER_SECOND = 20.0
+
+_log_queue: "queue.Queue" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+_stats = {'dropped': 0, 'rate_limited': 0}
+
+
+class _RoutingHandler(logging.Handler):
+    """Runs on the listener thread and hands each record to its own logger's handlers."""
+
+    def __init__(self):
+        super().__init__()
+        self.routes: Dict[str, List[logging.Handler]] = {}
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+_router = _RoutingHandler()
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are counted and dropped when the queue is full."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats['dropped'] += 1
+
+
+class _RateLimitFilter(logging.Filter):
+    """Token bucket per call site for INFO/DEBUG records; warnings and errors always pass."""
+
+    def __init__(self, burst: int = RATE_LIMIT_BURST, per_second: float = RATE_LIMIT_PER_SECOND):
+        super().__init__()
+        self.burst = burst
+        self.per_second = per_second
+        self._buckets: Dict[Tuple[str, int], List[float]] = {}  # site -> [tokens, last_time, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        bucket = self._buckets.get(site)
+        if bucket is None:
+            bucket = self._buckets[site] = [float(self.burst), now, 0]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+
+        if bucket[0] < 1.0:
+            bucket[2] += 1
+            _stats['rate_limited'] += 1
+            return False
+
+        bucket[0] -= 1.0
+        if bucket[2]:
+            record.msg = f"{record.msg} [{int(bucket[2])} similar messages suppressed]"
+            bucket[2] = 0
+        return True
+
+
+def _ensure_listener() -> None:
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_log_queue, _router)
+            _listener.start()
+            atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background log writer."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Dropped (queue full) and rate-limited record counters."""
+    return {
+        'dropped': _stats['dropped'],
+        'rate_limited': _stats['rate_limited'],
+        'queued': _log_queue.qsize()
+    }
 
 def setup_logger(name: str, log_level: str = 'INFO') -> logging.Logger:
-    """Setup comprehensive logging with both file and console output."""
+    """Setup comprehensive logging with both file and console output (written by a background thread)."""
     
     # Create logs directory if it doesn't exist
     os.makedirs('logs', exist_ok=True)
@@ -76,9 +179,13 @@ def setup_logger(name: str, log_level: str = 'INFO') -> logging.Logger:
     )
     file_handler.setFormatter(file_formatter)
     
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Console and file writes happen on the listener thread; the logger itself
+    # only rate-limits and enqueues
+    _router.routes[name] = [console_handler, file_handler]
+    queue_handler = _DroppingQueueHandler(_log_queue)
+    queue_handler.addFilter(_RateLimitFilter())
+    logger.addHandler(queue_handler)
+    _ensure_listener()
     
     return logger
 
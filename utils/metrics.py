@@ -0,0 +1,244 @@
+"""
+Minimal Prometheus-style metrics registry.
+
+Counters, gauges and histograms are plain Python objects whose hot-path
+operations are a dict lookup and an addition. Bind labelled children once
+(`TICKS_RECEIVED.labels(exchange='binance')`) and keep the child to make an
+increment a single attribute update. `render()` produces the text exposition
+format served at `/metrics`.
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+_DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def labels(self, *values: Any, **kwargs: Any):
+        """Child metric for one label combination (created on first use)."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _default(self):
+        # Unlabelled metrics act as their own single child
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._sample_lines(key, child))
+        return lines
+
+    def _sample_lines(self, key: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = _DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def _sample_lines(self, key: Tuple[str, ...], child: _HistogramChild) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), child.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics by name and renders them all."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = _DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Market data
+TICKS_RECEIVED = REGISTRY.counter('arb_ticks_received_total', 'Ticker entries received from exchange streams (a combined frame counts each symbol)', ('exchange',))
+PARSE_ERRORS = REGISTRY.counter('arb_parse_errors_total', 'Stream messages that failed to parse', ('exchange',))
+WS_RECONNECTS = REGISTRY.counter('arb_ws_reconnects_total', 'Exchange WebSocket reconnect attempts', ('exchange',))
+
+# Detection
+SCANS = REGISTRY.counter('arb_scans_total', 'Opportunity scans run', ('detector',))
+SCAN_DURATION = REGISTRY.histogram('arb_scan_duration_seconds', 'Duration of one opportunity scan', ('detector',))
+TRIANGLES_EVALUATED = REGISTRY.counter('arb_triangles_evaluated_total', 'Triangles priced by detectors', ('detector',))
+OPPORTUNITIES_ABOVE_THRESHOLD = REGISTRY.counter(
+    'arb_opportunities_above_threshold_total', 'Opportunities found above the profit threshold', ('detector',))
+
+# Execution
+ORDERS_SENT = REGISTRY.counter('arb_orders_sent_total', 'Orders submitted to exchanges', ('exchange', 'side'))
+ORDER_ERRORS = REGISTRY.counter('arb_order_errors_total', 'Orders that failed or did not fill', ('exchange',))
+FILL_LATENCY = REGISTRY.histogram('arb_order_fill_latency_seconds', 'Time from order submit to confirmed fill', ('exchange',))
+REST_CALLS = REGISTRY.counter('arb_rest_calls_total', 'REST API calls by endpoint', ('exchange', 'endpoint'))
+
+# Web server
+WS_CLIENTS = REGISTRY.gauge('arb_ws_clients', 'Connected /ws clients')
+OPPORTUNITY_CACHE_ENTRIES = REGISTRY.gauge('arb_opportunity_cache_entries', 'Opportunities held in the web server cache')
+
+# Logging pipeline (utils.logger)
+LOG_RECORDS_DROPPED = REGISTRY.gauge('arb_log_records_dropped', 'Log records dropped because the log queue was full')
+LOG_RECORDS_RATE_LIMITED = REGISTRY.gauge('arb_log_records_rate_limited', 'Log records suppressed by per-call-site rate limiting')
+
+
+def instrument_ccxt(exchange: Any, exchange_id: str) -> None:
+    """Count every REST call a ccxt exchange makes, labelled by API endpoint path."""
+    original_fetch2 = exchange.fetch2
+
+    async def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        REST_CALLS.labels(exchange_id, path).inc()
+        return await original_fetch2(path, api, method, params, headers, body, config)
+
+    exchange.fetch2 = fetch2
+
+
+def render_metrics() -> str:
+    """Refresh pull-style gauges and render the registry."""
+    try:
+        from utils.logger import get_logging_stats
+        stats = get_logging_stats()
+        LOG_RECORDS_DROPPED.set(stats['dropped'])
+        LOG_RECORDS_RATE_LIMITED.set(stats['rate_limited'])
+    except Exception:
+        pass
+    return REGISTRY.render()
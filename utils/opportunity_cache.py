@@ -0,0 +1,73 @@
+"""
+Bounded TTL/LRU cache for detected opportunities, keyed by stable opportunity ID.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+
+class OpportunityCache:
+    """
+    Size-bounded cache whose entries expire `ttl` seconds after they were last seen.
+
+    Entries are kept in last-seen order, so the oldest entry is always at the
+    front: eviction and expiry pop from the front in O(1), and re-seeing an
+    opportunity moves it to the back in O(1).
+    """
+
+    def __init__(self, max_entries: int = 500, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()  # id -> (expires_at, value)
+        self.evictions = 0
+        self.expirations = 0
+
+    def put(self, key: str, value: Any) -> None:
+        """Insert or refresh an opportunity."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value for a live opportunity, or None if unknown or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        return entry[1]
+
+    def expire(self) -> None:
+        """Drop every entry whose TTL has passed."""
+        now = time.monotonic()
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+            self.expirations += 1
+
+    def values(self) -> List[Any]:
+        """Live values, most recently seen last."""
+        self.expire()
+        return [value for _, value in self._entries.values()]
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
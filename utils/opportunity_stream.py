@@ -0,0 +1,137 @@
+"""
+Delta-encoded opportunity stream for UI clients.
+
+Opportunities get stable IDs keyed by exchange + triangle, so the same
+triangle keeps its ID across scans. Each publish is diffed against the last
+known state and only what changed is broadcast:
+
+    opportunities_delta    {seq, added: [opp], updated: [{id, changed fields}], removed: [id]}
+    opportunities_snapshot {seq, opportunities: [opp]}
+
+Every message carries a sequence number. A client applies a delta only when
+its seq is exactly last_seq + 1; on a gap it drops its state and waits for the
+next snapshot, which is sent periodically, to every new client, and to any
+client whose send queue had to drop messages.
+"""
+
+import time
+from typing import Dict, List, Any, Optional, Iterable, Set
+
+# Fields that change on every scan without the opportunity itself changing
+_VOLATILE_FIELDS = ('timestamp',)
+
+
+def opportunity_id(exchange: str, triangle_path: Iterable[str]) -> str:
+    """Stable ID for one triangle on one exchange."""
+    return f"{exchange}:{'-'.join(list(triangle_path)[:3])}"
+
+
+class OpportunityStream:
+    """Keep the last published opportunity set and turn new sets into deltas."""
+
+    def __init__(self, snapshot_interval: float = 30.0):
+        self.snapshot_interval = snapshot_interval
+        self.seq = 0
+        self.items: Dict[str, Dict[str, Any]] = {}
+        # Several producers publish into one stream; an ID is removed only
+        # when no source reports it any more
+        self._owners: Dict[str, Set[str]] = {}
+        self._source_ids: Dict[str, Set[str]] = {}
+        self._last_snapshot = 0.0
+
+    def apply(self, source: str, opportunities: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Replace `source`'s opportunity set and return the delta, or None if nothing changed."""
+        added, updated, removed = [], [], []
+        current_ids = set()
+
+        for opp in opportunities:
+            opp_id = opp['id']
+            current_ids.add(opp_id)
+            self._owners.setdefault(opp_id, set()).add(source)
+            previous = self.items.get(opp_id)
+            if previous is None:
+                self.items[opp_id] = opp
+                added.append(opp)
+                continue
+
+            changes = {key: value for key, value in opp.items()
+                       if key not in _VOLATILE_FIELDS and previous.get(key) != value}
+            self.items[opp_id] = opp
+            if changes:
+                for key in _VOLATILE_FIELDS:
+                    if key in opp:
+                        changes[key] = opp[key]
+                changes['id'] = opp_id
+                updated.append(changes)
+
+        for opp_id in self._source_ids.get(source, set()) - current_ids:
+            owners = self._owners.get(opp_id)
+            if owners is None:
+                continue
+            owners.discard(source)
+            if not owners:
+                del self._owners[opp_id]
+                self.items.pop(opp_id, None)
+                removed.append(opp_id)
+
+        self._source_ids[source] = current_ids
+
+        if not (added or updated or removed):
+            return None
+        self.seq += 1
+        return {'seq': self.seq, 'added': added, 'updated': updated, 'removed': removed}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full current state, most profitable first."""
+        opportunities = sorted(self.items.values(), key=lambda o: o.get('profitPercentage', 0), reverse=True)
+        return {'seq': self.seq, 'opportunities': opportunities}
+
+    def snapshot_due(self) -> bool:
+        return time.time() - self._last_snapshot >= self.snapshot_interval
+
+    async def publish(self, websocket_manager, source: str, opportunities: List[Dict[str, Any]]) -> None:
+        """Diff `opportunities` into the stream and broadcast a delta (or a periodic snapshot)."""
+        delta = self.apply(source, opportunities)
+        if self.snapshot_due():
+            self._last_snapshot = time.time()
+            await websocket_manager.broadcast('opportunities_snapshot', self.snapshot())
+        elif delta:
+            await websocket_manager.broadcast('opportunities_delta', delta)
+
+
+class OpportunityBook:
+    """Client-side state rebuilt from snapshot and delta messages."""
+
+    def __init__(self):
+        self.seq: Optional[int] = None
+        self.items: Dict[str, Dict[str, Any]] = {}
+
+    def apply_message(self, event_type: str, data: Dict[str, Any]) -> bool:
+        """Apply one stream message; returns True when the book changed."""
+        if event_type == 'opportunities_snapshot':
+            self.items = {opp['id']: dict(opp) for opp in data.get('opportunities', [])}
+            self.seq = data.get('seq')
+            return True
+
+        if event_type != 'opportunities_delta':
+            return False
+        if self.seq is not None and data.get('seq', 0) <= self.seq:
+            return False  # already contained in the snapshot we hold
+        if self.seq is None or data.get('seq') != self.seq + 1:
+            # Missed a delta: state is unknown until the next snapshot
+            self.seq = None
+            return False
+
+        for opp in data.get('added', []):
+            self.items[opp['id']] = dict(opp)
+        for changes in data.get('updated', []):
+            item = self.items.get(changes['id'])
+            if item is not None:
+                item.update(changes)
+        for opp_id in data.get('removed', []):
+            self.items.pop(opp_id, None)
+        self.seq = data['seq']
+        return True
+
+    def opportunities(self) -> List[Dict[str, Any]]:
+        return sorted(self.items.values(), key=lambda o: o.get('profitPercentage', 0), reverse=True)
@@ -0,0 +1,111 @@
+"""
+Import-time profiling for the bot's entry points.
+
+Runs a fresh interpreter with `-X importtime` that only imports the entry
+module (nothing is started), and reports which modules dominate cold start.
+Every entry point accepts `--profile-startup`:
+
+    python main.py --profile-startup
+    python main_gui.py --profile-startup
+    python python-bot/tenant_host.py --profile-startup
+
+benchmarks/startup_benchmark.py uses the same measurement to enforce a
+cold-start budget.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point -> (module to import, extra sys.path entries relative to the repo root)
+ENTRY_POINTS = {
+    'main': ('main', []),
+    'main_gui': ('main_gui', []),
+    'web_server': ('api.web_server', []),
+    'main_saas': ('main_saas', ['python-bot']),
+    'tenant_host': ('tenant_host', ['python-bot']),
+}
+
+
+def _import_command(entry: str) -> List[str]:
+    module, extra_paths = ENTRY_POINTS[entry]
+    paths = [os.path.join(REPO_ROOT, p) for p in extra_paths] + [REPO_ROOT]
+    code = f"import sys; sys.path[:0] = {paths!r}; import {module}"
+    return ['-c', code]
+
+
+def profile_imports(entry: str, python: Optional[str] = None) -> Dict[str, Any]:
+    """Import an entry point in a fresh interpreter under -X importtime and parse the report."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', *_import_command(entry)],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            modules.append({
+                'module': name.strip(),
+                'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+            })
+        except ValueError:
+            continue
+
+    errors = [l for l in proc.stderr.splitlines() if not l.startswith('import time:')]
+    return {
+        'entry': entry,
+        'ok': proc.returncode == 0,
+        'error': errors[-1] if proc.returncode != 0 and errors else None,
+        'wall_seconds': wall,
+        'import_ms': sum(m['self_ms'] for m in modules),
+        'modules': modules,
+    }
+
+
+def format_report(profile: Dict[str, Any], top: int = 25) -> str:
+    """Human-readable summary: totals, then the slowest top-level packages and modules."""
+    lines = [
+        f"Startup profile for {profile['entry']}",
+        f"  Wall time (fresh interpreter): {profile['wall_seconds'] * 1000:.0f} ms",
+        f"  Total import time:             {profile['import_ms']:.0f} ms across {len(profile['modules'])} modules",
+    ]
+    if not profile['ok']:
+        lines.append(f"  ⚠️ Import failed: {profile['error']}")
+
+    packages: Dict[str, float] = {}
+    for m in profile['modules']:
+        root = m['module'].split('.')[0]
+        packages[root] = packages.get(root, 0.0) + m['self_ms']
+
+    lines.append("")
+    lines.append(f"  {'package':<30} {'self ms':>10}")
+    for root, ms in sorted(packages.items(), key=lambda x: x[1], reverse=True)[:top]:
+        lines.append(f"  {root:<30} {ms:>10.1f}")
+
+    lines.append("")
+    lines.append(f"  {'module':<50} {'self ms':>10} {'cumul. ms':>10}")
+    for m in sorted(profile['modules'], key=lambda m: m['self_ms'], reverse=True)[:top]:
+        lines.append(f"  {m['module']:<50} {m['self_ms']:>10.1f} {m['cumulative_ms']:>10.1f}")
+    return '\n'.join(lines)
+
+
+def profile_startup(entry: str, top: int = 25) -> int:
+    """Print the import profile for an entry point; used by the --profile-startup flags."""
+    profile = profile_imports(entry)
+    print(format_report(profile, top))
+    return 0 if profile['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(profile_startup(sys.argv[1] if len(sys.argv) > 1 else 'main'))
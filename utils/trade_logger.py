@@ -10,6 +10,7 @@ from pathlib import Path
 
 from models.trade_log import TradeLog, TradeStepLog, TradeStatus, TradeDirection
 from utils.logger import setup_logger
+from utils.trade_store import TradeStore
 
 class TradeLogger:
     """Enhanced trade logger with detailed tracking and WebSocket broadcasting."""
@@ -17,68 +18,47 @@ class TradeLogger:
     def __init__(self, websocket_manager=None):
         self.logger = setup_logger('TradeLogger')
         self.websocket_manager = websocket_manager
-        self.trade_logs: List[TradeLog] = []
         
         # Ensure logs directory exists
         Path('logs').mkdir(exist_ok=True)
         
-        # Load existing trade logs
-        self._load_existing_logs()
+        # Append-only journal and indexed history (pruned only if TRADE_RETENTION_DAYS is set)
+        from config.config import Config
+        self.store = TradeStore(
+            'logs/trades.db',
+            fsync='normal',
+            retention_days=Config.TRADE_RETENTION_DAYS,
+            compact_interval=Config.TRADE_COMPACT_INTERVAL_HOURS * 3600
+        )
+        self._import_legacy_logs()
+        self.logger.info(f"Trade journal holds {self.store.count()} trades")
     
-    def _load_existing_logs(self):
-        """Load existing trade logs from file."""
+    def _import_legacy_logs(self):
+        """One-time migration of logs/detailed_trades.json into an empty trade journal."""
+        log_file = Path('logs/detailed_trades.json')
         try:
-            log_file = Path('logs/detailed_trades.json')
-            if log_file.exists():
+            # Recorded in the journal itself: compaction can empty the trades table later
+            if not log_file.exists() or self.store.get_meta('legacy_json_imported'):
+                return
+            if self.store.count() == 0:
                 with open(log_file, 'r') as f:
-                    data = json.load(f)
-                    # Keep only the last 1000 trades to prevent memory issues
-                    self.trade_logs = data[-1000:]
-                self.logger.info(f"Loaded {len(self.trade_logs)} existing trade logs")
+                    legacy = json.load(f)
+                imported = self.store.add_trades([log for log in legacy if isinstance(log, dict)])
+                self.logger.info(f"Imported {imported} trades from detailed_trades.json into trade journal")
+            self.store.set_meta('legacy_json_imported', datetime.now().isoformat())
         except Exception as e:
-            self.logger.error(f"Error loading existing trade logs: {e}")
-            self.trade_logs = []
-    
-    def _save_logs(self):
-        """Save trade logs to file."""
-        try:
-            log_file = Path('logs/detailed_trades.json')
-            with open(log_file, 'w', encoding='utf-8') as f:
-                # Convert trade logs to dict format safely
-                trade_data = []
-                for log in self.trade_logs:
-                    if hasattr(log, 'to_dict'):
-                        trade_data.append(log.to_dict())
-                    elif isinstance(log, dict):
-                        trade_data.append(log)
-                    else:
-                        # Convert object to dict manually
-                        trade_data.append({
-                            'trade_id': getattr(log, 'trade_id', 'unknown'),
-                            'timestamp': getattr(log, 'timestamp', datetime.now()).isoformat() if hasattr(getattr(log, 'timestamp', None), 'isoformat') else str(getattr(log, 'timestamp', datetime.now())),
-                            'exchange': getattr(log, 'exchange', 'unknown'),
-                            'status': getattr(log, 'status', 'unknown'),
-                            'net_pnl': getattr(log, 'net_pnl', 0.0)
-                        })
-                json.dump(trade_data, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Error saving trade logs: {e}")
+            self.logger.error(f"Error importing existing trade logs: {e}")
     
     async def log_trade(self, trade_log: TradeLog):
         """Log a completed trade with full details."""
         try:
-            # Add to memory
-            self.trade_logs.append(trade_log)
-            
-            # Keep only last 1000 trades in memory
-            if len(self.trade_logs) > 1000:
-                self.trade_logs = self.trade_logs[-1000:]
+            trade_data = trade_log.to_dict()
             
             # Log to console
             self.logger.info(trade_log.to_log_string())
             
-            # Save to file
-            self._save_logs()
+            # Append to the journal; committed by the background writer
+            self.store.append(trade_data)
             
             # Broadcast via WebSocket
             await self._broadcast_trade_update(trade_log)
@@ -109,49 +89,16 @@ class TradeLogger:
     
     def get_recent_trades(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent trades for UI display."""
-        recent_trades = self.trade_logs[-limit:] if self.trade_logs else []
-        return [trade.to_dict() for trade in reversed(recent_trades)]
+        return self.store.recent(limit)
     
-    def get_trade_statistics(self) -> Dict[str, Any]:
-        """Calculate comprehensive trade statistics."""
-        if not self.trade_logs:
-            return {
-                'total_trades': 0,
-                'successful_trades': 0,
-                'failed_trades': 0,
-                'success_rate': 0.0,
-                'total_profit': 0.0,
-                'total_fees': 0.0,
-                'average_duration_ms': 0.0,
-                'best_trade': None,
-                'worst_trade': None
-            }
-        
-        successful_trades = [t for t in self.trade_logs if t.status == TradeStatus.SUCCESS]
-        failed_trades = [t for t in self.trade_logs if t.status == TradeStatus.FAILED]
-        
-        total_profit = sum(t.net_pnl for t in self.trade_logs)
-        total_fees = sum(t.total_fees_paid for t in self.trade_logs)
-        avg_duration = sum(t.total_duration_ms for t in self.trade_logs) / len(self.trade_logs)
-        
-        # Find best and worst trades
-        profitable_trades = [t for t in self.trade_logs if t.net_pnl > 0]
-        loss_trades = [t for t in self.trade_logs if t.net_pnl < 0]
-        
-        best_trade = max(profitable_trades, key=lambda t: t.net_pnl) if profitable_trades else None
-        worst_trade = min(loss_trades, key=lambda t: t.net_pnl) if loss_trades else None
-        
-        return {
-            'total_trades': len(self.trade_logs),
-            'successful_trades': len(successful_trades),
-            'failed_trades': len(failed_trades),
-            'success_rate': (len(successful_trades) / len(self.trade_logs)) * 100,
-            'total_profit': total_profit,
-            'total_fees': total_fees,
-            'average_duration_ms': avg_duration,
-            'best_trade': best_trade.to_dict() if best_trade else None,
-            'worst_trade': worst_trade.to_dict() if worst_trade else None
-        }
+    def query_trades(self, limit: int = 50, cursor: Optional[str] = None, exchange: Optional[str] = None,
+                     status: Optional[str] = None, since: Any = None, until: Any = None) -> Dict[str, Any]:
+        """Page through the full trade history, newest first, with optional filters."""
+        return self.store.query(limit=limit, cursor=cursor, exchange=exchange, status=status, since=since, until=until)
+    
+    def get_trade_statistics(self, window: str = 'all', exchange: Optional[str] = None) -> Dict[str, Any]:
+        """Trade statistics over a rolling window, from pre-aggregated hourly buckets."""
+        return self.store.statistics(window=window, exchange=exchange)
 
 # Global trade logger instance
 _trade_logger_instance = None
@@ -0,0 +1,415 @@
+"""
+SQLite-backed trade history with indexed queries and pre-aggregated stats.
+
+Every trade is one row (full `TradeLog.to_dict()` JSON plus indexed columns
+for time, exchange, status and PnL). Each insert also updates an hourly
+aggregate bucket per exchange in the same transaction, so rolling statistics
+over any window sum a few hundred bucket rows instead of scanning trades.
+
+The database doubles as the append-only trade journal: `append()` only puts
+the trade on a queue, and a background thread commits queued trades in
+batches to the WAL. The fsync policy maps to SQLite's `synchronous` pragma:
+
+    always  fsync on every batch commit (FULL)
+    normal  fsync on WAL checkpoints only (NORMAL, survives process crashes)
+    off     leave flushing to the OS (OFF)
+
+History is kept forever unless `retention_days` is set. Then the writer
+thread compacts the journal shortly after start and every `compact_interval`
+seconds, deleting in small chunks and returning freed pages with
+`incremental_vacuum` so readers are never locked out for long. Reads see
+committed trades only; they never wait for the writer queue to drain.
+"""
+
+import json
+import math
+import queue
+import atexit
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+from utils.logger import setup_logger
+
+_BUCKET_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    trade_id TEXT UNIQUE,
+    ts REAL NOT NULL,
+    exchange TEXT,
+    status TEXT,
+    net_pnl REAL DEFAULT 0,
+    total_fees REAL DEFAULT 0,
+    duration_ms REAL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades(ts, seq);
+CREATE INDEX IF NOT EXISTS idx_trades_exchange_ts ON trades(exchange, ts, seq);
+CREATE INDEX IF NOT EXISTS idx_trades_status_ts ON trades(status, ts, seq);
+CREATE INDEX IF NOT EXISTS idx_trades_pnl ON trades(net_pnl);
+
+CREATE TABLE IF NOT EXISTS trade_stats_hourly (
+    bucket INTEGER NOT NULL,
+    exchange TEXT NOT NULL,
+    trades INTEGER DEFAULT 0,
+    successful INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0,
+    total_pnl REAL DEFAULT 0,
+    total_fees REAL DEFAULT 0,
+    total_duration_ms REAL DEFAULT 0,
+    PRIMARY KEY (bucket, exchange)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_SYNCHRONOUS = {'always': 'FULL', 'normal': 'NORMAL', 'off': 'OFF'}
+_COMPACT_CHUNK = 5000   # Trades deleted per locked step
+_VACUUM_PAGES = 2000    # Free pages returned to the OS per locked step
+_STOP = object()
+
+# Rolling windows accepted by `statistics(window=...)`
+WINDOWS = {
+    '1h': 3600,
+    '24h': 86400,
+    '7d': 7 * 86400,
+    '30d': 30 * 86400,
+    'all': None,
+}
+
+
+def _to_epoch(value: Union[None, float, int, str, datetime]) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _encode_cursor(ts: float, seq: int) -> str:
+    return f"{ts!r}_{seq}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    ts, seq = cursor.rsplit('_', 1)
+    return float(ts), int(seq)
+
+
+class TradeStore:
+    """Indexed trade history: append trades, page through them, read rolling stats."""
+
+    def __init__(self, db_path: str = 'logs/trades.db', fsync: str = 'normal', batch_size: int = 256,
+                 checkpoint_every: int = 1000, retention_days: Optional[float] = None,
+                 compact_interval: float = 6 * 3600):
+        if fsync not in _SYNCHRONOUS:
+            raise ValueError(f"Unknown fsync policy '{fsync}', expected one of {list(_SYNCHRONOUS)}")
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.retention_days = retention_days
+        self.compact_interval = compact_interval
+        self.logger = setup_logger('TradeStore')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # Only takes effect on a new database; lets compaction shrink the file without a full VACUUM
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS[fsync]}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        self._last_compact = 0.0  # First compaction runs on the writer thread, not here
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._since_checkpoint = 0
+        self._thread = threading.Thread(target=self._writer_loop, name='trade-journal', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -- writes -------------------------------------------------------------
+
+    @staticmethod
+    def _row_values(trade: Dict[str, Any]) -> Tuple:
+        ts = _to_epoch(trade.get('timestamp')) or time.time()
+        return (
+            trade.get('trade_id'),
+            ts,
+            trade.get('exchange', 'unknown'),
+            trade.get('status', 'unknown'),
+            float(trade.get('net_pnl') or 0.0),
+            float(trade.get('total_fees_paid') or 0.0),
+            float(trade.get('total_duration_ms') or 0.0),
+            json.dumps(trade, default=str)
+        )
+
+    def add_trades(self, trades: List[Dict[str, Any]]) -> int:
+        """
+        Insert trade dicts (as produced by `TradeLog.to_dict`); duplicates by trade_id
+        and trades already past the retention window are skipped.
+        """
+        inserted = 0
+        cutoff = time.time() - self.retention_days * 86400 if self.retention_days else None
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                for trade in trades:
+                    values = self._row_values(trade)
+                    if cutoff is not None and values[1] < cutoff:
+                        continue
+                    cursor.execute(
+                        "INSERT OR IGNORE INTO trades (trade_id, ts, exchange, status, net_pnl, total_fees, duration_ms, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values
+                    )
+                    if cursor.rowcount == 0:
+                        continue
+                    inserted += 1
+                    _, ts, exchange, status, net_pnl, total_fees, duration_ms, _ = values
+                    cursor.execute(
+                        "INSERT INTO trade_stats_hourly (bucket, exchange, trades, successful, failed, total_pnl, total_fees, total_duration_ms) "
+                        "VALUES (?, ?, 1, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(bucket, exchange) DO UPDATE SET "
+                        "trades = trades + 1, successful = successful + excluded.successful, failed = failed + excluded.failed, "
+                        "total_pnl = total_pnl + excluded.total_pnl, total_fees = total_fees + excluded.total_fees, "
+                        "total_duration_ms = total_duration_ms + excluded.total_duration_ms",
+                        (int(ts // _BUCKET_SECONDS), exchange, int(status == 'success'), int(status == 'failed'),
+                         net_pnl, total_fees, duration_ms)
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return inserted
+
+    def add_trade(self, trade: Dict[str, Any]) -> bool:
+        return self.add_trades([trade]) == 1
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    def append(self, trade: Dict[str, Any]) -> None:
+        """Journal a trade without blocking; the background writer commits it."""
+        self._queue.put(trade)
+
+    def flush(self) -> None:
+        """Wait until every appended trade is committed."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def _writer_loop(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self._compact_due_in() if self.retention_days else None)
+            except queue.Empty:
+                self._maybe_compact()
+                continue
+            batch = [] if item is _STOP else [item]
+            stop = item is _STOP
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is _STOP:
+                    stop = True
+                else:
+                    batch.append(extra)
+
+            try:
+                if batch:
+                    self.add_trades(batch)
+                    self._since_checkpoint += len(batch)
+                    if self._since_checkpoint >= self.checkpoint_every:
+                        self.checkpoint()
+            except Exception as e:
+                self.logger.error(f"Error writing {len(batch)} trades to journal: {e}")
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+            if stop:
+                break
+            self._maybe_compact()
+
+    def _compact_due_in(self) -> float:
+        return max(0.0, self._last_compact + self.compact_interval - time.time())
+
+    def _maybe_compact(self) -> None:
+        """Apply the retention policy once per compact_interval (runs on the writer thread)."""
+        if not self.retention_days or self._compact_due_in() > 0:
+            return
+        self._last_compact = time.time()
+        try:
+            self.compact(self.retention_days)
+        except Exception as e:
+            self.logger.error(f"Error compacting trade journal: {e}")
+
+    def checkpoint(self) -> None:
+        """Fold the WAL back into the database file and truncate it."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._since_checkpoint = 0
+
+    def compact(self, retention_days: float) -> int:
+        """
+        Drop trades older than `retention_days` (hourly aggregates are kept). Works in
+        chunks, releasing the lock in between, and reclaims space incrementally.
+        """
+        cutoff = time.time() - retention_days * 86400
+        deleted = 0
+        while True:
+            with self._lock:
+                chunk = self._conn.execute(
+                    "DELETE FROM trades WHERE seq IN (SELECT seq FROM trades WHERE ts < ? LIMIT ?)",
+                    (cutoff, _COMPACT_CHUNK)
+                ).rowcount
+                self._conn.commit()
+                if chunk:
+                    self._conn.execute(f"PRAGMA incremental_vacuum({_VACUUM_PAGES})").fetchall()
+            deleted += chunk
+            if chunk < _COMPACT_CHUNK:
+                break
+        if deleted:
+            self.logger.info(f"Compacted trade journal: removed {deleted} trades older than {retention_days} days")
+        return deleted
+
+    # -- reads --------------------------------------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def query(self, limit: int = 50, cursor: Optional[str] = None, exchange: Optional[str] = None,
+              status: Optional[str] = None, since: Any = None, until: Any = None) -> Dict[str, Any]:
+        """
+        Newest-first page of trades. Pass the returned `next_cursor` back to get the
+        following page; it is None on the last page.
+        """
+        limit = max(1, min(int(limit), 1000))
+        where, params = [], []
+        if exchange:
+            where.append("exchange = ?")
+            params.append(exchange)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        since_ts, until_ts = _to_epoch(since), _to_epoch(until)
+        if since_ts is not None:
+            where.append("ts >= ?")
+            params.append(since_ts)
+        if until_ts is not None:
+            where.append("ts < ?")
+            params.append(until_ts)
+        if cursor:
+            cursor_ts, cursor_seq = _decode_cursor(cursor)
+            where.append("(ts < ? OR (ts = ? AND seq < ?))")
+            params.extend([cursor_ts, cursor_ts, cursor_seq])
+
+        sql = "SELECT seq, ts, data FROM trades"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, seq DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]['ts'], rows[-1]['seq'])
+        return {
+            'trades': [json.loads(row['data']) for row in rows],
+            'next_cursor': next_cursor
+        }
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.query(limit=limit)['trades']
+
+    def statistics(self, window: str = 'all', exchange: Optional[str] = None) -> Dict[str, Any]:
+        """Trade statistics over a rolling window ('1h', '24h', '7d', '30d' or 'all')."""
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window '{window}', expected one of {list(WINDOWS)}")
+        span = WINDOWS[window]
+        since = time.time() - span if span else None
+
+        exchange_sql = " AND exchange = ?" if exchange else ""
+        exchange_params = [exchange] if exchange else []
+        totals = {'trades': 0, 'successful': 0, 'failed': 0, 'total_pnl': 0.0, 'total_fees': 0.0, 'total_duration_ms': 0.0}
+
+        with self._lock:
+            # Whole hourly buckets inside the window come from the aggregate table ...
+            first_bucket = math.ceil(since / _BUCKET_SECONDS) if since is not None else None
+            bucket_sql = ("SELECT COALESCE(SUM(trades), 0), COALESCE(SUM(successful), 0), COALESCE(SUM(failed), 0), "
+                          "COALESCE(SUM(total_pnl), 0), COALESCE(SUM(total_fees), 0), COALESCE(SUM(total_duration_ms), 0) "
+                          "FROM trade_stats_hourly WHERE 1 = 1")
+            bucket_params: List[Any] = []
+            if first_bucket is not None:
+                bucket_sql += " AND bucket >= ?"
+                bucket_params.append(first_bucket)
+            row = self._conn.execute(bucket_sql + exchange_sql, bucket_params + exchange_params).fetchone()
+            for key, value in zip(totals, row):
+                totals[key] += value
+
+            # ... and the partial hour at the start of the window from the trades index
+            if first_bucket is not None:
+                edge = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(status = 'success'), 0), COALESCE(SUM(status = 'failed'), 0), "
+                    "COALESCE(SUM(net_pnl), 0), COALESCE(SUM(total_fees), 0), COALESCE(SUM(duration_ms), 0) "
+                    "FROM trades WHERE ts >= ? AND ts < ?" + exchange_sql,
+                    [since, first_bucket * _BUCKET_SECONDS] + exchange_params
+                ).fetchone()
+                for key, value in zip(totals, edge):
+                    totals[key] += value
+
+            range_sql = " WHERE 1 = 1" + (" AND ts >= ?" if since is not None else "") + exchange_sql
+            range_params = ([since] if since is not None else []) + exchange_params
+            best = self._conn.execute(
+                "SELECT data FROM trades" + range_sql + " AND net_pnl > 0 ORDER BY net_pnl DESC LIMIT 1", range_params
+            ).fetchone()
+            worst = self._conn.execute(
+                "SELECT data FROM trades" + range_sql + " AND net_pnl < 0 ORDER BY net_pnl ASC LIMIT 1", range_params
+            ).fetchone()
+
+        total = totals['trades']
+        return {
+            'window': window,
+            'exchange': exchange,
+            'total_trades': total,
+            'successful_trades': totals['successful'],
+            'failed_trades': totals['failed'],
+            'success_rate': (totals['successful'] / total) * 100 if total else 0.0,
+            'total_profit': totals['total_pnl'],
+            'total_fees': totals['total_fees'],
+            'average_duration_ms': totals['total_duration_ms'] / total if total else 0.0,
+            'best_trade': json.loads(best['data']) if best else None,
+            'worst_trade': json.loads(worst['data']) if worst else None
+        }
+
+    def close(self) -> None:
+        """Commit pending trades, checkpoint and close the database."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=10)
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # already closed
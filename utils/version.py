@@ -0,0 +1,33 @@
+"""
+Build identification without spawning git at import time.
+"""
+
+import os
+from functools import lru_cache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@lru_cache(maxsize=1)
+def git_commit() -> str:
+    """Short commit hash of the checkout, read straight from .git, or 'unknown'."""
+    try:
+        git_dir = os.path.join(REPO_ROOT, '.git')
+        with open(os.path.join(git_dir, 'HEAD')) as f:
+            head = f.read().strip()
+        if not head.startswith('ref: '):
+            return head[:7]  # Detached HEAD
+
+        ref = head[5:]
+        ref_path = os.path.join(git_dir, ref)
+        if os.path.exists(ref_path):
+            with open(ref_path) as f:
+                return f.read().strip()[:7]
+        with open(os.path.join(git_dir, 'packed-refs')) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0][:7]
+    except Exception:
+        pass
+    return "unknown"
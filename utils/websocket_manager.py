@@ -9,6 +9,7 @@ import time
 from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 from utils.logger import setup_logger
+from utils.opportunity_stream import OpportunityStream
 
 class WebSocketManager:
     """Manages WebSocket-like communication for the GUI application."""
@@ -16,6 +17,7 @@ class WebSocketManager:
     def __init__(self):
         self.logger = setup_logger('WebSocketManager')
         self.callbacks: List[Callable] = []
+        self.opportunity_stream = OpportunityStream()
         self.running = False
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.thread: Optional[threading.Thread] = None
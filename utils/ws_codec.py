@@ -0,0 +1,131 @@
+"""
+Wire encodings for the /ws endpoint.
+
+Clients pick an encoding when connecting, either with a WebSocket subprotocol
+(`arb.msgpack.v1` / `arb.json.v1`) or a `?encoding=msgpack` query parameter:
+
+- json     text frames `{"type": ..., "data": ...}` (default, unchanged)
+- msgpack  binary frames `[type, data]` where opportunity rows are positional
+           arrays in OPPORTUNITY_FIELDS order, partial updates are
+           `{field_index: value}` maps and timestamps are epoch milliseconds.
+           A `schema` message listing the fields is sent first.
+
+msgpack is optional; without it every client gets JSON.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+ENCODING_JSON = 'json'
+ENCODING_MSGPACK = 'msgpack'
+
+SUBPROTOCOLS = {
+    'arb.msgpack.v1': ENCODING_MSGPACK,
+    'arb.json.v1': ENCODING_JSON,
+}
+
+OPPORTUNITY_FIELDS = (
+    'id', 'exchange', 'trianglePath', 'profitPercentage', 'profitAmount', 'volume',
+    'status', 'dataType', 'timestamp', 'tradeable', 'balanceAvailable', 'balanceRequired',
+    'real_market_data', 'manual_execution',
+)
+_FIELD_INDEX = {name: i for i, name in enumerate(OPPORTUNITY_FIELDS)}
+_TIMESTAMP_INDEX = _FIELD_INDEX['timestamp']
+
+
+def negotiate(subprotocols: List[str], query_encoding: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Return (encoding, accepted subprotocol) for a connecting client."""
+    for subprotocol in subprotocols:
+        encoding = SUBPROTOCOLS.get(subprotocol)
+        if encoding == ENCODING_MSGPACK and not MSGPACK_AVAILABLE:
+            continue
+        if encoding:
+            return encoding, subprotocol
+    if query_encoding == ENCODING_MSGPACK and MSGPACK_AVAILABLE:
+        return ENCODING_MSGPACK, None
+    return ENCODING_JSON, None
+
+
+def _epoch_ms(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return int(datetime.fromisoformat(value).timestamp() * 1000)
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return value
+
+
+def compact_opportunity(opp: Dict[str, Any]) -> List[Any]:
+    """Opportunity dict -> positional row; unknown keys travel in a trailing dict."""
+    row = [opp.get(name) for name in OPPORTUNITY_FIELDS]
+    row[_TIMESTAMP_INDEX] = _epoch_ms(row[_TIMESTAMP_INDEX])
+    extras = {key: value for key, value in opp.items() if key not in _FIELD_INDEX}
+    if extras:
+        row.append(extras)
+    return row
+
+
+def _compact_changes(changes: Dict[str, Any]) -> Dict[Any, Any]:
+    compact = {}
+    for key, value in changes.items():
+        index = _FIELD_INDEX.get(key)
+        if index == _TIMESTAMP_INDEX:
+            value = _epoch_ms(value)
+        compact[key if index is None else index] = value
+    return compact
+
+
+def _compact_data(event: str, data: Any) -> Any:
+    if event == 'opportunities_snapshot':
+        return {'seq': data['seq'], 'opportunities': [compact_opportunity(o) for o in data['opportunities']]}
+    if event == 'opportunities_delta':
+        return {
+            'seq': data['seq'],
+            'added': [compact_opportunity(o) for o in data['added']],
+            'updated': [_compact_changes(c) for c in data['updated']],
+            'removed': data['removed'],
+        }
+    if event == 'opportunities_update' and isinstance(data, list):
+        return [compact_opportunity(o) for o in data]
+    return data
+
+
+def encode(event: str, data: Any, encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """Serialize one message; str for text frames, bytes for binary frames."""
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb([event, _compact_data(event, data)], default=str)
+    return json.dumps({"type": event, "data": data})
+
+
+def schema_message(encoding: str) -> Optional[Union[str, bytes]]:
+    """Field layout sent once to clients of a compact encoding."""
+    if encoding == ENCODING_JSON:
+        return None
+    return encode('schema', {'opportunity': list(OPPORTUNITY_FIELDS), 'timestamp': 'epoch_ms'}, encoding)
+
+
+def decode(message: Union[str, bytes]) -> Tuple[str, Any]:
+    """Decode a frame from any encoding into (type, data) with compact rows left as-is."""
+    if isinstance(message, (bytes, bytearray)):
+        event, data = msgpack.unpackb(message, strict_map_key=False)
+        return event, data
+    payload = json.loads(message)
+    return payload.get('type'), payload.get('data')
+
+
+def expand_opportunity(row: List[Any]) -> Dict[str, Any]:
+    """Positional row -> opportunity dict (timestamp stays in epoch ms)."""
+    opp = dict(zip(OPPORTUNITY_FIELDS, row))
+    if len(row) > len(OPPORTUNITY_FIELDS) and isinstance(row[-1], dict):
+        opp.update(row[-1])
+    return opp